@@ -0,0 +1,23 @@
+"""
+ASGI config for avo_api project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+SSE / long-poll 상태 조회가 기다리는 동안 스레드를 잡지 않도록 web은 ASGI 서버(uvicorn)로 실행합니다.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'avo_api.settings')
+
+application = get_asgi_application()
+
+# 개발 환경에서는 runserver처럼 정적 파일(admin 등)도 제공
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
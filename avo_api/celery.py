@@ -11,6 +11,24 @@ app = Celery('avo_api')
 # Django 설정을 사용하여 Celery 구성
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+
+def route_guideline_steps(name, args, kwargs, options, task=None, **kw):
+    """
+    작업 단계 task를 단계별 큐로 라우팅 (요약 / 체크리스트 워커를 따로 확장)
+    공정 스케줄러 발행 / 작업 상태 반영 task는 asyncio 워커가 소비하지 않는 요약 단계 큐로 보냅니다.
+    큐 이름은 설정 로드 이후 호출 시점에 조회합니다.
+    """
+    queues = {
+        'jobs.tasks.generate_summary_step': settings.GUIDELINE_SUMMARY_QUEUE,
+        'jobs.tasks.generate_checklist_step': settings.GUIDELINE_CHECKLIST_QUEUE,
+        'jobs.tasks.dispatch_ready_jobs': settings.GUIDELINE_SUMMARY_QUEUE,
+        'jobs.tasks.flush_job_states': settings.GUIDELINE_SUMMARY_QUEUE,
+    }
+    if name in queues:
+        return {'queue': queues[name]}
+    return None
+
+
 # Celery 설정
 app.conf.update(
     # Redis를 broker와 result backend로 사용
@@ -29,10 +47,11 @@ app.conf.update(
     timezone='Asia/Seoul',
     enable_utc=True,
     
-    # FIFO 큐 설정 (우선순위 없음)
-    task_routes={
-        'jobs.tasks.guideline_ingest_task': {'queue': 'guideline_queue'},
-    },
+    # 단계별 큐 설정 (우선순위 / 테넌트 공정 분배는 jobs.services.fair_scheduler)
+    task_routes=(
+        {'jobs.tasks.guideline_ingest_task': {'queue': 'guideline_queue'}},
+        route_guideline_steps,
+    ),
     
     # Worker 설정
     worker_prefetch_multiplier=1,  # 한 번에 하나씩 처리 (FIFO 보장)
@@ -62,8 +81,23 @@ def debug_task(self):
 @app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
     """
-    주기적 작업 설정 (필요한 경우)
+    주기적 작업 설정 (celery -A avo_api beat 실행 시)
     """
     # 예: 매 10분마다 실행
     # sender.add_periodic_task(600.0, debug_task.s(), name='debug every 10 minutes')
-    pass
\ No newline at end of file
+    
+    # 공정 스케줄러: lease 만료로 회수된 실행 슬롯 채우기
+    if getattr(settings, 'JOB_FAIR_SCHEDULING_ENABLED', False):
+        sender.add_periodic_task(
+            settings.JOB_SCHEDULER_DISPATCH_INTERVAL,
+            sender.signature('jobs.tasks.dispatch_ready_jobs'),
+            name='dispatch fair-scheduled jobs',
+        )
+    
+    # 작업 상태 write-behind: Redis의 종료 상태를 Postgres에 반영
+    if getattr(settings, 'JOB_STATE_WRITE_BEHIND', False):
+        sender.add_periodic_task(
+            settings.JOB_STATE_FLUSH_INTERVAL,
+            sender.signature('jobs.tasks.flush_job_states', options={'expires': settings.JOB_STATE_FLUSH_INTERVAL * 5}),
+            name='flush finished job states',
+        )
\ No newline at end of file
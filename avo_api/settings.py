@@ -65,6 +65,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'avo_api.wsgi.application'
+ASGI_APPLICATION = 'avo_api.asgi.application'
 
 # Database
 DATABASES = {
@@ -143,6 +144,8 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
+    # async 뷰(GET /api/jobs/{event_id})는 documented_by로 지정한 DRF 뷰의 문서 사용
+    'DEFAULT_GENERATOR_CLASS': 'jobs.schema.AsyncViewSchemaGenerator',
     'CONTACT': {
         'name': 'AVO API Team',
         'email': 'team@avo-api.com',
@@ -234,6 +237,156 @@ LOGGING = {
 # OpenAI API (GPT 연결용)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# LLM 백엔드: openai | stub (manage.py run_llm_stub, 부하 테스트용) | 클래스 경로
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai')
+LLM_STUB_BASE_URL = os.getenv('LLM_STUB_BASE_URL', 'http://localhost:8090/v1')
+
+# GPT 모델 선택 (앞에서부터 사용 가능한 모델을 선택)
+GPT_MODEL_CANDIDATES = os.getenv('GPT_MODEL_CANDIDATES', 'gpt-4o-mini,gpt-3.5-turbo').split(',')
+GPT_MODEL_HEALTH_TTL = int(os.getenv('GPT_MODEL_HEALTH_TTL', '300'))  # 모델 상태 재확인 주기 (초)
+GPT_HTTP_POOL_SIZE = int(os.getenv('GPT_HTTP_POOL_SIZE', '10'))
+GPT_STREAMING_ENABLED = os.getenv('GPT_STREAMING_ENABLED', 'True').lower() == 'true'  # 부분 결과 스트리밍
+GPT_OUTPUT_MODE = os.getenv('GPT_OUTPUT_MODE', 'function')  # 구조화 출력: function | json | off
+GPT_OUTPUT_RETRIES = int(os.getenv('GPT_OUTPUT_RETRIES', '1'))  # 파싱/스키마 실패 시 해당 단계 재요청 횟수
+GPT_PIPELINE_MODE = os.getenv('GPT_PIPELINE_MODE', 'two_step')  # two_step | fused (작업별 지정 가능)
+
+# 대용량 가이드라인 map-reduce 요약
+GPT_SUMMARY_CHUNK_TOKENS = int(os.getenv('GPT_SUMMARY_CHUNK_TOKENS', '3000'))  # 청크당 토큰 예산 (초과 시 분할)
+GPT_SUMMARY_MAP_CONCURRENCY = int(os.getenv('GPT_SUMMARY_MAP_CONCURRENCY', '8'))  # 청크 병렬 요약 수
+
+# OpenAI 호출 제한 (모든 워커가 Redis 토큰 버킷을 공유)
+GPT_RATE_LIMIT_ENABLED = os.getenv('GPT_RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+GPT_RATE_LIMIT_RPM = int(os.getenv('GPT_RATE_LIMIT_RPM', '500'))  # 모델별 분당 요청 수
+GPT_RATE_LIMIT_TPM = int(os.getenv('GPT_RATE_LIMIT_TPM', '200000'))  # 모델별 분당 토큰 수
+GPT_RATE_LIMIT_MAX_WAIT = float(os.getenv('GPT_RATE_LIMIT_MAX_WAIT', '30'))  # 초과 시 작업 재예약 (초)
+GPT_RATE_LIMIT_MAX_RETRIES = int(os.getenv('GPT_RATE_LIMIT_MAX_RETRIES', '10'))
+
+# GPT 호출 타임아웃 / 재시도 / 회로 차단기
+GPT_REQUEST_TIMEOUT = float(os.getenv('GPT_REQUEST_TIMEOUT', '30'))  # 호출당 타임아웃 (초)
+GPT_RETRY_MAX_ATTEMPTS = int(os.getenv('GPT_RETRY_MAX_ATTEMPTS', '3'))
+GPT_RETRY_BASE_DELAY = float(os.getenv('GPT_RETRY_BASE_DELAY', '0.5'))  # 지수 백오프 시작값 (초)
+GPT_RETRY_MAX_DELAY = float(os.getenv('GPT_RETRY_MAX_DELAY', '8'))
+GPT_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('GPT_CIRCUIT_FAILURE_THRESHOLD', '5'))  # window 안 실패한 upstream 시도 횟수
+GPT_CIRCUIT_FAILURE_WINDOW = int(os.getenv('GPT_CIRCUIT_FAILURE_WINDOW', '60'))
+GPT_CIRCUIT_COOLDOWN = int(os.getenv('GPT_CIRCUIT_COOLDOWN', '30'))  # open 유지 시간 (초)
+
+# 근사 중복 가이드라인 결과 재사용 (MinHash/LSH 인덱스)
+GPT_SIMILARITY_ENABLED = os.getenv('GPT_SIMILARITY_ENABLED', 'True').lower() == 'true'
+GPT_SIMILARITY_THRESHOLD = float(os.getenv('GPT_SIMILARITY_THRESHOLD', '0.85'))  # 재사용할 최소 Jaccard 유사도
+GPT_SIMILARITY_MAX_CANDIDATES = int(os.getenv('GPT_SIMILARITY_MAX_CANDIDATES', '50'))  # 조회당 비교할 후보 수
+
+# 개정판 증분 처리 (변경된 섹션 비율이 이 값을 넘으면 전체 재처리)
+GPT_INCREMENTAL_MAX_CHANGE_RATIO = float(os.getenv('GPT_INCREMENTAL_MAX_CHANGE_RATIO', '0.5'))
+
+# 단계별 모델 라우팅 / hedge 요청
+GPT_ROUTING_ENABLED = os.getenv('GPT_ROUTING_ENABLED', 'True').lower() == 'true'
+GPT_HEDGE_STEPS = os.getenv('GPT_HEDGE_STEPS', 'checklist,fused,revision').split(',')  # hedge 대상 단계 (빈 값이면 사용 안 함)
+GPT_HEDGE_MIN_SAMPLES = int(os.getenv('GPT_HEDGE_MIN_SAMPLES', '20'))  # p95 계산에 필요한 최소 관측 수
+GPT_HEDGE_POOL_SIZE = int(os.getenv('GPT_HEDGE_POOL_SIZE', '16'))
+# 동기(Celery) 경로 hedge 사용 여부 - 늦게 끝난 요청을 취소할 수 없어 hedge된 호출은 비용이 두 배 (asyncio 워커는 취소함)
+GPT_HEDGE_SYNC_ENABLED = os.getenv('GPT_HEDGE_SYNC_ENABLED', 'False').lower() == 'true'
+GPT_ROUTER_WINDOW = int(os.getenv('GPT_ROUTER_WINDOW', '200'))  # 모델/단계별로 보관할 최근 지연 시간 수
+
+# 작업 단계별 Celery 큐 (워커: celery -A avo_api worker -Q <큐>)
+GUIDELINE_SUMMARY_QUEUE = os.getenv('GUIDELINE_SUMMARY_QUEUE', 'guideline_summary')
+GUIDELINE_CHECKLIST_QUEUE = os.getenv('GUIDELINE_CHECKLIST_QUEUE', 'guideline_checklist')
+
+# Celery 작업 시간 제한 (단계 task별, soft 초과 시 실패 처리, hard 초과 시 워커 프로세스 종료)
+GUIDELINE_TASK_SOFT_TIME_LIMIT = int(os.getenv('GUIDELINE_TASK_SOFT_TIME_LIMIT', '300'))
+GUIDELINE_TASK_TIME_LIMIT = int(os.getenv('GUIDELINE_TASK_TIME_LIMIT', '360'))
+
+# 일괄 등록 (POST /api/jobs/batch)
+JOB_BATCH_MAX_SIZE = int(os.getenv('JOB_BATCH_MAX_SIZE', '10000'))  # 요청당 최대 작업 수
+JOB_BATCH_INSERT_SIZE = int(os.getenv('JOB_BATCH_INSERT_SIZE', '1000'))  # bulk_create INSERT당 행 수
+JOB_DISPATCH_BATCH_SIZE = int(os.getenv('JOB_DISPATCH_BATCH_SIZE', '500'))  # 대기열 release 1회당 최대 task 수
+
+# 가이드라인 문서 저장 (업로드 문서 / 큰 text는 내용 해시 단위 blob 저장소에 한 번만 gzip으로 저장)
+JOB_BLOB_ROOT = os.getenv('JOB_BLOB_ROOT', str(BASE_DIR / 'blobs'))  # web과 워커가 공유하는 디렉터리
+JOB_DOCUMENT_MAX_BYTES = int(os.getenv('JOB_DOCUMENT_MAX_BYTES', str(64 * 1024 * 1024)))  # 압축을 푼 문서 최대 크기
+JOB_INLINE_TEXT_MAX_BYTES = int(os.getenv('JOB_INLINE_TEXT_MAX_BYTES', str(64 * 1024)))  # 이보다 큰 text는 blob 저장소로
+JOB_BLOB_COMPRESSION_LEVEL = int(os.getenv('JOB_BLOB_COMPRESSION_LEVEL', '6'))
+
+# 작업 생성 멱등성 (Idempotency-Key 헤더, 보존 기간이 지나면 같은 키로 새 작업 생성)
+JOB_IDEMPOTENCY_TTL = int(os.getenv('JOB_IDEMPOTENCY_TTL', str(60 * 60 * 24)))  # 초
+
+# 종료된 작업의 상태 조회 응답 캐시 (직렬화한 본문을 Redis에 보관, 작업 상태를 쓸 때 삭제)
+JOB_STATUS_CACHE_ENABLED = os.getenv('JOB_STATUS_CACHE_ENABLED', 'True').lower() == 'true'
+JOB_STATUS_CACHE_TTL = int(os.getenv('JOB_STATUS_CACHE_TTL', str(60 * 60)))  # 초
+
+# 작업 상태 알림 (Redis pub/sub → SSE / ?wait= long-poll, ASGI에서 기다리는 연결이 스레드를 잡지 않음)
+JOB_LONG_POLL_MAX_WAIT = float(os.getenv('JOB_LONG_POLL_MAX_WAIT', '60'))  # ?wait= 최대값 (초)
+JOB_EVENTS_HEARTBEAT = float(os.getenv('JOB_EVENTS_HEARTBEAT', '15'))  # SSE keep-alive / 상태 재확인 주기 (초)
+JOB_EVENTS_MAX_STREAM = float(os.getenv('JOB_EVENTS_MAX_STREAM', '600'))  # SSE 연결 최대 유지 시간 (초)
+
+# 완료 웹훅 (callback_url, python manage.py run_webhook_worker가 GPT 워커와 별도로 전송)
+WEBHOOK_CONCURRENCY = int(os.getenv('WEBHOOK_CONCURRENCY', '50'))  # 프로세스당 동시 요청 수
+WEBHOOK_MAX_CONNECTIONS_PER_HOST = int(os.getenv('WEBHOOK_MAX_CONNECTIONS_PER_HOST', '8'))  # 목적지 호스트별 keep-alive 연결 수
+WEBHOOK_CLAIM_BATCH = int(os.getenv('WEBHOOK_CLAIM_BATCH', '200'))  # claim 쿼리당 전송 행 수
+WEBHOOK_BATCH_MAX_EVENTS = int(os.getenv('WEBHOOK_BATCH_MAX_EVENTS', '100'))  # 묶음 전송 요청당 최대 이벤트 수
+WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '10'))  # 요청당 타임아웃 (초)
+WEBHOOK_LEASE = int(os.getenv('WEBHOOK_LEASE', '120'))  # claim 후 결과를 기록하지 못하면 이 시간 뒤 다시 전송 (초)
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '8'))  # 넘으면 dead-letter 테이블로 이동
+WEBHOOK_MAX_BACKOFF = float(os.getenv('WEBHOOK_MAX_BACKOFF', '3600'))  # 재시도 간격 상한 (초)
+WEBHOOK_POLL_INTERVAL = float(os.getenv('WEBHOOK_POLL_INTERVAL', '1'))  # 보낼 웹훅이 없을 때 재확인 주기 (초)
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')  # 설정하면 X-Webhook-Signature: sha256=<본문 HMAC>
+WEBHOOK_ALLOWED_HOSTS = [host for host in os.getenv('WEBHOOK_ALLOWED_HOSTS', '').split(',') if host]  # 비어 있으면 모든 호스트
+
+# 작업 발행 outbox (요청은 Job과 같은 트랜잭션에 outbox 행만 기록, python manage.py run_outbox_relay가 발행)
+JOB_DISPATCH_OUTBOX = os.getenv('JOB_DISPATCH_OUTBOX', 'True').lower() == 'true'
+JOB_OUTBOX_CHANNEL = os.getenv('JOB_OUTBOX_CHANNEL', 'job_outbox')  # relay를 깨우는 LISTEN/NOTIFY 채널
+JOB_OUTBOX_BATCH_SIZE = int(os.getenv('JOB_OUTBOX_BATCH_SIZE', '500'))  # claim / 발행 묶음당 작업 수
+JOB_OUTBOX_POLL_INTERVAL = float(os.getenv('JOB_OUTBOX_POLL_INTERVAL', '1'))  # NOTIFY가 없을 때 재확인 주기 (초)
+JOB_OUTBOX_MAX_BACKOFF = float(os.getenv('JOB_OUTBOX_MAX_BACKOFF', '60'))  # 발행 실패 재시도 간격 상한 (초)
+
+# 작업 큐 백엔드: celery (Redis 브로커) | postgres (python manage.py run_pg_worker가 Job 행을 직접 claim)
+# postgres에서는 공정 스케줄링 / 상태 write-behind 없이 Job 행이 곧 대기열과 상태입니다.
+JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'celery')
+JOB_QUEUE_CHANNEL = os.getenv('JOB_QUEUE_CHANNEL', 'guideline_jobs')  # LISTEN/NOTIFY 채널
+JOB_QUEUE_LEASE = int(os.getenv('JOB_QUEUE_LEASE', '600'))  # 연장 없이 지나면 다른 워커가 다시 claim (초)
+JOB_QUEUE_CLAIM_BATCH = int(os.getenv('JOB_QUEUE_CLAIM_BATCH', '10'))  # claim 쿼리당 최대 작업 수
+JOB_QUEUE_POLL_INTERVAL = float(os.getenv('JOB_QUEUE_POLL_INTERVAL', '5'))  # NOTIFY가 없을 때 재확인 주기 (초)
+PG_WORKER_CONCURRENCY = int(os.getenv('PG_WORKER_CONCURRENCY', '8'))  # 워커 프로세스당 동시 작업 수
+
+# 작업 우선순위 / 테넌트별 공정 스케줄링 (테넌트는 X-Tenant-ID 헤더, JOB_DEFAULT_TENANT와 JOB_TENANT_WEIGHTS의 테넌트만 허용)
+JOB_FAIR_SCHEDULING_ENABLED = os.getenv('JOB_FAIR_SCHEDULING_ENABLED', 'True').lower() == 'true'
+JOB_DEFAULT_TENANT = os.getenv('JOB_DEFAULT_TENANT', 'default')
+JOB_TENANT_WEIGHTS = {  # 예: "web:4,backfill:1" (JOB_DEFAULT_TENANT는 지정하지 않으면 1)
+    tenant.strip(): float(weight)
+    for tenant, weight in (item.split(':', 1) for item in os.getenv('JOB_TENANT_WEIGHTS', '').split(',') if item.strip())
+}
+JOB_SCHEDULER_MAX_IN_FLIGHT = int(os.getenv('JOB_SCHEDULER_MAX_IN_FLIGHT', '100'))  # 단계 큐에 풀어 놓는 최대 작업 수
+JOB_SCHEDULER_LEASE = int(os.getenv('JOB_SCHEDULER_LEASE', '3600'))  # 반납되지 않은 실행 슬롯 회수 (초)
+JOB_SCHEDULER_DISPATCH_INTERVAL = float(os.getenv('JOB_SCHEDULER_DISPATCH_INTERVAL', '30'))  # beat 주기 발행 (초)
+JOB_SCHEDULER_WAIT_WINDOW = int(os.getenv('JOB_SCHEDULER_WAIT_WINDOW', '500'))  # 테넌트/우선순위별 대기 시간 표본 수
+
+# 작업 상태 write-behind (진행 중 상태는 Redis 해시, 종료 상태만 Postgres에 묶음 반영)
+# 켜면 종료 상태는 beat의 flush_job_states로만 Postgres에 기록되므로 beat를 반드시 함께 실행
+JOB_STATE_WRITE_BEHIND = os.getenv('JOB_STATE_WRITE_BEHIND', 'False').lower() == 'true'
+JOB_STATE_TTL = int(os.getenv('JOB_STATE_TTL', str(60 * 60 * 24)))  # 반영 후 Redis에 남겨 두는 시간 (초)
+JOB_STATE_FLUSH_INTERVAL = float(os.getenv('JOB_STATE_FLUSH_INTERVAL', '1'))  # beat 반영 주기 (초)
+JOB_STATE_FLUSH_BATCH = int(os.getenv('JOB_STATE_FLUSH_BATCH', '1000'))  # bulk UPDATE당 작업 수
+
+# GPT 결과 캐시 (로컬 LRU + Redis)
+GPT_RESULT_CACHE_ENABLED = os.getenv('GPT_RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+GPT_RESULT_CACHE_TTL = int(os.getenv('GPT_RESULT_CACHE_TTL', str(60 * 60 * 24)))  # 초
+GPT_RESULT_CACHE_MAX_ENTRIES = int(os.getenv('GPT_RESULT_CACHE_MAX_ENTRIES', '10000'))  # Redis 최대 항목 수
+GPT_RESULT_CACHE_LOCAL_SIZE = int(os.getenv('GPT_RESULT_CACHE_LOCAL_SIZE', '256'))  # 프로세스 로컬 LRU 크기
+
+# 자주 증가하는 지표(캐시 적중/미스)의 묶음 기록 - 둘 중 먼저 도달하면 Redis에 반영
+METRICS_FLUSH_EVERY = int(os.getenv('METRICS_FLUSH_EVERY', '100'))  # 증가 횟수
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # 초
+
+# 동일 가이드라인 작업 합치기 (single-flight)
+# follower 대기 시간은 GUIDELINE_TASK_SOFT_TIME_LIMIT보다 짧아야 함 (python manage.py check가 확인)
+SINGLE_FLIGHT_LEASE_TTL = int(os.getenv('SINGLE_FLIGHT_LEASE_TTL', '60'))  # leader lease (실행 중 1/3마다 연장, 워커가 죽으면 이 시간 뒤 넘겨받음)
+SINGLE_FLIGHT_WAIT_TIMEOUT = int(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', '120'))  # follower 최대 대기, 넘으면 재예약 (초)
+SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv('SINGLE_FLIGHT_POLL_INTERVAL', '0.5'))
+SINGLE_FLIGHT_RESULT_TTL = int(os.getenv('SINGLE_FLIGHT_RESULT_TTL', '600'))  # 공유 결과 보관 (초)
+
+# asyncio 워커 (python manage.py run_async_worker)
+ASYNC_WORKER_CONCURRENCY = int(os.getenv('ASYNC_WORKER_CONCURRENCY', '50'))  # 프로세스당 동시 작업 수
+GPT_ASYNC_MAX_CONCURRENCY = int(os.getenv('GPT_ASYNC_MAX_CONCURRENCY', '50'))  # 프로세스당 동시 GPT 호출 수
+
 # Security settings (production)
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
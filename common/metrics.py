@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+from django.conf import settings
+
+from .utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 모든 프로세스(web/worker)가 공유하는 지표 해시
+METRICS_KEY = 'avo:metrics'
+
+
+def incr(name: str, amount: float = 1):
+    """카운터 증가 (지표 기록 실패가 작업을 중단시키지 않도록 예외를 삼킴)"""
+    try:
+        get_redis().hincrbyfloat(METRICS_KEY, name, amount)
+    except Exception as e:
+        logger.warning(f"지표 기록 실패 ({name}): {e}")
+
+
+def observe(name: str, value: float):
+    """관측값 누적 - `<name>.count`와 `<name>.sum`으로 평균을 계산할 수 있습니다."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hincrbyfloat(METRICS_KEY, f'{name}.count', 1)
+        pipe.hincrbyfloat(METRICS_KEY, f'{name}.sum', value)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"지표 기록 실패 ({name}): {e}")
+
+
+class BufferedCounters:
+    """
+    자주 증가하는 카운터(캐시 적중 등)를 프로세스 안에 모았다가 묶어서 기록
+    flush_every번 증가하거나 flush_interval초가 지나면 파이프라인 1번 왕복으로 반영합니다.
+    프로세스가 종료되면 반영하지 못한 증가분은 버려집니다.
+    """
+
+    def __init__(self, flush_every: int = None, flush_interval: float = None):
+        self.flush_every = flush_every or getattr(settings, 'METRICS_FLUSH_EVERY', 100)
+        self.flush_interval = flush_interval or getattr(settings, 'METRICS_FLUSH_INTERVAL', 5.0)
+        self._pending = defaultdict(float)
+        self._count = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: float = 1):
+        with self._lock:
+            self._pending[name] += amount
+            self._count += 1
+            due = self._count >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """모인 증가분 반영 (지표 기록 실패가 작업을 중단시키지 않도록 예외를 삼킴)"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._count, self._last_flush = 0, time.monotonic()
+        if not pending:
+            return
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for name, amount in pending.items():
+                pipe.hincrbyfloat(METRICS_KEY, name, amount)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"지표 기록 실패 ({', '.join(pending)}): {e}")
+
+
+def get_metrics(prefix: str = '') -> Dict[str, float]:
+    """누적된 지표 조회 (prefix로 필터링 가능)"""
+    raw = get_redis().hgetall(METRICS_KEY)
+    metrics = {}
+    for key, value in raw.items():
+        key = key.decode() if isinstance(key, bytes) else key
+        if key.startswith(prefix):
+            metrics[key] = float(value)
+    return dict(sorted(metrics.items()))
+
+
+def reset_metrics():
+    """모든 지표 초기화"""
+    get_redis().delete(METRICS_KEY)
@@ -0,0 +1,9 @@
+from django_redis import get_redis_connection
+
+
+def get_redis():
+    """
+    settings.CACHES의 django_redis 기본 캐시가 사용하는 원시 Redis 클라이언트 반환
+    (Lua 스크립트, 해시, 정렬 집합 등 캐시 API로 표현할 수 없는 연산용)
+    """
+    return get_redis_connection('default')
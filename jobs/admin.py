@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Job
+from .models import Job, WebhookDeadLetter
 
 
 @admin.register(Job)
@@ -7,4 +7,11 @@ class JobAdmin(admin.ModelAdmin):
     list_display = ['event_id', 'status', 'created_at', 'updated_at']
     list_filter = ['status', 'created_at']
     search_fields = ['event_id']
-    readonly_fields = ['event_id', 'created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['event_id', 'created_at', 'updated_at']
+
+@admin.register(WebhookDeadLetter)
+class WebhookDeadLetterAdmin(admin.ModelAdmin):
+    list_display = ['job', 'url', 'attempts', 'last_error', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['url', 'job__event_id']
+    readonly_fields = ['job', 'url', 'payload', 'attempts', 'last_error', 'created_at']
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import queue
+import signal
+import socket
+import threading
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from kombu import Connection, Exchange, Queue
+
+from .models import Job
+from .services.gpt_service import DEFAULT_GUIDELINE_TEXT, OPENAI_AVAILABLE, get_gpt_service
+from .services.job_progress import publish_partial
+from .services.exceptions import RetryLater
+from .services.single_flight import SingleFlight
+from .tasks import (
+    CHECKLIST_FLIGHT, CHECKLIST_STEP, SUMMARY_FLIGHT, SUMMARY_STEP, build_revision_result, checklist_flight_key,
+    checkpointed_summary, find_similar_result, load_job, load_revision_base, mark_job_failed, release_job_slot,
+    save_checklist, save_summary, set_job_state, step_done, summary_flight_key,
+)
+
+if OPENAI_AVAILABLE:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프 워커가 처리하는 Celery task 이름
+HANDLED_TASKS = {
+    'jobs.tasks.process_guideline_job',
+    'jobs.tasks.guideline_ingest_task',
+}
+
+
+async def process_guideline_job_async(event_id):
+    """
+    process_guideline_job의 비동기 버전
+    하나의 이벤트 루프에서 여러 작업의 GPT 대기 시간을 겹쳐 처리합니다.
+    호출 한도 초과 / GPT 장애 시에는 워커 슬롯 대신 이벤트 루프에서 기다린 뒤 재시도합니다.
+    """
+    max_retries = settings.GPT_RATE_LIMIT_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        try:
+            return await _process_guideline_job_once(event_id)
+        except RetryLater as exc:
+            if attempt >= max_retries:
+                await sync_to_async(mark_job_failed)(event_id, exc)
+                raise exc
+            logger.warning(f"⏳ {type(exc).__name__}, retrying event_id: {event_id} in {exc.retry_after:.1f}s")
+            await asyncio.sleep(exc.retry_after)
+
+
+async def _process_guideline_job_once(event_id):
+    """
+    작업 1건 실행 - run_job_step과 같은 체크포인트 규칙
+    끝난 작업은 건너뛰고, 요약 체크포인트가 있으면 체크리스트 단계부터 이어서 실행합니다.
+    """
+    try:
+        job = await sync_to_async(load_job)(event_id)
+        if job.is_completed:
+            logger.info(f"⏭️ Job already {job.status}, skipping event_id: {event_id}")
+            await sync_to_async(release_job_slot)(event_id)
+            return job.result
+        if job.status != 'processing':
+            job.status = 'processing'
+            await sync_to_async(set_job_state)(event_id, status='processing')
+
+        logger.info(f"🚀 Starting async job processing for event_id: {event_id}")
+        guideline_text = await sync_to_async(job.get_guideline_text)() or DEFAULT_GUIDELINE_TEXT
+
+        if not step_done(job, SUMMARY_STEP):
+            await asummarize_job(job, guideline_text)
+        if not step_done(job, CHECKLIST_STEP):
+            await abuild_checklist_for_job(job, guideline_text)
+        return job.result
+
+    except Job.DoesNotExist:
+        error_msg = f"❌ Job not found for event_id: {event_id}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+    except RetryLater:
+        raise
+
+    except Exception as exc:
+        await sync_to_async(mark_job_failed)(event_id, exc)
+        raise exc
+
+
+async def asummarize_job(job, guideline_text):
+    """summarize_job의 비동기 버전 (같은 single-flight namespace를 써서 동기 워커와 결과를 공유)"""
+    flight = await SingleFlight(namespace=SUMMARY_FLIGHT).arun(
+        summary_flight_key(job, guideline_text),
+        owner=str(job.event_id),
+        fn=lambda: arun_summary_stage(job, guideline_text),
+    )
+    await sync_to_async(save_summary)(job, guideline_text, flight)
+
+
+async def abuild_checklist_for_job(job, guideline_text):
+    """build_checklist_for_job의 비동기 버전"""
+    summary = checkpointed_summary(job)
+    flight = await SingleFlight(namespace=CHECKLIST_FLIGHT).arun(
+        checklist_flight_key(summary),
+        owner=str(job.event_id),
+        fn=lambda: arun_checklist_stage(job, summary),
+    )
+    await sync_to_async(save_checklist)(job, guideline_text, flight)
+
+
+async def arun_summary_stage(job, guideline_text):
+    """
+    run_summary_stage의 비동기 버전 (요약, 또는 재사용 / 증분 / fused 모드면 체크리스트까지)
+    """
+    event_id = job.event_id
+
+    if job.previous_job_id:
+        revised = await arun_revision(job, guideline_text)
+        if revised is not None:
+            return revised
+    else:
+        reused = await sync_to_async(find_similar_result)(guideline_text)
+        if reused is not None:
+            return reused
+
+    gpt_service = get_gpt_service()
+
+    async with PartialPublisher(event_id) as partials:
+        if job.get_pipeline_mode() == 'fused':
+            logger.info(f"⚡ Generating summary and checklist in one call for event_id: {event_id}")
+            return await gpt_service.agenerate_fused(
+                guideline_text, on_partial=partials.callback('checklist', 'categories'),
+            )
+
+        logger.info(f"📝 Step 1: Generating summary for event_id: {event_id}")
+        summary = await gpt_service.agenerate_summary(
+            guideline_text, on_partial=partials.callback('summary', 'key_points'),
+        )
+    return {'summary': summary}
+
+
+async def arun_checklist_stage(job, summary):
+    """run_checklist_stage의 비동기 버전"""
+    logger.info(f"📋 Step 2: Generating checklist for event_id: {job.event_id}")
+    async with PartialPublisher(job.event_id) as partials:
+        return await get_gpt_service().agenerate_checklist(
+            summary, on_partial=partials.callback('checklist', 'categories'),
+        )
+
+
+async def arun_revision(job, guideline_text):
+    """
+    run_revision의 비동기 버전 (변경된 섹션만 다시 처리)
+    """
+    base = await sync_to_async(load_revision_base)(job, guideline_text)
+    if base is None:
+        return None
+    previous, diff = base
+
+    if not diff.changes:
+        logger.info(f"♻️ No sections changed since {previous.event_id}, reusing its result")
+        return build_revision_result(previous, diff, None, guideline_text)
+
+    logger.info(f"✏️ Re-processing {diff.changed_sections}/{diff.total_sections} changed sections for event_id: {job.event_id}")
+    async with PartialPublisher(job.event_id) as partials:
+        revision = await get_gpt_service().agenerate_revision(
+            previous.result,
+            diff.changes,
+            on_partial=partials.callback('checklist', 'categories'),
+        )
+    if revision is None:
+        return None
+    return build_revision_result(previous, diff, revision, guideline_text)
+
+
+class PartialPublisher:
+    """
+    스트리밍 부분 결과를 이벤트 루프 밖에서 Redis에 기록
+    GPT 스트림의 on_partial은 동기 콜백이므로 기록을 task로 예약하고(같은 스레드에서 순서대로 실행),
+    블록을 나갈 때 남은 기록을 기다립니다 (작업 완료 시 clear_partial보다 늦게 쓰지 않도록).
+    """
+
+    def __init__(self, event_id):
+        self.event_id = event_id
+        self._pending = set()
+
+    def callback(self, step: str, field: str):
+        def on_partial(items):
+            task = asyncio.ensure_future(sync_to_async(publish_partial)(self.event_id, step, field, items))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        return on_partial
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+class AsyncGuidelineWorker:
+    """
+    Celery 큐의 guideline 작업을 이벤트 루프에서 동시에 처리하는 워커
+
+    메인 스레드는 kombu로 브로커 메시지를 받아 이벤트 루프 스레드에 넘기고,
+    작업이 끝난 메시지를 ACK 합니다 (task_acks_late와 동일한 의미).
+    동시에 처리되는 작업 수는 prefetch_count(= concurrency)로 제한됩니다.
+    """
+
+    def __init__(self, queue_name: str = 'celery', concurrency: int = None):
+        self.queue_name = queue_name
+        self.concurrency = concurrency or getattr(settings, 'ASYNC_WORKER_CONCURRENCY', 50)
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name='async-worker-loop', daemon=True)
+        self._finished = queue.Queue()
+        self._in_flight = 0
+        self._stopping = False
+
+    def run(self):
+        """워커 실행 (SIGINT/SIGTERM 수신 시 진행 중인 작업을 마치고 종료)"""
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        self._loop_thread.start()
+        http_session = asyncio.run_coroutine_threadsafe(self._open_http_session(), self.loop).result()
+        if OPENAI_AVAILABLE:
+            # 이후 제출되는 작업들이 이 컨텍스트를 복사하므로 모든 GPT 호출이 세션을 공유
+            openai.aiosession.set(http_session)
+
+        task_queue = Queue(self.queue_name, Exchange(self.queue_name, type='direct'), routing_key=self.queue_name)
+
+        logger.info(f"🚀 Async worker started (queue={self.queue_name}, concurrency={self.concurrency})")
+        try:
+            with Connection(settings.CELERY_BROKER_URL) as conn:
+                with conn.Consumer(task_queue, callbacks=[self._on_message],
+                                   prefetch_count=self.concurrency, accept=['json']):
+                    while not self._stopping:
+                        try:
+                            conn.drain_events(timeout=0.2)
+                        except socket.timeout:
+                            pass
+                        self._ack_finished()
+
+                    # 진행 중인 작업 완료 대기
+                    logger.info(f"🛑 Waiting for {self._in_flight} in-flight jobs...")
+                    while self._in_flight:
+                        self._ack_finished(block=True)
+        finally:
+            asyncio.run_coroutine_threadsafe(http_session.close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._loop_thread.join()
+            logger.info("👋 Async worker stopped")
+
+    async def _open_http_session(self):
+        connector = aiohttp.TCPConnector(limit=getattr(settings, 'GPT_ASYNC_MAX_CONCURRENCY', 50))
+        return aiohttp.ClientSession(connector=connector)
+
+    def _on_message(self, body, message):
+        task_name = message.headers.get('task') if message.headers else body.get('task')
+        if task_name not in HANDLED_TASKS:
+            logger.error(f"❌ Unsupported task for async worker: {task_name}")
+            message.reject()
+            return
+
+        # Celery 메시지 프로토콜 v2: [args, kwargs, embed] / v1: {'args': ...}
+        args = body[0] if isinstance(body, (list, tuple)) else body.get('args', [])
+        event_id = args[0]
+
+        self._in_flight += 1
+        future = asyncio.run_coroutine_threadsafe(process_guideline_job_async(event_id), self.loop)
+        future.add_done_callback(lambda f: self._finished.put((message, f)))
+
+    def _ack_finished(self, block: bool = False):
+        """완료된 작업의 메시지 ACK (브로커 채널은 메인 스레드에서만 사용)"""
+        while True:
+            try:
+                message, future = self._finished.get(block=block, timeout=1 if block else None)
+            except queue.Empty:
+                return
+
+            if future.exception() is not None:
+                logger.error(f"❌ Async job failed: {future.exception()}")
+            message.ack()
+            self._in_flight -= 1
+            if block:
+                return
+
+    def _request_stop(self, signum, frame):
+        logger.info("🛑 Shutdown requested")
+        self._stopping = True
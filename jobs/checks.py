@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_single_flight_limits(app_configs, **kwargs):
+    """
+    single-flight follower 대기 시간이 단계 task의 soft time limit보다 짧은지 확인
+    길면 follower는 기다리다 SoftTimeLimitExceeded로 실패합니다.
+    (leader lease는 실행 중 heartbeat로 연장되므로 soft time limit과 무관)
+    """
+    soft_limit = settings.GUIDELINE_TASK_SOFT_TIME_LIMIT
+    wait_timeout = settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+    if wait_timeout < soft_limit:
+        return []
+    return [Error(
+        f'SINGLE_FLIGHT_WAIT_TIMEOUT ({wait_timeout}s) must be shorter than '
+        f'GUIDELINE_TASK_SOFT_TIME_LIMIT ({soft_limit}s).',
+        hint='Followers that wait longer are rescheduled with RetryLater instead of holding the worker slot.',
+        id='jobs.E001',
+    )]
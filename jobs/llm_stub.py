@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from aiohttp import web
+
+from .services.chunking import estimate_tokens
+from .services.structured_output import OUTPUT_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+_WORDS = [
+    '코드', '리뷰', '테스트', '커버리지', '문서화', '보안', '성능', '배포', '로그', '예외',
+    '처리', '검증', '규칙', '명명', '함수', '모듈', '의존성', '버전', '설정', '모니터링',
+]
+
+MALFORMED_KINDS = ('truncated', 'trailing_comma', 'prose', 'garbage')
+
+
+class StubConfig(NamedTuple):
+    latency: str = 'lognormal'          # 첫 토큰까지 지연 분포: 'fixed' | 'uniform' | 'lognormal'
+    latency_median: float = 0.8         # 초
+    latency_sigma: float = 0.5          # lognormal: 로그 표준편차, uniform: median 기준 ±비율
+    tokens_per_second: float = 80.0     # 응답 토큰 생성 속도 (0이면 즉시)
+    error_rate: float = 0.0             # 500 응답 비율
+    rate_limit_rate: float = 0.0        # 429 응답 비율
+    retry_after: float = 1.0            # 429 응답의 Retry-After (초)
+    malformed_rate: float = 0.0         # 깨진 JSON 응답 비율
+    seed: int = 0
+
+
+class LLMStubServer:
+    """
+    부하 테스트용 OpenAI 호환 로컬 서버 (GET /v1/models/{model}, POST /v1/chat/completions)
+
+    - 응답 내용은 요청(모델 + 메시지)에서 결정되므로 같은 요청에는 항상 같은 응답
+      (function calling 요청은 함수 파라미터 스키마를, 그 외에는 프롬프트로 추정한 단계 스키마를 채움)
+    - 지연 시간 / 오류 / 429 / 깨진 JSON 주입 여부는 seed 고정 난수열로 결정
+    """
+
+    def __init__(self, config: StubConfig = None):
+        self.config = config or StubConfig()
+        self._faults = random.Random(self.config.seed)
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0, 'malformed': 0}
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/v1/models/{model}', self.retrieve_model)
+        app.router.add_post('/v1/chat/completions', self.chat_completions)
+        app.router.add_get('/stats', self.get_stats)
+        return app
+
+    async def retrieve_model(self, request: web.Request) -> web.Response:
+        model = request.match_info['model']
+        return web.json_response({'id': model, 'object': 'model', 'owned_by': 'stub', 'created': 0})
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats['requests'] += 1
+
+        fault = self._faults.random()
+        if fault < self.config.rate_limit_rate:
+            self.stats['rate_limited'] += 1
+            return self._error(429, 'Rate limit reached (stub)', 'requests',
+                               headers={'Retry-After': f'{self.config.retry_after:g}'})
+        if fault < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats['errors'] += 1
+            await asyncio.sleep(self._first_token_latency())
+            return self._error(500, 'The server had an error while processing your request (stub)', 'server_error')
+
+        function = self._requested_function(body)
+        schema = function['parameters'] if function else OUTPUT_SCHEMAS[infer_kind(body.get('messages', []))]
+        text = json.dumps(sample_from_schema(schema, content_rng(body)), ensure_ascii=False)
+
+        finish_reason = 'function_call' if function else 'stop'
+        if self._faults.random() < self.config.malformed_rate:
+            self.stats['malformed'] += 1
+            kind, text = corrupt_json(text, self._faults)
+            if kind == 'truncated':
+                finish_reason = 'length'
+
+        prompt_tokens = sum(estimate_tokens(m.get('content')) for m in body.get('messages', []))
+        completion_tokens = estimate_tokens(text)
+        latency = self._first_token_latency()
+
+        if body.get('stream'):
+            return await self._stream(request, body, function, text, latency, finish_reason)
+
+        await asyncio.sleep(latency + self._generation_time(completion_tokens))
+        message = {'role': 'assistant', 'content': None if function else text}
+        if function:
+            message['function_call'] = {'name': function['name'], 'arguments': text}
+        return web.json_response({
+            'id': f'chatcmpl-stub-{uuid.uuid4().hex[:12]}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'message': message, 'finish_reason': finish_reason}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    async def _stream(self, request: web.Request, body: Dict[str, Any], function: Optional[Dict[str, Any]],
+                      text: str, latency: float, finish_reason: str) -> web.StreamResponse:
+        """SSE로 토큰 단위 delta 전송 (tokens_per_second 속도)"""
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        await asyncio.sleep(latency)
+
+        completion_id = f'chatcmpl-stub-{uuid.uuid4().hex[:12]}'
+
+        async def send(delta, finish=None):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}],
+            }
+            await response.write(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n'.encode('utf-8'))
+
+        await send({'role': 'assistant', **({'function_call': {'name': function['name'], 'arguments': ''}}
+                                            if function else {'content': ''})})
+        tokens = max(1, estimate_tokens(text))
+        size = math.ceil(len(text) / tokens)
+        interval = self._generation_time(1)
+        for start in range(0, len(text), size):
+            piece = text[start:start + size]
+            await send({'function_call': {'arguments': piece}} if function else {'content': piece})
+            if interval:
+                await asyncio.sleep(interval)
+        await send({}, finish_reason)
+        await response.write(b'data: [DONE]\n\n')
+        await response.write_eof()
+        return response
+
+    def _first_token_latency(self) -> float:
+        config = self.config
+        if config.latency == 'fixed':
+            return config.latency_median
+        if config.latency == 'uniform':
+            spread = config.latency_median * config.latency_sigma
+            return max(0.0, self._faults.uniform(config.latency_median - spread, config.latency_median + spread))
+        return config.latency_median * math.exp(self._faults.gauss(0.0, config.latency_sigma))
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+
+    @staticmethod
+    def _requested_function(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        function_call = body.get('function_call')
+        name = function_call.get('name') if isinstance(function_call, dict) else None
+        for function in body.get('functions') or []:
+            if name is None or function.get('name') == name:
+                return function
+        return None
+
+    @staticmethod
+    def _error(status: int, message: str, error_type: str, headers: Dict[str, str] = None) -> web.Response:
+        return web.json_response(
+            {'error': {'message': message, 'type': error_type, 'param': None, 'code': None}},
+            status=status, headers=headers,
+        )
+
+
+def infer_kind(messages: List[Dict[str, str]]) -> str:
+    """function calling이 아닌 요청에서 프롬프트의 JSON 예시로 단계 추정"""
+    prompt = '\n'.join(message.get('content') or '' for message in messages)
+    if 'removed_categories' in prompt:
+        return 'revision'
+    if '"categories"' in prompt:
+        return 'fused' if '"title"' in prompt else 'checklist'
+    if '이 부분의 주제' in prompt:
+        return 'summary_chunk'
+    return 'summary'
+
+
+def content_rng(body: Dict[str, Any]) -> random.Random:
+    """모델 + 메시지로 시드한 난수 생성기 (같은 요청 → 같은 응답)"""
+    key = json.dumps([body.get('model'), body.get('messages')], sort_keys=True, ensure_ascii=False)
+    return random.Random(int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big'))
+
+
+def sample_from_schema(schema: Dict[str, Any], rng: random.Random, key: str = '') -> Any:
+    """JSON 스키마를 만족하는 결정적 예시 값 생성"""
+    schema_type = schema.get('type')
+    if schema_type == 'object':
+        return {name: sample_from_schema(sub, rng, name) for name, sub in schema.get('properties', {}).items()}
+    if schema_type == 'array':
+        if key == 'removed_categories':
+            return []
+        count = max(schema.get('minItems', 0), rng.randint(2, 4))
+        values = [sample_from_schema(schema.get('items', {}), rng, key) for _ in range(count)]
+        for number, value in enumerate(values, start=1):
+            if isinstance(value, dict) and 'id' in value:
+                value['id'] = number
+        return values
+    if schema_type == 'integer':
+        return rng.randint(schema.get('minimum', 0), 500)
+    if schema_type == 'boolean':
+        return rng.random() < 0.6
+    words = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(3, 8)))
+    if key == 'text':
+        return f'{words} 항목을 확인했는가?'
+    return f'{words}.' if key == 'content' else words
+
+
+def corrupt_json(text: str, rng: random.Random) -> Tuple[str, str]:
+    """실제 모델이 내는 유형의 깨진 JSON 생성 (잘림 / 후행 쉼표 / 설명문 / 무효 텍스트) → (유형, 텍스트)"""
+    kind = rng.choice(MALFORMED_KINDS)
+    if kind == 'truncated':
+        return kind, text[:max(1, int(len(text) * rng.uniform(0.5, 0.95)))]
+    if kind == 'trailing_comma':
+        return kind, text[:-1] + ',}'
+    if kind == 'prose':
+        return kind, f'다음은 요청하신 결과입니다.\n```json\n{text}\n```'
+    return kind, '죄송합니다. 요청을 처리할 수 없습니다.'
+
+
+def run_stub_server(config: StubConfig, host: str = '127.0.0.1', port: int = 8090):
+    """stub 서버 실행 (종료 시까지 블록)"""
+    server = LLMStubServer(config)
+    logger.info(f"🧪 LLM stub 서버 시작: http://{host}:{port}/v1 ({config})")
+    web.run_app(server.build_app(), host=host, port=port, print=None)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from jobs.services.gpt_service import GPTService
+from jobs.services.result_cache import NullResultCache
+
+SIMULATED_RESPONSES = {
+    'summary': {'title': '벤치마크', 'content': '요약', 'key_points': ['a', 'b', 'c'], 'word_count': 100},
+    'checklist': {'categories': [{'name': '기본', 'items': [{'id': 1, 'text': '확인?', 'required': True}]}],
+                  'total_items': 1, 'required_items': 1},
+}
+
+
+class SimulatedLatencyGPTService(GPTService):
+    """고정 지연 후 응답하는 GPTService (네트워크 없이 실행 엔진만 비교)"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.use_fallback = False
+        self.model_name = 'simulated-latency'
+        self._configured = False  # 모델 상태 재확인 생략
+        self.result_cache = NullResultCache()
+
+    def _complete(self, step, model=None):
+        time.sleep(self.latency)
+        return json.dumps(SIMULATED_RESPONSES[step.kind])
+
+    async def _acomplete(self, step, model=None):
+        await asyncio.sleep(self.latency)
+        return json.dumps(SIMULATED_RESPONSES[step.kind])
+
+
+class Command(BaseCommand):
+    help = 'Compare per-process throughput/memory of the prefork (one job at a time) and asyncio execution paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=0.5, help='Simulated seconds per GPT call')
+
+    def handle(self, *args, **options):
+        jobs, concurrency, latency = options['jobs'], options['concurrency'], options['latency']
+        service = SimulatedLatencyGPTService(latency)
+        texts = [f'benchmark guideline #{i}' for i in range(jobs)]
+
+        # prefork: 프로세스당 한 번에 하나의 작업
+        started = time.perf_counter()
+        for text in texts:
+            service.generate_checklist(service.generate_summary(text))
+        sync_elapsed = time.perf_counter() - started
+
+        # asyncio: 하나의 이벤트 루프에서 concurrency 개 작업 동시 진행
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def pipeline(text):
+                async with semaphore:
+                    summary = await service.agenerate_summary(text)
+                    await service.agenerate_checklist(summary)
+
+            await asyncio.gather(*(pipeline(text) for text in texts))
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        asyncio.run(run_all())
+        async_elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        in_flight = min(jobs, concurrency)
+        self.stdout.write(f"jobs={jobs} concurrency={concurrency} latency/call={latency}s")
+        self.stdout.write(f"prefork  : {sync_elapsed:8.2f}s  {jobs / sync_elapsed:8.2f} jobs/s per process")
+        self.stdout.write(f"asyncio  : {async_elapsed:8.2f}s  {jobs / async_elapsed:8.2f} jobs/s per process")
+        self.stdout.write(f"memory   : {peak / 1024:8.1f} KiB peak, {peak / 1024 / in_flight:6.1f} KiB per in-flight job")
@@ -0,0 +1,123 @@
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from avo_api.celery import app
+from jobs.management.commands.benchmark_pipeline_modes import percentile
+from jobs.models import Job
+from jobs.pg_queue import notify_job_queue
+from jobs.pg_worker import PostgresJobWorker
+from jobs.tasks import process_guideline_job
+
+# Celery 경로 측정용 큐 (실행 중인 워커가 가져가지 않도록 분리)
+BENCHMARK_QUEUE = 'benchmark_job_queue'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare enqueue latency and drain throughput of the Celery (Postgres INSERT + Redis publish) '
+        'and Postgres SKIP LOCKED (INSERT + NOTIFY, workers claim rows) job queues. '
+        'Jobs run a no-op body (optionally sleeping --latency) that writes the final state, so only queue '
+        'overhead is measured. Needs Postgres and, for the Celery path, the Redis broker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent consumers per backend')
+        parser.add_argument('--batch-size', type=int, default=10, help='Rows per SKIP LOCKED claim')
+        parser.add_argument('--latency', type=float, default=0.0, help='Simulated seconds of work per job')
+        parser.add_argument('--backend', choices=['both', 'celery', 'postgres'], default='both')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Postgres 데이터베이스에서만 측정할 수 있습니다.')
+        if Job.objects.filter(status__in=['pending', 'processing']).exists():
+            # 측정용 워커가 실제 작업을 claim하지 않도록 비어 있는 대기열에서만 실행
+            raise CommandError('대기 / 처리 중인 작업이 없는 데이터베이스에서 실행하세요.')
+
+        self.latency = options['latency']
+        self.stdout.write(
+            f"jobs={options['jobs']} workers={options['workers']} latency/job={self.latency}s "
+            f"claim batch={options['batch_size']}"
+        )
+        if options['backend'] in ('both', 'celery'):
+            self.report('celery', *self.bench_celery(options['jobs'], options['workers']))
+        if options['backend'] in ('both', 'postgres'):
+            self.report('postgres', *self.bench_postgres(options['jobs'], options['workers'], options['batch_size']))
+
+    def report(self, name, enqueue_ms, elapsed, jobs):
+        self.stdout.write(
+            f"{name:9}: enqueue p50 {percentile(enqueue_ms, 50):6.2f}ms  p99 {percentile(enqueue_ms, 99):6.2f}ms  "
+            f"drain {elapsed:7.2f}s  {jobs / elapsed:8.1f} jobs/s"
+        )
+
+    def finish(self, job_id):
+        """작업 본문 대신 최종 상태만 기록"""
+        if self.latency:
+            time.sleep(self.latency)
+        Job.objects.filter(id=job_id).update(status='completed', updated_at=timezone.now())
+
+    def create_jobs(self, count, enqueue):
+        tenant = f'benchmark-{uuid.uuid4().hex[:8]}'
+        enqueue_ms = []
+        for index in range(count):
+            started = time.perf_counter()
+            job = Job.objects.create(status='pending', guideline_text=f'benchmark #{index}', tenant=tenant)
+            enqueue(job)
+            enqueue_ms.append((time.perf_counter() - started) * 1000)
+        return tenant, enqueue_ms
+
+    def bench_celery(self, count, workers):
+        tenant, enqueue_ms = self.create_jobs(count, lambda job: process_guideline_job.apply_async(
+            args=[str(job.event_id)], queue=BENCHMARK_QUEUE, ignore_result=True,
+        ))
+        remaining = [count]
+        lock = threading.Lock()
+
+        def consume():
+            with app.connection_for_read() as conn:
+                queue = conn.SimpleQueue(BENCHMARK_QUEUE)
+                try:
+                    while True:
+                        with lock:
+                            if remaining[0] <= 0:
+                                return
+                        try:
+                            message = queue.get(timeout=1)
+                        except (queue.Empty, socket.timeout):
+                            continue
+                        # 실제 task처럼 event_id로 작업 조회 후 처리
+                        event_id = message.payload[0][0]
+                        self.finish(Job.objects.only('id').get(event_id=event_id).id)
+                        message.ack()
+                        with lock:
+                            remaining[0] -= 1
+                finally:
+                    queue.close()
+                    connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: consume(), range(workers)))
+        elapsed = time.perf_counter() - started
+        Job.objects.filter(tenant=tenant).delete()
+        return enqueue_ms, elapsed, count
+
+    def bench_postgres(self, count, workers, batch_size):
+        tenant, enqueue_ms = self.create_jobs(count, lambda job: notify_job_queue())
+        worker = PostgresJobWorker(
+            concurrency=workers, batch_size=batch_size, poll_interval=0.1,
+            handler=lambda job: self.finish(job.id),
+        )
+
+        started = time.perf_counter()
+        processed = worker.run(stop_when_idle=True)
+        elapsed = time.perf_counter() - started
+        Job.objects.filter(tenant=tenant).delete()
+        return enqueue_ms, elapsed, processed
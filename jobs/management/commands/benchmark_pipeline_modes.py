@@ -0,0 +1,78 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.services.gpt_service import DEFAULT_GUIDELINE_TEXT, GPTService
+from jobs.services.result_cache import NullResultCache
+
+
+class UsageRecordingGPTService(GPTService):
+    """캐시 없이 실제 API를 호출하고 토큰 사용량을 모드별로 집계하는 GPTService"""
+
+    def __init__(self):
+        super().__init__()
+        self.result_cache = NullResultCache()
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+        self._usage_lock = threading.Lock()
+
+    def _record_usage(self, step, usage):
+        super()._record_usage(step, usage)
+        if usage:
+            with self._usage_lock:
+                for key in self.usage:
+                    self.usage[key] += usage.get(key, 0)
+
+    def take_usage(self):
+        with self._usage_lock:
+            usage, self.usage = self.usage, {key: 0 for key in self.usage}
+        return usage
+
+
+def percentile(values, q):
+    """nearest-rank 백분위수"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Compare latency (p50/p95) and token cost of the two-step and fused GPT pipelines against the real API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10, help='Jobs per mode')
+        parser.add_argument('--file', help='Guideline text file (default: built-in guideline)')
+        parser.add_argument('--prompt-price', type=float, default=0.00015, help='USD per 1K prompt tokens')
+        parser.add_argument('--completion-price', type=float, default=0.0006, help='USD per 1K completion tokens')
+
+    def handle(self, *args, **options):
+        service = UsageRecordingGPTService()
+        if service.use_fallback:
+            raise CommandError('OPENAI_API_KEY 또는 LLM_BACKEND=stub 설정이 필요합니다.')
+
+        text = DEFAULT_GUIDELINE_TEXT
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as f:
+                text = f.read()
+
+        modes = {
+            'two_step': lambda: service.generate_checklist(service.generate_summary(text)),
+            'fused': lambda: service.generate_fused(text),
+        }
+
+        self.stdout.write(f"model={service.model_name} runs={options['runs']}")
+        for mode, run in modes.items():
+            latencies = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                run()
+                latencies.append(time.perf_counter() - started)
+            usage = service.take_usage()
+
+            prompt = usage['prompt_tokens'] / options['runs']
+            completion = usage['completion_tokens'] / options['runs']
+            cost = prompt / 1000 * options['prompt_price'] + completion / 1000 * options['completion_price']
+            self.stdout.write(
+                f"{mode:9}: p50 {percentile(latencies, 50):6.2f}s  p95 {percentile(latencies, 95):6.2f}s  "
+                f"tokens/job {prompt:7.0f} prompt + {completion:6.0f} completion  ${cost:.5f}/job"
+            )
@@ -0,0 +1,61 @@
+import random
+import time
+from array import array
+
+from django.core.management.base import BaseCommand
+
+from common.utils import get_redis
+from jobs.services.gpt_service import DEFAULT_GUIDELINE_TEXT
+from jobs.services.similarity_index import NUM_PERM, SimilarityIndex, minhash
+
+BENCH_NAMESPACE = 'simindex-bench'
+
+
+class Command(BaseCommand):
+    help = 'Fill a separate similarity index namespace with N signatures and measure lookup latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=100000, help='Stored documents (random signatures)')
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--batch', type=int, default=1000, help='Documents per Redis pipeline')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark keys afterwards')
+
+    def handle(self, *args, **options):
+        redis = get_redis()
+        index = SimilarityIndex(namespace=BENCH_NAMESPACE)
+        rng = random.Random(0)
+
+        # 저장: 무작위 서명 (실제 문서처럼 밴드가 거의 겹치지 않음)
+        started = time.perf_counter()
+        for offset in range(0, options['docs'], options['batch']):
+            pipe = redis.pipeline(transaction=False)
+            for doc in range(offset, min(offset + options['batch'], options['docs'])):
+                signature = [rng.getrandbits(32) for _ in range(NUM_PERM)]
+                pipe.set(index._sig_key(f'doc-{doc}'), array('I', signature).tobytes())
+                for band_key in index._band_keys(signature):
+                    pipe.sadd(band_key, f'doc-{doc}')
+            pipe.execute()
+        self.stdout.write(f"indexed {options['docs']} docs in {time.perf_counter() - started:.1f}s")
+
+        # 근사 중복 하나를 저장해 두고, 항목 하나를 고친 문서로 조회
+        index.add('near-duplicate', DEFAULT_GUIDELINE_TEXT)
+        query = DEFAULT_GUIDELINE_TEXT.replace('80%', '85%')
+        signature = minhash(query)
+
+        latencies = []
+        for _ in range(options['queries']):
+            started = time.perf_counter()
+            match = index.lookup(query, signature=signature)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+
+        self.stdout.write(f"match={match}")
+        self.stdout.write(
+            f"lookup   : p50 {latencies[len(latencies) // 2]:.2f}ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}ms  "
+            f"(signature {NUM_PERM} perms, computed once)"
+        )
+
+        if not options['keep']:
+            for key in redis.scan_iter(f'{BENCH_NAMESPACE}:*', count=10000):
+                redis.unlink(key)
@@ -0,0 +1,107 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.management.commands.benchmark_pipeline_modes import percentile
+
+_WORDS = [
+    '코드', '리뷰', '테스트', '커버리지', '문서화', '보안', '성능', '배포', '로그', '예외', '처리', '검증',
+    '규칙', '명명', '함수', '모듈', '의존성', '버전', '설정', '모니터링', '캐시', '인덱스', '트랜잭션', '권한',
+]
+
+
+def synthetic_guideline(rng: random.Random, sections: int = 5) -> str:
+    """작업마다 다른 가이드라인 생성 (결과 캐시 / 유사 문서 재사용에 걸리지 않도록)"""
+    lines = [f"# {' '.join(rng.choices(_WORDS, k=3))} 가이드라인", '']
+    for number in range(1, sections + 1):
+        lines.append(f"## {number}. {' '.join(rng.choices(_WORDS, k=2))}")
+        lines.extend(f"- {' '.join(rng.choices(_WORDS, k=8))}" for _ in range(4))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = (
+        'Submit N jobs to a running web server and poll them to completion, reporting end-to-end latency '
+        '(web -> outbox relay -> Redis -> worker -> Postgres). Run workers with LLM_BACKEND=stub against run_llm_stub.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000/api', help='API base URL')
+        parser.add_argument('--jobs', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent submitting/polling clients')
+        parser.add_argument('--mode', choices=['two_step', 'fused'], default=None)
+        parser.add_argument('--tenant', default=None, help='X-Tenant-ID header (fair-share scheduling, a tenant in JOB_TENANT_WEIGHTS)')
+        parser.add_argument('--priority', choices=['high', 'normal', 'low'], default=None)
+        parser.add_argument('--same-text', action='store_true',
+                            help='Submit the built-in guideline for every job (exercises dedup/caching)')
+        parser.add_argument('--poll-interval', type=float, default=0.5)
+        parser.add_argument('--timeout', type=float, default=600, help='Per-job seconds before giving up')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        rng = random.Random(options['seed'])
+        bodies = []
+        for _ in range(options['jobs']):
+            body = {} if options['same_text'] else {'text': synthetic_guideline(rng)}
+            if options['mode']:
+                body['mode'] = options['mode']
+            if options['priority']:
+                body['priority'] = options['priority']
+            bodies.append(body)
+
+        session = requests.Session()
+        session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=options['concurrency']))
+        if options['tenant']:
+            session.headers['X-Tenant-ID'] = options['tenant']
+        submit_ms, latencies, failures = [], [], []
+        lock = threading.Lock()
+
+        def run(body):
+            started = time.perf_counter()
+            response = session.post(f'{base}/jobs', json=body, timeout=30)
+            submitted = time.perf_counter()
+            if response.status_code != 201:
+                with lock:
+                    failures.append(f'submit {response.status_code}')
+                return
+            event_id = response.json()['event_id']
+
+            while time.perf_counter() - started < options['timeout']:
+                time.sleep(options['poll_interval'])
+                job_status = session.get(f'{base}/jobs/{event_id}', timeout=30).json().get('status')
+                if job_status in ('completed', 'failed'):
+                    with lock:
+                        submit_ms.append((submitted - started) * 1000)
+                        if job_status == 'completed':
+                            latencies.append(time.perf_counter() - started)
+                        else:
+                            failures.append(event_id)
+                    return
+            with lock:
+                failures.append(f'timeout {event_id}')
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                list(pool.map(run, bodies))
+        except requests.RequestException as e:
+            raise CommandError(f'API 호출 실패: {e}')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"jobs={options['jobs']} completed={len(latencies)} failed={len(failures)} "
+            f"elapsed={elapsed:.1f}s throughput={len(latencies) / elapsed:.2f} jobs/s"
+        )
+        if submit_ms:
+            self.stdout.write(f"submit : p50 {percentile(submit_ms, 50):7.1f}ms  p99 {percentile(submit_ms, 99):7.1f}ms")
+        if latencies:
+            self.stdout.write(
+                f"e2e    : p50 {percentile(latencies, 50):7.2f}s  p95 {percentile(latencies, 95):7.2f}s  "
+                f"p99 {percentile(latencies, 99):7.2f}s"
+            )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from jobs.async_worker import AsyncGuidelineWorker
+
+
+class Command(BaseCommand):
+    help = 'Run guideline jobs concurrently on an asyncio event loop (alternative to the prefork Celery worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', default='celery', help='Celery queue to consume')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Max in-flight jobs (default: ASYNC_WORKER_CONCURRENCY)')
+
+    def handle(self, *args, **options):
+        AsyncGuidelineWorker(
+            queue_name=options['queue'],
+            concurrency=options['concurrency'],
+        ).run()
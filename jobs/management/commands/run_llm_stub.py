@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from jobs.llm_stub import StubConfig, run_stub_server
+
+
+class Command(BaseCommand):
+    help = 'Run a deterministic OpenAI-compatible stub server for load tests (use with LLM_BACKEND=stub)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        parser.add_argument('--latency', choices=['fixed', 'uniform', 'lognormal'], default='lognormal',
+                            help='Time-to-first-token distribution')
+        parser.add_argument('--latency-median', type=float, default=0.8, help='Seconds')
+        parser.add_argument('--latency-sigma', type=float, default=0.5,
+                            help='lognormal: log-space stddev, uniform: +/- fraction of the median')
+        parser.add_argument('--tokens-per-second', type=float, default=80.0, help='0 = no generation delay')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 500 responses')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of 429 responses')
+        parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+        parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fraction of broken JSON responses')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        config = StubConfig(
+            latency=options['latency'],
+            latency_median=options['latency_median'],
+            latency_sigma=options['latency_sigma'],
+            tokens_per_second=options['tokens_per_second'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            malformed_rate=options['malformed_rate'],
+            seed=options['seed'],
+        )
+        self.stdout.write(f"LLM stub listening on http://{options['host']}:{options['port']}/v1")
+        run_stub_server(config, host=options['host'], port=options['port'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = 'Publish jobs recorded in the dispatch outbox to the broker in pipelined batches (JOB_DISPATCH_OUTBOX)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Max outbox rows per claim / publish (default: JOB_OUTBOX_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        OutboxRelay(batch_size=options['batch_size']).run()
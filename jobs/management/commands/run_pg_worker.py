@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.pg_worker import PostgresJobWorker
+
+
+class Command(BaseCommand):
+    help = 'Run guideline jobs by claiming pending Job rows with FOR UPDATE SKIP LOCKED (JOB_QUEUE_BACKEND=postgres)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Jobs run at once (default: PG_WORKER_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Max rows per claim query (default: JOB_QUEUE_CLAIM_BATCH)')
+
+    def handle(self, *args, **options):
+        PostgresJobWorker(
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+        ).run()
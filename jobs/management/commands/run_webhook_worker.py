@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs.webhook_worker import WebhookWorker
+
+
+class Command(BaseCommand):
+    help = 'Deliver completion webhooks (callback_url) over pooled keep-alive connections, with retries and a dead-letter table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Max concurrent requests (default: WEBHOOK_CONCURRENCY)')
+        parser.add_argument('--per-host', type=int, default=None,
+                            help='Max keep-alive connections per destination host (default: WEBHOOK_MAX_CONNECTIONS_PER_HOST)')
+
+    def handle(self, *args, **options):
+        WebhookWorker(concurrency=options['concurrency'], per_host=options['per_host']).run()
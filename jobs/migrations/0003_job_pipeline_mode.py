@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pipeline_mode',
+            field=models.CharField(blank=True, choices=[('two_step', '2단계 (요약 → 체크리스트)'), ('fused', '단일 호출')], max_length=20, null=True, verbose_name='GPT 처리 방식'),
+        ),
+    ]
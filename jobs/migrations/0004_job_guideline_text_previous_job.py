@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_pipeline_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='guideline_text',
+            field=models.TextField(blank=True, null=True, verbose_name='가이드라인 본문'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='previous_job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revisions', to='jobs.job', verbose_name='이전 버전 작업'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_guideline_text_previous_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='batch_id',
+            field=models.UUIDField(blank=True, null=True, verbose_name='일괄 등록 ID'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['batch_id', 'status'], name='jobs_batch_status_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.CharField(choices=[('high', '높음 (대화형)'), ('normal', '보통'), ('low', '낮음 (일괄 / 백필)')], default='normal', max_length=10, verbose_name='우선순위'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='tenant',
+            field=models.CharField(default='default', max_length=64, verbose_name='테넌트'),
+        ),
+    ]
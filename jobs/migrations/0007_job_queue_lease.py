@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_tenant_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='처리 시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='처리 lease 만료 / 재시도 가능 시각'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['priority', 'created_at'], name='jobs_pending_claim_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'processing')), fields=['leased_until'], name='jobs_processing_lease_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_queue_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='발행 시도 횟수')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='발행 가능 시각')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='마지막 발행 오류')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일시')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job', verbose_name='작업')),
+            ],
+            options={
+                'verbose_name': 'Job outbox',
+                'verbose_name_plural': 'Job outbox',
+                'db_table': 'jobs_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['available_at', 'id'], name='jobs_outbox_available_idx')],
+            },
+        ),
+    ]
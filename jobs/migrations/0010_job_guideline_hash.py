@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='guideline_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='가이드라인 문서 해시 (blob 저장소 sha256)'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_guideline_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='callback_batch',
+            field=models.BooleanField(default=False, verbose_name='웹훅 묶음 전송 허용'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='callback_url',
+            field=models.URLField(blank=True, max_length=2048, null=True, verbose_name='완료 웹훅 URL'),
+        ),
+        migrations.CreateModel(
+            name='WebhookDeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048, verbose_name='웹훅 URL')),
+                ('payload', models.JSONField(blank=True, null=True, verbose_name='마지막 전송 본문')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='전송 시도 횟수')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='마지막 전송 오류')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일시')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job', verbose_name='작업')),
+            ],
+            options={
+                'verbose_name': 'Webhook dead letter',
+                'verbose_name_plural': 'Webhook dead letters',
+                'db_table': 'jobs_webhook_dead_letter',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048, verbose_name='웹훅 URL')),
+                ('batch', models.BooleanField(default=False, verbose_name='묶음 전송 허용')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='전송 시도 횟수')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='다음 전송 시각')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='마지막 전송 오류')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일시')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job', verbose_name='작업')),
+            ],
+            options={
+                'verbose_name': 'Webhook delivery',
+                'verbose_name_plural': 'Webhook deliveries',
+                'db_table': 'jobs_webhook_delivery',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['next_attempt_at', 'id'], name='jobs_webhook_due_idx')],
+            },
+        ),
+    ]
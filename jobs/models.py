@@ -1,7 +1,10 @@
 import uuid
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from .services.blob_store import BlobStore
+
 
 class Job(models.Model):
     STATUS_CHOICES = [
@@ -11,6 +14,17 @@ class Job(models.Model):
         ('failed', '실패'),
     ]
     
+    PIPELINE_MODE_CHOICES = [
+        ('two_step', '2단계 (요약 → 체크리스트)'),
+        ('fused', '단일 호출'),
+    ]
+    
+    PRIORITY_CHOICES = [
+        ('high', '높음 (대화형)'),
+        ('normal', '보통'),
+        ('low', '낮음 (일괄 / 백필)'),
+    ]
+    
     event_id = models.UUIDField(
         default=uuid.uuid4,
         unique=True,
@@ -31,6 +45,85 @@ class Job(models.Model):
         verbose_name='상태 메시지'
     )
     
+    pipeline_mode = models.CharField(
+        max_length=20,
+        choices=PIPELINE_MODE_CHOICES,
+        null=True,
+        blank=True,
+        verbose_name='GPT 처리 방식'
+    )
+    
+    guideline_text = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='가이드라인 본문'
+    )
+    
+    guideline_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name='가이드라인 문서 해시 (blob 저장소 sha256)'
+    )
+    
+    previous_job = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='revisions',
+        verbose_name='이전 버전 작업'
+    )
+    
+    batch_id = models.UUIDField(
+        null=True,
+        blank=True,
+        verbose_name='일괄 등록 ID'
+    )
+    
+    tenant = models.CharField(
+        max_length=64,
+        default='default',
+        verbose_name='테넌트'
+    )
+    
+    priority = models.CharField(
+        max_length=10,
+        choices=PRIORITY_CHOICES,
+        default='normal',
+        verbose_name='우선순위'
+    )
+    
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name='멱등성 키 (Idempotency-Key 헤더)'
+    )
+    
+    callback_url = models.URLField(
+        max_length=2048,
+        null=True,
+        blank=True,
+        verbose_name='완료 웹훅 URL'
+    )
+    
+    callback_batch = models.BooleanField(
+        default=False,
+        verbose_name='웹훅 묶음 전송 허용'
+    )
+    
+    leased_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='처리 lease 만료 / 재시도 가능 시각'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='처리 시도 횟수'
+    )
+    
     result = models.JSONField(
         null=True,
         blank=True,
@@ -52,10 +145,183 @@ class Job(models.Model):
         verbose_name = 'Job'
         verbose_name_plural = 'Jobs'
         ordering = ['-created_at']
+        indexes = [
+            # 일괄 등록 상태 집계 (batch_id로 찾고 status로 묶음)
+            models.Index(fields=['batch_id', 'status'], name='jobs_batch_status_idx'),
+            # Postgres 큐 백엔드: 대기 작업 claim / 만료된 lease 회수
+            models.Index(fields=['priority', 'created_at'], name='jobs_pending_claim_idx',
+                         condition=models.Q(status='pending')),
+            models.Index(fields=['leased_until'], name='jobs_processing_lease_idx',
+                         condition=models.Q(status='processing')),
+        ]
+        constraints = [
+            # 같은 테넌트의 같은 Idempotency-Key로는 작업이 하나만 생성됨 (동시 재시도 포함)
+            models.UniqueConstraint(fields=['tenant', 'idempotency_key'], name='jobs_tenant_idempotency_key_uniq',
+                                    condition=models.Q(idempotency_key__isnull=False)),
+        ]
 
     def __str__(self):
         return f"Job {self.event_id} - {self.get_status_display()}"
     
     @property
     def is_completed(self):
-        return self.status in ['completed', 'failed']
\ No newline at end of file
+        return self.status in ['completed', 'failed']
+    
+    def get_guideline_text(self):
+        """가이드라인 본문 (업로드 / 큰 문서는 blob 저장소에서 읽음, 없으면 None)"""
+        if self.guideline_hash:
+            return BlobStore().read_text(self.guideline_hash)
+        return self.guideline_text
+    
+    def get_pipeline_mode(self):
+        """작업별 지정이 없으면 설정(GPT_PIPELINE_MODE)의 처리 방식 사용"""
+        return self.pipeline_mode or getattr(settings, 'GPT_PIPELINE_MODE', 'two_step')
+
+class JobOutbox(models.Model):
+    """
+    발행 대기 중인 작업 (transactional outbox)
+    Job INSERT와 같은 트랜잭션에 기록되고, run_outbox_relay가 브로커에 발행한 뒤 삭제합니다.
+    """
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='작업'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='발행 시도 횟수'
+    )
+    
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='발행 가능 시각'
+    )
+    
+    last_error = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='마지막 발행 오류'
+    )
+    
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='생성일시'
+    )
+
+    class Meta:
+        db_table = 'jobs_outbox'
+        verbose_name = 'Job outbox'
+        verbose_name_plural = 'Job outbox'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='jobs_outbox_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.job_id} (attempts={self.attempts})"
+
+
+class WebhookDelivery(models.Model):
+    """
+    보낼 완료 웹훅 (종료 상태가 Postgres에 기록될 때 같은 트랜잭션에서 생성)
+    웹훅 워커가 claim(FOR UPDATE SKIP LOCKED)하여 보내고, 성공하면 삭제합니다.
+    """
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='작업'
+    )
+    
+    url = models.URLField(
+        max_length=2048,
+        verbose_name='웹훅 URL'
+    )
+    
+    batch = models.BooleanField(
+        default=False,
+        verbose_name='묶음 전송 허용'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='전송 시도 횟수'
+    )
+    
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='다음 전송 시각'
+    )
+    
+    last_error = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='마지막 전송 오류'
+    )
+    
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='생성일시'
+    )
+
+    class Meta:
+        db_table = 'jobs_webhook_delivery'
+        verbose_name = 'Webhook delivery'
+        verbose_name_plural = 'Webhook deliveries'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], name='jobs_webhook_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Webhook {self.job_id} → {self.url} (attempts={self.attempts})"
+
+
+class WebhookDeadLetter(models.Model):
+    """
+    WEBHOOK_MAX_ATTEMPTS번 보내지 못한 웹훅 (마지막으로 보낸 본문과 오류 보관)
+    """
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='작업'
+    )
+    
+    url = models.URLField(
+        max_length=2048,
+        verbose_name='웹훅 URL'
+    )
+    
+    payload = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='마지막 전송 본문'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='전송 시도 횟수'
+    )
+    
+    last_error = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name='마지막 전송 오류'
+    )
+    
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='생성일시'
+    )
+
+    class Meta:
+        db_table = 'jobs_webhook_dead_letter'
+        verbose_name = 'Webhook dead letter'
+        verbose_name_plural = 'Webhook dead letters'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Dead webhook {self.job_id} → {self.url}"
@@ -0,0 +1,139 @@
+import logging
+import signal
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from common import metrics
+from .models import JobOutbox
+from .pg_queue import PgListener, get_job_queue_backend, notify_job_queue
+from .tasks import enqueue_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def outbox_enabled():
+    """요청은 outbox 행만 기록하고 relay가 발행 (Postgres 큐 백엔드는 Job 행이 곧 대기열이라 불필요)"""
+    return getattr(settings, 'JOB_DISPATCH_OUTBOX', True) and get_job_queue_backend() == 'celery'
+
+
+def submit_jobs(jobs):
+    """
+    새 작업 발행 예약 - Job INSERT와 같은 트랜잭션 안에서 호출
+    outbox를 쓰면 요청은 브로커 / Redis를 건드리지 않고 outbox 행과 NOTIFY만 기록합니다.
+    """
+    if not outbox_enabled():
+        transaction.on_commit(lambda: enqueue_jobs(jobs))
+        return
+    JobOutbox.objects.bulk_create(
+        [JobOutbox(job=job) for job in jobs],
+        batch_size=getattr(settings, 'JOB_BATCH_INSERT_SIZE', 1000),
+    )
+    notify_job_queue(settings.JOB_OUTBOX_CHANNEL)
+
+
+def retry_delay(attempts: int) -> float:
+    """발행 실패 후 다음 시도까지 대기 시간 (지수 백오프, JOB_OUTBOX_MAX_BACKOFF 상한)"""
+    return min(getattr(settings, 'JOB_OUTBOX_MAX_BACKOFF', 60), 2 ** max(attempts - 1, 0))
+
+
+def relay_outbox(batch_size: int = None) -> int:
+    """
+    발행 가능한 outbox 행을 최대 batch_size개 claim(FOR UPDATE SKIP LOCKED)하여 발행
+    공정 스케줄러 대기열에 들어가면 (실행 슬롯 발행 성공 여부와 관계없이) 행을 삭제하고,
+    실패하면 묶음 전체를 백오프 후 다시 시도합니다 (이미 대기열에 들어간 작업은 다시 들어가지 않음).
+    발행 후 삭제 전에 relay가 죽으면 다시 발행될 수 있으므로 (at-least-once)
+    task는 이미 끝난 / 체크포인트된 단계를 건너뜁니다.
+    반환값: 처리한 행 수 (발행 실패 포함)
+    """
+    batch_size = batch_size or getattr(settings, 'JOB_OUTBOX_BATCH_SIZE', 500)
+    with transaction.atomic():
+        entries = list(
+            JobOutbox.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(available_at__lte=timezone.now())
+            .select_related('job')
+            .order_by('id')[:batch_size]
+        )
+        if not entries:
+            return 0
+        ids = [entry.id for entry in entries]
+        try:
+            enqueue_jobs([entry.job for entry in entries], fifo_fallback=False)
+        except Exception as e:
+            attempts = max(entry.attempts for entry in entries) + 1
+            delay = retry_delay(attempts)
+            logger.error(f"❌ Outbox publish failed ({len(entries)} jobs), retrying in {delay:.0f}s: {e}")
+            JobOutbox.objects.filter(id__in=ids).update(
+                attempts=F('attempts') + 1,
+                available_at=timezone.now() + timedelta(seconds=delay),
+                last_error=str(e)[:1000],
+            )
+            metrics.incr('outbox.publish_failed', len(entries))
+            return len(entries)
+        JobOutbox.objects.filter(id__in=ids).delete()
+
+    now = timezone.now()
+    metrics.incr('outbox.published', len(entries))
+    for entry in entries:
+        metrics.observe('outbox.lag_seconds', (now - entry.created_at).total_seconds())
+    return len(entries)
+
+
+class OutboxRelay:
+    """
+    outbox를 비우는 발행 프로세스 (python manage.py run_outbox_relay)
+
+    가득 찬 묶음을 발행했으면 바로 다음 묶음을, 아니면 outbox 채널의 NOTIFY
+    (Postgres가 아니면 poll_interval)를 기다립니다. 여러 개를 띄워도 SKIP LOCKED로 나눠 가집니다.
+    """
+
+    def __init__(self, batch_size: int = None, poll_interval: float = None):
+        self.batch_size = batch_size or getattr(settings, 'JOB_OUTBOX_BATCH_SIZE', 500)
+        self.poll_interval = poll_interval or getattr(settings, 'JOB_OUTBOX_POLL_INTERVAL', 1.0)
+        self._listener = PgListener(settings.JOB_OUTBOX_CHANNEL)
+        self._stopping = False
+        self.relayed = 0
+
+    def run(self, stop_when_empty: bool = False):
+        """relay 실행 (SIGINT/SIGTERM 수신 시 진행 중인 묶음을 마치고 종료)"""
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[signum] = signal.signal(signum, self._request_stop)
+
+        logger.info(f"🚀 Outbox relay started (batch={self.batch_size})")
+        try:
+            while not self._stopping:
+                count = self._relay()
+                self.relayed += count
+                if count >= self.batch_size:
+                    continue
+                if stop_when_empty and not count:
+                    break
+                self._listener.wait(self.poll_interval)
+        finally:
+            self._listener.close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        logger.info(f"👋 Outbox relay stopped ({self.relayed} jobs relayed)")
+        return self.relayed
+
+    def _relay(self):
+        try:
+            self._listener.listen()
+            return relay_outbox(self.batch_size)
+        except DatabaseError as e:
+            logger.error(f"❌ Outbox claim failed, reconnecting: {e}")
+            self._listener.reset()
+            connection.close()
+            time.sleep(min(self.poll_interval, 1.0))
+            return 0
+
+    def _request_stop(self, signum, frame):
+        logger.info("🛑 Shutdown requested")
+        self._stopping = True
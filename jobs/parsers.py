@@ -0,0 +1,43 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import BaseParser
+
+from .services.blob_store import BlobStore, DocumentTooLarge, InvalidDocument
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = '문서가 너무 큽니다.'
+    default_code = 'payload_too_large'
+
+
+def spool_document(stream, encoding=None):
+    """
+    업로드 스트림을 풀어 임시 파일에 저장 (잘못된 압축은 400, 크기 초과는 413)
+    blob 저장소에는 요청 검증이 끝난 뒤 store_guideline이 넣습니다.
+    """
+    try:
+        return BlobStore().spool(stream, encoding)
+    except DocumentTooLarge as e:
+        raise PayloadTooLarge(str(e))
+    except InvalidDocument as e:
+        raise ParseError(str(e))
+
+
+class DocumentParser(BaseParser):
+    """
+    가이드라인 문서를 본문 그대로 받음 (옵션은 ?mode=&previous_event_id=&priority=)
+    Content-Encoding(gzip / zstd)을 풀면서 임시 파일에 스트리밍으로 저장하고 {'document': SpooledDocument} 반환
+    """
+    media_type = 'text/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            raise ParseError('문서 본문이 비어 있습니다.')
+        request = parser_context['request']
+        return {'document': spool_document(stream, request.META.get('HTTP_CONTENT_ENCODING'))}
+
+
+class BinaryDocumentParser(DocumentParser):
+    """application/octet-stream 본문 (압축 파일 그대로 올릴 때)"""
+    media_type = 'application/octet-stream'
@@ -0,0 +1,146 @@
+import logging
+import select
+import time
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .webhooks import schedule_webhooks
+
+logger = logging.getLogger(__name__)
+
+# 먼저 claim하는 우선순위 순서
+CLAIM_ORDER = [priority for priority, _ in Job.PRIORITY_CHOICES]
+
+
+def get_job_queue_backend():
+    """작업 큐 백엔드: celery (Redis 브로커) | postgres (Job 행을 워커가 직접 claim)"""
+    return getattr(settings, 'JOB_QUEUE_BACKEND', 'celery')
+
+
+def notify_job_queue(channel: str = None):
+    """대기 중인 Postgres 워커 깨우기 (커밋 후 전달되는 NOTIFY, Postgres가 아니면 무시)"""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [channel or settings.JOB_QUEUE_CHANNEL, ''])
+
+
+class PgListener:
+    """
+    현재 스레드의 DB 연결로 채널을 LISTEN 하고 NOTIFY를 기다림
+    Postgres가 아니면 wait()는 timeout만큼 대기합니다.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.listening = False
+
+    def listen(self):
+        if self.listening or connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {connection.ops.quote_name(self.channel)}')
+        self.listening = True
+
+    def wait(self, timeout: float) -> bool:
+        """NOTIFY를 받으면 True (timeout이면 False)"""
+        if not self.listening:
+            time.sleep(timeout)
+            return False
+        pg = connection.connection
+        if not select.select([pg], [], [], timeout)[0]:
+            return False
+        pg.poll()
+        received = bool(pg.notifies)
+        pg.notifies.clear()
+        return received
+
+    def reset(self):
+        """연결이 끊겼을 때 다음 listen()에서 다시 LISTEN"""
+        self.listening = False
+
+    def close(self):
+        if self.listening:
+            with connection.cursor() as cursor:
+                cursor.execute(f'UNLISTEN {connection.ops.quote_name(self.channel)}')
+            self.listening = False
+
+
+def claim_jobs(limit: int, lease: int = None) -> List[Job]:
+    """
+    대기 중인 작업을 최대 limit개 claim (우선순위 → 생성 순)
+    SELECT ... FOR UPDATE SKIP LOCKED로 다른 워커가 잡은 행은 건너뛰고,
+    processing + lease 만료 시각을 기록합니다. 재시도 대기 중인 작업(leased_until > now)은 제외합니다.
+    """
+    lease = lease or getattr(settings, 'JOB_QUEUE_LEASE', 600)
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        for priority in CLAIM_ORDER:
+            remaining = limit - len(claimed)
+            if remaining <= 0:
+                break
+            claimed += list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', priority=priority)
+                .filter(Q(leased_until__isnull=True) | Q(leased_until__lte=now))
+                .order_by('created_at')[:remaining]
+            )
+        if not claimed:
+            return []
+
+        leased_until = now + timedelta(seconds=lease)
+        Job.objects.filter(id__in=[job.id for job in claimed]).update(
+            status='processing', leased_until=leased_until, attempts=F('attempts') + 1, updated_at=now,
+        )
+    for job in claimed:
+        job.status, job.leased_until, job.attempts = 'processing', leased_until, job.attempts + 1
+    return claimed
+
+
+def renew_leases(event_ids: List[str], lease: int = None) -> int:
+    """실행 중인 작업의 lease 연장 (UPDATE 1회)"""
+    if not event_ids:
+        return 0
+    lease = lease or getattr(settings, 'JOB_QUEUE_LEASE', 600)
+    return Job.objects.filter(event_id__in=event_ids, status='processing').update(
+        leased_until=timezone.now() + timedelta(seconds=lease)
+    )
+
+
+def requeue_expired_jobs(max_attempts: int = None) -> int:
+    """
+    lease가 만료된 작업(워커 유실) 회수
+    시도 횟수를 다 쓴 작업은 실패 처리하고 나머지는 다시 대기열로 돌립니다.
+    """
+    max_attempts = max_attempts or settings.GPT_RATE_LIMIT_MAX_RETRIES + 1
+    now = timezone.now()
+    expired = Job.objects.filter(status='processing', leased_until__lt=now)
+    with transaction.atomic():
+        exhausted = list(
+            expired.filter(attempts__gte=max_attempts).select_for_update(skip_locked=True)
+            .only('id', 'callback_url', 'callback_batch')
+        )
+        failed = Job.objects.filter(id__in=[job.id for job in exhausted]).update(
+            status='failed', leased_until=None, updated_at=now,
+            result={'error': '작업 lease가 만료되었습니다 (시도 횟수 초과).', 'failed_at': now.isoformat()},
+        )
+        schedule_webhooks(exhausted)
+    requeued = expired.update(status='pending', leased_until=None, updated_at=now)
+    if failed or requeued:
+        logger.warning(f"♻️ Recovered expired job leases: {requeued} requeued, {failed} failed")
+    return requeued
+
+
+def retry_job_later(event_id, delay: float, message: str):
+    """작업을 delay초 뒤에 다시 claim되도록 대기열로 돌림"""
+    Job.objects.filter(event_id=event_id).update(
+        status='pending', message=message, updated_at=timezone.now(),
+        leased_until=timezone.now() + timedelta(seconds=delay),
+    )
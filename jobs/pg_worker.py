@@ -0,0 +1,157 @@
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .pg_queue import PgListener, claim_jobs, renew_leases, requeue_expired_jobs, retry_job_later
+from .services.exceptions import RetryLater
+from .services.gpt_service import DEFAULT_GUIDELINE_TEXT
+from .tasks import SUMMARY_STEP, build_checklist_for_job, mark_job_failed, summarize_job
+
+logger = logging.getLogger(__name__)
+
+
+def run_claimed_job(job):
+    """
+    claim한 작업을 이 프로세스에서 끝까지 실행 (체크포인트에 없는 단계만)
+    RetryLater는 회복 시점 이후 다시 claim되도록 대기열로 돌립니다.
+    """
+    event_id = str(job.event_id)
+    guideline_text = job.get_guideline_text() or DEFAULT_GUIDELINE_TEXT
+    try:
+        if SUMMARY_STEP not in (job.result or {}).get('steps_completed', []):
+            summarize_job(job, guideline_text)
+        if not job.is_completed:
+            build_checklist_for_job(job, guideline_text)
+    except RetryLater as exc:
+        if job.attempts > settings.GPT_RATE_LIMIT_MAX_RETRIES:
+            mark_job_failed(event_id, exc)
+            return
+        logger.warning(f"⏳ {type(exc).__name__}, requeueing event_id: {event_id} in {exc.retry_after:.1f}s")
+        retry_job_later(event_id, exc.retry_after, str(exc))
+    except Exception as exc:
+        mark_job_failed(event_id, exc)
+
+
+class PostgresJobWorker:
+    """
+    Job 테이블을 큐로 사용하는 워커 (JOB_QUEUE_BACKEND=postgres)
+
+    메인 스레드가 빈 슬롯만큼 pending 행을 묶음으로 claim(FOR UPDATE SKIP LOCKED)하여
+    스레드 풀에서 실행합니다. 가져갈 작업이 없으면 LISTEN 중인 채널의 NOTIFY를 기다리고,
+    실행 중인 작업의 lease는 주기적으로 연장하며 만료된 lease(다른 워커 유실)는 회수합니다.
+    """
+
+    def __init__(self, concurrency: int = None, batch_size: int = None, poll_interval: float = None,
+                 handler=None):
+        self.concurrency = concurrency or getattr(settings, 'PG_WORKER_CONCURRENCY', 8)
+        self.batch_size = batch_size or getattr(settings, 'JOB_QUEUE_CLAIM_BATCH', 10)
+        self.poll_interval = poll_interval or getattr(settings, 'JOB_QUEUE_POLL_INTERVAL', 5.0)
+        self.lease = getattr(settings, 'JOB_QUEUE_LEASE', 600)
+        self.handler = handler or run_claimed_job
+        self._running = set()
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Event()
+        self._listener = PgListener(settings.JOB_QUEUE_CHANNEL)
+        self._stopping = False
+        self.processed = 0
+
+    def run(self, stop_when_idle: bool = False):
+        """
+        워커 실행 (SIGINT/SIGTERM 수신 시 진행 중인 작업을 마치고 종료)
+        stop_when_idle이면 가져갈 작업과 실행 중인 작업이 모두 없을 때 종료 (벤치마크용)
+        """
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[signum] = signal.signal(signum, self._request_stop)
+
+        logger.info(f"🚀 Postgres job worker started (concurrency={self.concurrency}, batch={self.batch_size})")
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='pg-worker') as pool:
+                self._loop(pool, stop_when_idle)
+                logger.info(f"🛑 Waiting for {len(self._running)} in-flight jobs...")
+        finally:
+            self._listener.close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        logger.info(f"👋 Postgres job worker stopped ({self.processed} jobs processed)")
+        return self.processed
+
+    def _loop(self, pool, stop_when_idle):
+        last_maintenance = 0.0
+        while not self._stopping:
+            if time.monotonic() - last_maintenance >= self.lease / 3:
+                self._maintain()
+                last_maintenance = time.monotonic()
+
+            with self._lock:
+                free = self.concurrency - len(self._running)
+            if free <= 0:
+                self._slot_freed.wait(self.poll_interval)
+                self._slot_freed.clear()
+                continue
+
+            jobs = self._claim(min(free, self.batch_size))
+            for job in jobs:
+                with self._lock:
+                    self._running.add(str(job.event_id))
+                pool.submit(self._execute, job)
+
+            if not jobs:
+                with self._lock:
+                    idle = not self._running
+                if stop_when_idle and idle:
+                    return
+                self._wait_for_jobs(self.poll_interval, notify=not stop_when_idle)
+
+    def _claim(self, limit):
+        try:
+            self._listener.listen()
+            return claim_jobs(limit, self.lease)
+        except DatabaseError as e:
+            logger.error(f"❌ Job claim failed, reconnecting: {e}")
+            self._listener.reset()
+            connection.close()
+            time.sleep(min(self.poll_interval, 1.0))
+            return []
+
+    def _execute(self, job):
+        event_id = str(job.event_id)
+        try:
+            self.handler(job)
+        except Exception as e:
+            logger.error(f"❌ Postgres worker job failed ({event_id}): {e}")
+        finally:
+            if connection.errors_occurred and not connection.is_usable():
+                connection.close()
+            with self._lock:
+                self._running.discard(event_id)
+                self.processed += 1
+            self._slot_freed.set()
+
+    def _maintain(self):
+        """실행 중인 작업의 lease 연장 + 만료된 lease 회수"""
+        with self._lock:
+            running = list(self._running)
+        try:
+            renew_leases(running, self.lease)
+            requeue_expired_jobs()
+        except DatabaseError as e:
+            logger.warning(f"lease 갱신 실패: {e}")
+
+    def _wait_for_jobs(self, timeout: float, notify: bool = True):
+        """NOTIFY 또는 timeout까지 대기 (LISTEN을 쓸 수 없으면 실행 중인 작업이 끝날 때까지)"""
+        if notify and self._listener.listening:
+            self._listener.wait(timeout)
+            return
+        self._slot_freed.wait(timeout)
+        self._slot_freed.clear()
+
+    def _request_stop(self, signum, frame):
+        logger.info("🛑 Shutdown requested")
+        self._stopping = True
@@ -0,0 +1,34 @@
+from drf_spectacular.generators import EndpointEnumerator, SchemaGenerator
+
+
+def documented_by(drf_view):
+    """
+    async 뷰의 OpenAPI 문서로 사용할 DRF 뷰 지정
+    DRF 뷰는 async로 만들 수 없으므로 같은 응답을 돌려주는 DRF 뷰의 extend_schema를 그대로 사용합니다.
+    """
+    def decorator(view):
+        view.schema_view = drf_view
+        return view
+    return decorator
+
+
+class AsyncViewEndpointEnumerator(EndpointEnumerator):
+    """documented_by로 지정한 async 뷰는 해당 DRF 뷰로 수집"""
+
+    def should_include_endpoint(self, path, callback):
+        return super().should_include_endpoint(path, getattr(callback, 'schema_view', callback))
+
+    def get_allowed_methods(self, callback):
+        return super().get_allowed_methods(getattr(callback, 'schema_view', callback))
+
+    def get_api_endpoints(self, patterns=None, prefix=''):
+        return [
+            (path, path_regex, method, getattr(callback, 'schema_view', callback))
+            for path, path_regex, method, callback in super().get_api_endpoints(patterns, prefix)
+        ]
+
+
+class AsyncViewSchemaGenerator(SchemaGenerator):
+    """SPECTACULAR_SETTINGS['DEFAULT_GENERATOR_CLASS']"""
+
+    endpoint_inspector_cls = AsyncViewEndpointEnumerator
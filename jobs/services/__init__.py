@@ -1,3 +1,3 @@
-from .gpt_service import GPTService
+from .gpt_service import GPTService, get_gpt_service
 
-__all__ = ['GPTService']
\ No newline at end of file
+__all__ = ['GPTService', 'get_gpt_service']
\ No newline at end of file
@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import io
+import os
+import re
+import tempfile
+import weakref
+import zlib
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 스트리밍 읽기 / 쓰기 단위 (압축을 푼 바이트)
+CHUNK_SIZE = 1 << 20
+SUPPORTED_ENCODINGS = ('identity', 'gzip', 'x-gzip', 'zstd')
+
+_SHA256 = re.compile(r'[0-9a-f]{64}')
+
+
+class InvalidDocument(ValueError):
+    """지원하지 않는 Content-Encoding이거나 압축 스트림이 깨짐"""
+
+
+class DocumentTooLarge(InvalidDocument):
+    """압축을 푼 문서가 JOB_DOCUMENT_MAX_BYTES를 넘음"""
+
+
+class StoredDocument(NamedTuple):
+    sha256: str
+    size: int  # 압축을 푼 바이트 수
+    created: bool  # False면 같은 내용이 이미 저장되어 있었음
+
+
+class SpooledDocument:
+    """
+    압축을 풀고 해시까지 마친 업로드 (저장소에 넣기 전의 임시 파일)
+    요청 검증이 끝난 뒤 BlobStore.commit으로 저장하며, commit하지 않고 버려지면 임시 파일도 지웁니다.
+    """
+
+    def __init__(self, sha256: str, size: int, tmp_path: str):
+        self.sha256 = sha256
+        self.size = size  # 압축을 푼 바이트 수
+        self.tmp_path = tmp_path
+        self._cleanup = weakref.finalize(self, _remove, tmp_path)
+
+    def discard(self):
+        self._cleanup()
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def open_decoded(stream: BinaryIO, encoding: str = None) -> BinaryIO:
+    """Content-Encoding(identity / gzip / zstd)을 풀면서 읽는 스트림 (출력은 read 크기만큼만 메모리에 올림)"""
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        return stream
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise InvalidDocument('zstd 본문을 풀려면 zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+    raise InvalidDocument(f"Content-Encoding은 {', '.join(SUPPORTED_ENCODINGS)} 중 하나여야 합니다.")
+
+
+class BlobStore:
+    """
+    내용 해시(sha256) 단위 문서 저장소 (로컬 파일, gzip 압축)
+
+    <root>/<해시 앞 2자>/<해시>.gz에 한 번만 저장하므로 같은 문서를 여러 번 올려도 공간은 한 번만 씁니다.
+    업로드는 청크 단위로 풀고 해시하며 임시 파일에 쓴 뒤 rename하므로 본문 전체를 메모리에 올리지 않습니다.
+    web과 워커가 같은 디렉터리(JOB_BLOB_ROOT)를 공유해야 합니다.
+    """
+
+    def __init__(self, root=None, max_bytes: int = None, level: int = None):
+        self.root = Path(root or getattr(settings, 'JOB_BLOB_ROOT', settings.BASE_DIR / 'blobs'))
+        self.max_bytes = max_bytes or getattr(settings, 'JOB_DOCUMENT_MAX_BYTES', 64 * 1024 * 1024)
+        self.level = level or getattr(settings, 'JOB_BLOB_COMPRESSION_LEVEL', 6)
+
+    def put(self, stream: BinaryIO, encoding: str = None) -> StoredDocument:
+        """스트림을 (Content-Encoding을 풀며) 저장하고 내용 해시 반환"""
+        return self.commit(self.spool(stream, encoding))
+
+    def spool(self, stream: BinaryIO, encoding: str = None) -> SpooledDocument:
+        """스트림을 (Content-Encoding을 풀며) 임시 파일에 쓰고 해시 (저장소에는 아직 넣지 않음)"""
+        reader = open_decoded(stream, encoding)
+        tmp_dir = self.root / 'tmp'
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix='.gz')
+        digest, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.level, mtime=0) as out:
+                while True:
+                    chunk = self._read(reader)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise DocumentTooLarge(f'문서는 압축을 푼 크기로 {self.max_bytes} 바이트 이하여야 합니다.')
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        return SpooledDocument(digest.hexdigest(), size, tmp_path)
+
+    def commit(self, document: SpooledDocument) -> StoredDocument:
+        """spool한 문서를 내용 해시 위치로 옮김 (같은 내용이 이미 있으면 임시 파일만 지움)"""
+        path = self.path(document.sha256)
+        try:
+            if path.exists():
+                return StoredDocument(document.sha256, document.size, False)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 같은 내용을 동시에 올려도 결과 파일은 같으므로 rename 경쟁은 무해
+            os.replace(document.tmp_path, path)
+            return StoredDocument(document.sha256, document.size, True)
+        finally:
+            document.discard()
+
+    def put_text(self, text: str) -> StoredDocument:
+        return self.put(io.BytesIO(text.encode('utf-8')))
+
+    def open(self, sha256: str) -> BinaryIO:
+        """압축을 풀며 읽는 스트림 (없으면 FileNotFoundError)"""
+        return gzip.open(self.path(sha256), 'rb')
+
+    def read_text(self, sha256: str) -> str:
+        with self.open(sha256) as blob:
+            return blob.read().decode('utf-8', errors='replace')
+
+    def exists(self, sha256: str) -> bool:
+        return self.path(sha256).exists()
+
+    def path(self, sha256: str) -> Path:
+        if not _SHA256.fullmatch(sha256):
+            raise ValueError(f'잘못된 문서 해시: {sha256}')
+        return self.root / sha256[:2] / f'{sha256}.gz'
+
+    @staticmethod
+    def _read(reader: BinaryIO) -> bytes:
+        try:
+            return reader.read(CHUNK_SIZE)
+        except (OSError, EOFError, zlib.error) as e:
+            raise InvalidDocument(f'압축된 본문을 풀 수 없습니다: {e}')
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise InvalidDocument(f'압축된 본문을 풀 수 없습니다: {e}')
+            raise
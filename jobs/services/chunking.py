@@ -0,0 +1,73 @@
+import math
+import re
+from typing import List
+
+# 섹션 시작으로 간주하는 줄 (예: "1. 코드 품질", "## 보안", "제3장 ...", "IV. 운영")
+SECTION_HEADING = re.compile(
+    r'^\s*(#{1,6}\s+\S|\d+(\.\d+)*[.)]\s+\S|제\s*\d+\s*[장절조]|[IVX]+\.\s+\S)'
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 보수적으로 추정
+    (한글은 글자당 약 1토큰 = UTF-8 3바이트, 영문은 약 4글자당 1토큰)
+    """
+    return math.ceil(len((text or '').encode('utf-8')) / 3)
+
+
+def split_sections(text: str) -> List[str]:
+    """제목 줄을 기준으로 문서를 섹션 단위로 분리"""
+    sections, current = [], []
+    for line in (text or '').splitlines():
+        if SECTION_HEADING.match(line) and any(part.strip() for part in current):
+            sections.append('\n'.join(current).strip())
+            current = []
+        current.append(line)
+    if any(part.strip() for part in current):
+        sections.append('\n'.join(current).strip())
+    return sections
+
+
+def chunk_document(text: str, max_tokens: int) -> List[str]:
+    """
+    토큰 예산 안에서 연속된 섹션을 묶어 청크 목록 생성
+    하나의 섹션이 예산을 넘으면 문단 → 줄 → 글자 순으로 더 잘게 나눕니다.
+    """
+    chunks, current, current_tokens = [], [], 0
+
+    for section in split_sections(text):
+        for piece in _split_oversized(section, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def _split_oversized(section: str, max_tokens: int) -> List[str]:
+    if estimate_tokens(section) <= max_tokens:
+        return [section]
+
+    for separator in ('\n\n', '\n'):
+        parts = [part for part in section.split(separator) if part.strip()]
+        if len(parts) > 1:
+            pieces, current = [], ''
+            for part in parts:
+                candidate = f'{current}{separator}{part}' if current else part
+                if current and estimate_tokens(candidate) > max_tokens:
+                    pieces.extend(_split_oversized(current, max_tokens))
+                    current = part
+                else:
+                    current = candidate
+            pieces.extend(_split_oversized(current, max_tokens))
+            return pieces
+
+    # 줄바꿈이 없는 긴 텍스트는 글자 수 기준으로 자름
+    size = max(1, max_tokens)
+    return [section[i:i + size] for i in range(0, len(section), size)]
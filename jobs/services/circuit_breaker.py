@@ -0,0 +1,102 @@
+import logging
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from common import metrics
+from common.utils import get_redis
+from .exceptions import RetryLater
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RetryLater):
+    """차단기가 열려 있어 호출하지 않음 (작업 재예약 필요)"""
+
+
+class CircuitBreaker:
+    """
+    모든 워커가 공유하는 Redis 기반 회로 차단기
+
+    - closed: 첫 실패부터 failure_window초 안에 failure_threshold번 실패하면 open으로 전환
+      (성공해도 실패 횟수는 줄지 않으므로 간헐적 성공이 섞인 장애에서도 열림)
+    - open: cooldown초 동안 호출 없이 즉시 CircuitOpenError 발생
+    - half-open: cooldown 이후 하나의 워커만 시험 호출, 성공 시 closed / 실패 시 다시 open
+      (시험 호출 결과가 failure_window초 동안 없으면 closed로 돌아감)
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, failure_window: int = None, cooldown: int = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(settings, 'GPT_CIRCUIT_FAILURE_THRESHOLD', 5)
+        self.failure_window = failure_window or getattr(settings, 'GPT_CIRCUIT_FAILURE_WINDOW', 60)
+        self.cooldown = cooldown or getattr(settings, 'GPT_CIRCUIT_COOLDOWN', 30)
+
+        prefix = f'circuit:{name}'
+        self._open_key = f'{prefix}:open'
+        self._half_open_key = f'{prefix}:half_open'
+        self._probe_key = f'{prefix}:probe'
+        self._failures_key = f'{prefix}:failures'
+
+    def before_call(self):
+        """호출 전 확인 - 차단기가 열려 있으면 CircuitOpenError 발생"""
+        try:
+            redis = get_redis()
+            remaining = redis.pttl(self._open_key)
+            if remaining and remaining > 0:
+                metrics.incr('circuit_breaker.rejected')
+                raise CircuitOpenError(f"{self.name} 차단기 열림", retry_after=remaining / 1000)
+
+            if redis.exists(self._half_open_key):
+                # 시험 호출은 하나의 워커만 수행
+                if not redis.set(self._probe_key, 1, nx=True, ex=self.cooldown):
+                    metrics.incr('circuit_breaker.rejected')
+                    raise CircuitOpenError(f"{self.name} 차단기 시험 호출 중", retry_after=self.cooldown)
+                logger.info(f"🔌 {self.name} 차단기 half-open: 시험 호출을 보냅니다.")
+        except RedisError as e:
+            logger.warning(f"회로 차단기 사용 불가: {e}")
+
+    def record_success(self):
+        """성공 기록 (half-open이면 closed로 전환, 실패 횟수는 window가 끝날 때까지 유지)"""
+        try:
+            redis = get_redis()
+            if redis.exists(self._open_key):
+                # 열리기 전에 시작한 호출의 늦은 성공은 시험 호출 없이 닫지 않음
+                return
+            closed = redis.delete(self._half_open_key, self._probe_key)
+            if closed:
+                logger.info(f"✅ {self.name} 차단기 closed")
+        except RedisError as e:
+            logger.warning(f"회로 차단기 사용 불가: {e}")
+
+    def record_failure(self):
+        """실패 기록 - 임계치 도달 또는 시험 호출 실패 시 차단기를 엶"""
+        try:
+            redis = get_redis()
+            if redis.exists(self._half_open_key):
+                self._open(redis)
+                return
+
+            # 고정 window: 첫 실패 때만 만료 시간 설정 (이후 실패가 window를 늘리지 않음)
+            pipe = redis.pipeline()
+            pipe.set(self._failures_key, 0, ex=self.failure_window, nx=True)
+            pipe.incr(self._failures_key)
+            failures = pipe.execute()[1]
+            if failures >= self.failure_threshold:
+                self._open(redis)
+        except RedisError as e:
+            logger.warning(f"회로 차단기 사용 불가: {e}")
+
+    def is_open(self) -> bool:
+        try:
+            return bool(get_redis().exists(self._open_key))
+        except RedisError:
+            return False
+
+    def _open(self, redis):
+        pipe = redis.pipeline()
+        pipe.set(self._open_key, 1, ex=self.cooldown)
+        pipe.set(self._half_open_key, 1, ex=self.cooldown + self.failure_window)
+        pipe.delete(self._probe_key, self._failures_key)
+        pipe.execute()
+        metrics.incr('circuit_breaker.opened')
+        logger.error(f"🚫 {self.name} 차단기 open: {self.cooldown}초 동안 호출을 중단합니다.")
@@ -0,0 +1,13 @@
+class RetryLater(Exception):
+    """
+    지금은 처리할 수 없지만 retry_after초 후에는 처리 가능한 상태
+    (작업을 실패 처리하지 않고 재예약해야 함)
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GPTUnavailable(RetryLater):
+    """재시도 후에도 OpenAI API 호출이 계속 실패함"""
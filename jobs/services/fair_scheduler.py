@@ -0,0 +1,293 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from common import metrics
+from common.utils import get_redis
+
+# 우선순위 (앞쪽이 먼저 처리, 같은 우선순위 안에서는 테넌트 가중치로 공정 분배)
+PRIORITIES = ('high', 'normal', 'low')
+
+# 작업을 (우선순위, 테넌트) 대기열 뒤에 추가
+# 새로 활성화된 테넌트는 현재 가상 시각에서 시작 (쉬는 동안 몫을 쌓아 두지 못함)
+# 작업별 제출 표시(submitted:<event_id>)가 이미 있으면 건너뜀 (outbox relay 재시도가 같은 작업을 두 번 넣지 않도록)
+# KEYS: 대기열, weights, tenants, active:<우선순위>, clock:<우선순위>, 제출 표시... / ARGV: 테넌트, 가중치, 표시 TTL, event_id...
+# 반환값: 대기열 길이
+ENQUEUE_SCRIPT = """
+local queue, weights, tenants, active, clock = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local tenant = ARGV[1]
+local t = redis.call('TIME')
+local now = t[1] .. '.' .. string.format('%06d', tonumber(t[2]))
+
+for i = 4, #ARGV do
+    if redis.call('SET', KEYS[i + 2], 1, 'NX', 'EX', ARGV[3]) then
+        redis.call('RPUSH', queue, ARGV[i] .. '|' .. now)
+    end
+end
+if redis.call('LLEN', queue) == 0 then
+    return 0
+end
+redis.call('HSET', weights, tenant, ARGV[2])
+redis.call('SADD', tenants, tenant)
+
+if not redis.call('ZSCORE', active, tenant) then
+    local start = tonumber(redis.call('GET', clock)) or 0
+    redis.call('ZADD', active, start, tenant)
+end
+return redis.call('LLEN', queue)
+"""
+
+# 실행 슬롯이 남는 만큼 대기열에서 작업을 꺼냄 (start-time fair queuing)
+# - 높은 우선순위 대기열이 빌 때까지 낮은 우선순위는 꺼내지 않음
+# - 같은 우선순위에서는 가상 시작 시각이 가장 이른 테넌트 선택 후 1/가중치만큼 전진
+# - lease가 지난 실행 슬롯(워커 유실)은 회수
+# - 모든 우선순위 대기열이 빈 테넌트는 테넌트 목록에서 제거 (다음 제출 때 다시 추가)
+# KEYS: running, weights, tenants, active:<우선순위> n개, clock:<우선순위> n개, 대기열 (우선순위별로 ARGV의 테넌트 순서)
+# ARGV: max_in_flight, lease, 최대 개수, n, 우선순위 n개, 테넌트...
+# 대기열 키를 받지 못한 테넌트(조회 이후 새로 들어온 테넌트) 차례가 오면 멈추고 다음 release에서 처리
+# 반환값: {now, priority, tenant, item, priority, tenant, item, ...}
+RELEASE_SCRIPT = """
+local running, weights, tenant_set = KEYS[1], KEYS[2], KEYS[3]
+local n = tonumber(ARGV[4])
+local tenants, m = {}, #ARGV - 4 - n
+for k = 1, m do
+    tenants[ARGV[4 + n + k]] = k
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+redis.call('ZREMRANGEBYSCORE', running, '-inf', now)
+local limit = math.min(tonumber(ARGV[1]) - redis.call('ZCARD', running), tonumber(ARGV[3]))
+
+local released = {tostring(now)}
+local p = 1
+while (#released - 1) / 3 < limit and p <= n do
+    local priority, active, clock = ARGV[4 + p], KEYS[3 + p], KEYS[3 + n + p]
+    local head = redis.call('ZRANGE', active, 0, 0, 'WITHSCORES')
+    if #head == 0 then
+        p = p + 1
+    else
+        local tenant, start = head[1], tonumber(head[2])
+        if not tenants[tenant] then
+            break
+        end
+        local queue = KEYS[3 + 2 * n + (p - 1) * m + tenants[tenant]]
+        local item = redis.call('LPOP', queue)
+        redis.call('SET', clock, tostring(start))
+        if redis.call('LLEN', queue) == 0 then
+            redis.call('ZREM', active, tenant)
+        else
+            local weight = tonumber(redis.call('HGET', weights, tenant)) or 1
+            redis.call('ZADD', active, start + 1 / weight, tenant)
+        end
+        if item then
+            local event_id = string.sub(item, 1, string.find(item, '|', 1, true) - 1)
+            redis.call('ZADD', running, now + tonumber(ARGV[2]), event_id)
+            table.insert(released, priority)
+            table.insert(released, tenant)
+            table.insert(released, item)
+        end
+    end
+end
+
+for tenant, k in pairs(tenants) do
+    local queued = 0
+    for q = 1, n do
+        queued = queued + redis.call('LLEN', KEYS[3 + 2 * n + (q - 1) * m + k])
+    end
+    if queued == 0 then
+        redis.call('SREM', tenant_set, tenant)
+    end
+end
+return released
+"""
+
+# 발행하지 못한 작업을 대기열 맨 앞으로 되돌리고 실행 슬롯 반납
+# KEYS: running, tenants, 작업별 (대기열, active:<우선순위>, clock:<우선순위>) / ARGV: 작업별 (테넌트, event_id, 대기열 원소)
+REQUEUE_SCRIPT = """
+local running, tenants = KEYS[1], KEYS[2]
+for i = 1, #ARGV / 3 do
+    local tenant, event_id, item = ARGV[3 * i - 2], ARGV[3 * i - 1], ARGV[3 * i]
+    local queue, active, clock = KEYS[3 * i], KEYS[3 * i + 1], KEYS[3 * i + 2]
+    redis.call('LPUSH', queue, item)
+    redis.call('ZREM', running, event_id)
+    redis.call('SADD', tenants, tenant)
+    if not redis.call('ZSCORE', active, tenant) then
+        redis.call('ZADD', active, tonumber(redis.call('GET', clock)) or 0, tenant)
+    end
+end
+return #ARGV / 3
+"""
+
+
+class ReleasedJob(NamedTuple):
+    event_id: str
+    tenant: str
+    priority: str
+    wait: float  # 대기열에 들어간 뒤 실행 슬롯을 얻기까지 걸린 시간 (초)
+    enqueued_at: str  # 대기열에 들어간 시각 (requeue 시 그대로 되돌림)
+
+
+def percentile(samples: Sequence[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(math.ceil(len(ordered) * q / 100)) - 1)]
+
+
+class FairScheduler:
+    """
+    Redis 기반 우선순위 + 테넌트별 가중 공정 스케줄러
+
+    작업은 (우선순위, 테넌트)별 대기열에 들어가고, 실행 중인 작업이 max_in_flight보다 적을 때만
+    Celery 단계 큐로 풀려납니다. 단계 큐(FIFO)에는 항상 소수의 작업만 있으므로
+    대량 백필이 들어와도 대화형 작업은 자기 차례를 길게 기다리지 않습니다.
+    """
+
+    def __init__(self, max_in_flight: int = None, lease: int = None, weights: Dict[str, float] = None,
+                 prefix: str = 'fairq:'):
+        self.max_in_flight = max_in_flight or getattr(settings, 'JOB_SCHEDULER_MAX_IN_FLIGHT', 100)
+        self.lease = lease or getattr(settings, 'JOB_SCHEDULER_LEASE', 3600)
+        self.weights = weights if weights is not None else getattr(settings, 'JOB_TENANT_WEIGHTS', {})
+        self.release_batch = getattr(settings, 'JOB_DISPATCH_BATCH_SIZE', 500)
+        self.wait_window = getattr(settings, 'JOB_SCHEDULER_WAIT_WINDOW', 500)
+        self.prefix = prefix
+        self.running_key = f'{prefix}running'
+        self.weights_key = f'{prefix}weights'
+        self.tenants_key = f'{prefix}tenants'
+        self._redis = get_redis()
+        self._enqueue = self._redis.register_script(ENQUEUE_SCRIPT)
+        self._release = self._redis.register_script(RELEASE_SCRIPT)
+        self._requeue = self._redis.register_script(REQUEUE_SCRIPT)
+
+    def weight(self, tenant: str) -> float:
+        return float(self.weights.get(tenant, 1))
+
+    def submit(self, jobs: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        (event_id, tenant, priority) 목록을 대기열에 추가 (그룹당 스크립트 1회, 파이프라인 1번 왕복)
+        lease 동안은 같은 event_id를 다시 제출해도 한 번만 들어갑니다.
+        """
+        groups = defaultdict(list)
+        for event_id, tenant, priority in jobs:
+            if priority not in PRIORITIES:
+                raise ValueError(f'알 수 없는 우선순위: {priority}')
+            groups[(priority, tenant)].append(str(event_id))
+        if not groups:
+            return 0
+
+        pipe = self._redis.pipeline(transaction=False)
+        for (priority, tenant), event_ids in groups.items():
+            self._enqueue(
+                keys=[
+                    self._queue_key(priority, tenant), self.weights_key, self.tenants_key,
+                    self._active_key(priority), self._clock_key(priority),
+                    *(self._submitted_key(event_id) for event_id in event_ids),
+                ],
+                args=[tenant, self.weight(tenant), self.lease, *event_ids],
+                client=pipe,
+            )
+        pipe.execute()
+        return sum(len(event_ids) for event_ids in groups.values())
+
+    def release(self, limit: int = None) -> List[ReleasedJob]:
+        """
+        빈 실행 슬롯만큼 다음 작업을 꺼내 반환 (대기 시간은 테넌트/우선순위별로 기록)
+        스크립트가 쓰는 키를 모두 KEYS로 넘기기 위해 테넌트 목록을 먼저 조회합니다.
+        """
+        tenants = sorted(_text(tenant) for tenant in self._redis.smembers(self.tenants_key))
+        reply = self._release(
+            keys=[
+                self.running_key, self.weights_key, self.tenants_key,
+                *(self._active_key(priority) for priority in PRIORITIES),
+                *(self._clock_key(priority) for priority in PRIORITIES),
+                *(self._queue_key(priority, tenant) for priority in PRIORITIES for tenant in tenants),
+            ],
+            args=[self.max_in_flight, self.lease, limit or self.release_batch, len(PRIORITIES), *PRIORITIES, *tenants],
+        )
+        now = float(_text(reply[0]))
+        released = []
+        for index in range(1, len(reply), 3):
+            priority, tenant, item = (_text(value) for value in reply[index:index + 3])
+            event_id, enqueued_at = item.rsplit('|', 1)
+            released.append(ReleasedJob(event_id, tenant, priority, max(0.0, now - float(enqueued_at)), enqueued_at))
+        if released:
+            self._record_waits(released)
+        return released
+
+    def requeue(self, released: Sequence[ReleasedJob]) -> int:
+        """release로 꺼냈지만 발행하지 못한 작업을 원래 순서대로 대기열 맨 앞에 되돌림"""
+        jobs = list(reversed(released))
+        if not jobs:
+            return 0
+        return self._requeue(
+            keys=[
+                self.running_key, self.tenants_key,
+                *(key for job in jobs for key in (
+                    self._queue_key(job.priority, job.tenant),
+                    self._active_key(job.priority),
+                    self._clock_key(job.priority),
+                )),
+            ],
+            args=[value for job in jobs for value in (job.tenant, job.event_id, f'{job.event_id}|{job.enqueued_at}')],
+        )
+
+    def finish(self, event_id: str) -> bool:
+        """실행 슬롯 반납 (이미 반납했거나 lease가 지난 작업이면 False)"""
+        return bool(self._redis.zrem(self.running_key, str(event_id)))
+
+    def stats(self) -> dict:
+        """테넌트/우선순위별 대기 작업 수와 최근 대기 시간 p50/p95 (대기열이 빈 테넌트는 설정된 테넌트만 표시)"""
+        tenants = sorted({_text(tenant) for tenant in self._redis.smembers(self.tenants_key)} | set(self.weights))
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.zcard(self.running_key)
+        for tenant in tenants:
+            for priority in PRIORITIES:
+                pipe.llen(self._queue_key(priority, tenant))
+                pipe.lrange(self._wait_key(priority, tenant), 0, -1)
+        replies = iter(pipe.execute())
+        in_flight = next(replies)
+
+        stats = {}
+        for tenant in tenants:
+            for priority in PRIORITIES:
+                queued, waits = next(replies), [float(wait) for wait in next(replies)]
+                if queued or waits:
+                    stats.setdefault(tenant, {'weight': self.weight(tenant)})[priority] = {
+                        'queued': queued,
+                        'wait_p50': percentile(waits, 50),
+                        'wait_p95': percentile(waits, 95),
+                        'samples': len(waits),
+                    }
+        return {'in_flight': in_flight, 'max_in_flight': self.max_in_flight, 'tenants': stats}
+
+    def _record_waits(self, released: List[ReleasedJob]):
+        pipe = self._redis.pipeline(transaction=False)
+        for job in released:
+            key = self._wait_key(job.priority, job.tenant)
+            pipe.lpush(key, f'{job.wait:.3f}')
+            pipe.ltrim(key, 0, self.wait_window - 1)
+        pipe.execute()
+        for job in released:
+            metrics.observe(f'scheduler.wait_seconds.{job.priority}', job.wait)
+
+    def _queue_key(self, priority: str, tenant: str) -> str:
+        return f'{self.prefix}queue:{priority}:{tenant}'
+
+    def _submitted_key(self, event_id: str) -> str:
+        return f'{self.prefix}submitted:{event_id}'
+
+    def _wait_key(self, priority: str, tenant: str) -> str:
+        return f'{self.prefix}wait:{priority}:{tenant}'
+
+    def _active_key(self, priority: str) -> str:
+        return f'{self.prefix}active:{priority}'
+
+    def _clock_key(self, priority: str) -> str:
+        return f'{self.prefix}clock:{priority}'
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
@@ -1,7 +1,27 @@
+import asyncio
 import json
 import logging
+import os
+import random
+import threading
+import time
+import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from django.conf import settings
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, List, NamedTuple, Optional, Tuple
+
+from common import metrics
+
+from .chunking import chunk_document, estimate_tokens
+from .incremental import SectionChange
+from .llm_backend import get_llm_backend
+from .model_router import ModelRouter
+from .circuit_breaker import CircuitBreaker
+from .exceptions import GPTUnavailable, RetryLater
+from .rate_limiter import RateLimiter, estimate_request_tokens
+from .result_cache import ResultCache, NullResultCache, make_cache_key
+from .stream_parser import IncrementalJSONParser
+from .structured_output import OUTPUT_SCHEMAS, OutputError, function_spec, parse_output, validate_output
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +34,119 @@ except ImportError:
     OPENAI_AVAILABLE = False
     logger.error("OpenAI 라이브러리를 찾을 수 없습니다.")
 
+# 백오프 후 재시도할 OpenAI 오류 (타임아웃, 429, 5xx, 연결 오류)
+RETRYABLE_ERRORS = (
+    openai.error.Timeout,
+    openai.error.APIError,
+    openai.error.APIConnectionError,
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.TryAgain,
+) if OPENAI_AVAILABLE else ()
+
+
+# 프롬프트 템플릿 버전 (프롬프트 변경 시 올려서 결과 캐시를 무효화)
+SUMMARY_PROMPT_VERSION = 'summary-v1'
+SUMMARY_CHUNK_PROMPT_VERSION = 'summary-chunk-v1'
+SUMMARY_REDUCE_PROMPT_VERSION = 'summary-reduce-v1'
+CHECKLIST_PROMPT_VERSION = 'checklist-v1'
+FUSED_PROMPT_VERSION = 'fused-v1'
+REVISION_PROMPT_VERSION = 'revision-v1'
+
+# 입력이 없을 때 사용하는 기본 가이드라인 텍스트
+DEFAULT_GUIDELINE_TEXT = """
+소프트웨어 개발 가이드라인
+
+1. 코드 품질 관리
+- 모든 코드는 코드 리뷰를 거쳐야 합니다
+- 린터와 포매터를 사용하여 일관된 코딩 스타일을 유지합니다
+- 변수명과 함수명은 명확하고 의미 있게 작성합니다
+- 복잡한 로직에는 충분한 주석을 작성합니다
+
+2. 테스팅
+- 단위 테스트 커버리지는 최소 80% 이상을 유지합니다
+- 통합 테스트를 통해 시스템 전체 동작을 검증합니다
+- CI/CD 파이프라인에서 자동화된 테스트를 실행합니다
+- 테스트 코드도 프로덕션 코드와 동일한 품질을 유지합니다
+
+3. 문서화
+- API 문서는 자동으로 생성되도록 설정합니다
+- README 파일을 최신 상태로 유지합니다
+- 아키텍처 결정사항은 ADR(Architecture Decision Record)로 기록합니다
+- 운영 가이드와 트러블슈팅 문서를 작성합니다
+
+4. 보안
+- 민감한 정보는 환경변수로 관리합니다
+- 정기적으로 보안 취약점 스캔을 실행합니다
+- 인증과 권한 관리를 철저히 합니다
+- HTTPS를 필수로 사용합니다
+"""
+
+
+# 스트리밍 중 완성된 원소 목록을 받는 콜백 (빈 목록이면 게시한 부분 결과를 지움)
+PartialCallback = Optional[Callable[[List[Any]], None]]
+
+
+class GPTStep(NamedTuple):
+    """GPT 체인 단계별 요청 정보"""
+    kind: str                   # 'summary' | 'summary_chunk' | 'checklist' | 'fused' | 'revision'
+    label: str                  # 로그용 이름
+    messages: List[Dict[str, str]]
+    temperature: float
+    max_tokens: int
+    cache_key: str
+    stream_field: str           # 스트리밍 시 부분 결과로 게시할 배열 필드
+
+
+class _PartialGate:
+    """hedge 요청 중 먼저 부분 결과를 보낸 쪽의 스트림만 on_partial로 전달"""
+    
+    def __init__(self, on_partial: PartialCallback):
+        self.on_partial = on_partial
+        self.owner = None
+        self._lock = threading.Lock()
+    
+    def writer(self, model: str) -> PartialCallback:
+        if self.on_partial is None:
+            return None
+        
+        def write(items):
+            with self._lock:
+                if self.owner is None:
+                    self.owner = model
+            if self.owner == model:
+                self.on_partial(items)
+        return write
+
+
+# 워커 프로세스 전역 GPTService 인스턴스
+_service_instance = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_gpt_service() -> 'GPTService':
+    """
+    워커 프로세스당 하나의 GPTService를 지연 생성하여 재사용
+    fork 이후 자식 프로세스에서는 새 인스턴스를 생성합니다.
+    """
+    global _service_instance, _service_pid
+    pid = os.getpid()
+    if _service_instance is None or _service_pid != pid:
+        with _service_lock:
+            if _service_instance is None or _service_pid != pid:
+                _service_instance = GPTService()
+                _service_pid = pid
+    return _service_instance
+
+
+def reset_gpt_service():
+    """프로세스 전역 인스턴스 초기화 (설정 변경/테스트용)"""
+    global _service_instance, _service_pid
+    with _service_lock:
+        _service_instance = None
+        _service_pid = None
+
 
 class GPTService:
     """OpenAI GPT API를 사용한 가이드라인 처리 서비스"""
@@ -21,22 +154,62 @@ class GPTService:
     def __init__(self):
         self.use_fallback = True
         self.client = None
+        self.model_name = None
+        self.api_key = ''
+        self.backend = None
+        
+        # 모델 선택 결과 캐시 상태
+        self._configured = False
+        self._model_checked_at = 0.0
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
+        
+        # 비동기 호출 동시성 제한 (이벤트 루프별로 생성)
+        self._async_semaphore = None
+        self._async_semaphore_loop = None
+        
+        # 구조화 출력 모드 ('function' | 'json' | 'off') 및 잘못된 응답 재요청 횟수
+        self.output_mode = getattr(settings, 'GPT_OUTPUT_MODE', 'function')
+        self.output_retries = getattr(settings, 'GPT_OUTPUT_RETRIES', 1)
+        
+        # 호출별 타임아웃 / 모델별 회로 차단기
+        self.request_timeout = getattr(settings, 'GPT_REQUEST_TIMEOUT', 30)
+        self._breakers = {}
+        
+        # 단계별 모델 선택 및 hedge 요청 (지연 시간 p95 초과 시 다른 모델로 중복 요청)
+        self.router = ModelRouter() if getattr(settings, 'GPT_ROUTING_ENABLED', True) else None
+        self.hedge_steps = set(getattr(settings, 'GPT_HEDGE_STEPS', ['checklist', 'fused', 'revision']))
+        # 동기 경로는 늦게 끝난 요청을 취소할 수 없어 hedge마다 호출 1건(토큰/RPM)이 더 듬 → 기본 비활성화
+        self.sync_hedging = getattr(settings, 'GPT_HEDGE_SYNC_ENABLED', False)
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
+        
+        # 클러스터 공용 호출 제한기 (RPM/TPM)
+        self.rate_limiter = RateLimiter() if getattr(settings, 'GPT_RATE_LIMIT_ENABLED', True) else None
+        
+        # 요약/체크리스트 결과 캐시 (로컬 LRU + Redis)
+        self.result_cache = ResultCache() if getattr(settings, 'GPT_RESULT_CACHE_ENABLED', True) else NullResultCache()
         
         # OpenAI 사용 가능성 확인
         if not OPENAI_AVAILABLE:
             logger.error("OpenAI 라이브러리가 없습니다. 기본값을 사용합니다.")
             return
+        
+        # completion 호출 백엔드 (OpenAI / 로컬 stub 서버 / 사용자 정의)
+        self.backend = get_llm_backend()
+        if not self.backend.requires_api_key:
+            self._configure_session()
+            return
             
         # API 키 확인
         self.api_key = getattr(settings, 'OPENAI_API_KEY', '')
         
-        # API 키 상세 로그 출력
+        # API 키 로그 출력 (앞/뒤 일부만)
         if self.api_key:
             logger.info(f"🔑 API 키 확인됨:")
             logger.info(f"   - 길이: {len(self.api_key)}자")
-            logger.info(f"   - 시작: {self.api_key[:20]}...")
-            logger.info(f"   - 끝: ...{self.api_key[-10:]}")
-            logger.info(f"   - 전체: {self.api_key}")  # 디버깅용 전체 키 출력
+            logger.info(f"   - 시작: {self.api_key[:8]}...")
+            logger.info(f"   - 끝: ...{self.api_key[-4:]}")
         else:
             logger.error("❌ API 키가 비어있습니다.")
             
@@ -44,87 +217,96 @@ class GPTService:
             logger.error("❌ OpenAI API 키가 설정되지 않았습니다. .env 파일의 OPENAI_API_KEY를 확인하세요.")
             return
             
-        # OpenAI 클라이언트 초기화 (0.28.1 버전용)
-        try:
-            # OpenAI 0.28.1 방식: 전역 API 키 설정
-            logger.info("OpenAI 0.28.1 방식으로 초기화 시도...")
-            openai.api_key = self.api_key
-            
-            # 연결 테스트 - 올바른 모델명으로
-            logger.info("OpenAI API 연결 테스트 중...")
-            test_response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",  # 존재하는 모델명 사용
-                messages=[{"role": "user", "content": "테스트"}],
-                max_tokens=5
-            )
-            
-            self.use_fallback = False
-            self.model_name = "gpt-4o-mini"
-            logger.info("✅ OpenAI API 연결 성공! 실제 GPT를 사용합니다.")
-            
-        except Exception as e:
-            logger.warning(f"gpt-4o-mini 실패: {e}")
+        # OpenAI 0.28.1 방식: 전역 API 키 설정 + 공유 HTTP 세션 (keep-alive 재사용)
+        logger.info("OpenAI 0.28.1 방식으로 초기화...")
+        openai.api_key = self.api_key
+        self._configure_session()
+    
+    def _configure_session(self):
+        """공유 HTTP 세션 설정 후 모델 선택"""
+        self.client = self._build_http_session()
+        openai.requestssession = self.client
+        self._configured = True
+        
+        self._select_model()
+    
+    @staticmethod
+    def _build_http_session() -> requests.Session:
+        """워커 내 모든 GPT 호출이 공유하는 커넥션 풀 세션 생성"""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=getattr(settings, 'GPT_HTTP_POOL_SIZE', 10),
+            max_retries=2,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _select_model(self):
+        """
+        후보 모델 중 사용 가능한 첫 모델 선택
+        토큰을 소모하지 않는 모델 조회 API로 상태를 확인합니다.
+        """
+        candidates = getattr(settings, 'GPT_MODEL_CANDIDATES', ['gpt-4o-mini', 'gpt-3.5-turbo'])
+        errors = {}
+        
+        for model in candidates:
             try:
-                # gpt-3.5-turbo로 재시도
-                logger.info("gpt-3.5-turbo로 연결 테스트...")
-                test_response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": "테스트"}],
-                    max_tokens=5
-                )
+                logger.info(f"{model} 모델 상태 확인 중...")
+                self.backend.check_model(model, self.request_timeout)
                 
+                if self.model_name != model:
+                    logger.info(f"✅ OpenAI API 연결 성공! ({model})")
+                self.model_name = model
                 self.use_fallback = False
-                self.model_name = "gpt-3.5-turbo"
-                logger.info("✅ OpenAI API 연결 성공! (gpt-3.5-turbo)")
+                self._model_checked_at = time.monotonic()
+                return
                 
-            except Exception as e2:
-                logger.error(f"❌ 모든 모델 테스트 실패:")
-                logger.error(f"   gpt-4o-mini: {e}")
-                logger.error(f"   gpt-3.5-turbo: {e2}")
-                logger.error("기본 더미 데이터를 사용합니다.")
-                self.use_fallback = True
+            except Exception as e:
+                logger.warning(f"{model} 실패: {e}")
+                errors[model] = e
+        
+        logger.error(f"❌ 모든 모델 테스트 실패:")
+        for model, error in errors.items():
+            logger.error(f"   {model}: {error}")
+        logger.error("기본 더미 데이터를 사용합니다.")
+        self.use_fallback = True
+        self._model_checked_at = time.monotonic()
     
-    def generate_summary(self, guideline_text: str = None) -> Dict[str, Any]:
+    def _ensure_model(self):
         """
-        가이드라인 텍스트를 요약하여 구조화된 데이터로 반환
+        모델 선택 결과의 TTL이 지났다면 백그라운드에서 상태 재확인
+        재확인 중에는 기존 선택 결과를 그대로 사용합니다.
         """
-        # Fallback 사용
-        if self.use_fallback:
-            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 데이터를 반환합니다.")
-            return self._get_default_summary()
+        if not self._configured:
+            return
             
-        try:
-            # 기본 가이드라인 텍스트
-            if not guideline_text:
-                guideline_text = """
-                소프트웨어 개발 가이드라인
-                
-                1. 코드 품질 관리
-                - 모든 코드는 코드 리뷰를 거쳐야 합니다
-                - 린터와 포매터를 사용하여 일관된 코딩 스타일을 유지합니다
-                - 변수명과 함수명은 명확하고 의미 있게 작성합니다
-                - 복잡한 로직에는 충분한 주석을 작성합니다
-                
-                2. 테스팅
-                - 단위 테스트 커버리지는 최소 80% 이상을 유지합니다
-                - 통합 테스트를 통해 시스템 전체 동작을 검증합니다
-                - CI/CD 파이프라인에서 자동화된 테스트를 실행합니다
-                - 테스트 코드도 프로덕션 코드와 동일한 품질을 유지합니다
-                
-                3. 문서화
-                - API 문서는 자동으로 생성되도록 설정합니다
-                - README 파일을 최신 상태로 유지합니다
-                - 아키텍처 결정사항은 ADR(Architecture Decision Record)로 기록합니다
-                - 운영 가이드와 트러블슈팅 문서를 작성합니다
-                
-                4. 보안
-                - 민감한 정보는 환경변수로 관리합니다
-                - 정기적으로 보안 취약점 스캔을 실행합니다
-                - 인증과 권한 관리를 철저히 합니다
-                - HTTPS를 필수로 사용합니다
-                """
+        ttl = getattr(settings, 'GPT_MODEL_HEALTH_TTL', 300)
+        if time.monotonic() - self._model_checked_at < ttl:
+            return
             
-            prompt = f"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        
+        def refresh():
+            try:
+                self._select_model()
+            finally:
+                self._refreshing = False
+        
+        threading.Thread(target=refresh, name='gpt-model-refresh', daemon=True).start()
+    
+    def build_summary_step(self, guideline_text: str = None) -> GPTStep:
+        """요약 단계 요청 구성"""
+        # 기본 가이드라인 텍스트
+        if not guideline_text:
+            guideline_text = DEFAULT_GUIDELINE_TEXT
+        
+        temperature = 0.3
+        prompt = f"""
             다음 소프트웨어 개발 가이드라인을 분석하여 핵심 내용을 요약해주세요.
             
             가이드라인:
@@ -140,69 +322,117 @@ class GPTService:
             
             JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
             """
+        
+        return GPTStep(
+            kind='summary',
+            label='요약',
+            messages=[
+                {
+                    "role": "system", 
+                    "content": "당신은 소프트웨어 개발 문서를 분석하고 요약하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=1000,
+            cache_key=make_cache_key('summary', guideline_text, self.model_name, SUMMARY_PROMPT_VERSION, temperature),
+            stream_field='key_points',
+        )
+    
+    def build_chunk_summary_step(self, chunk: str, index: int, total: int) -> GPTStep:
+        """대용량 문서 map 단계: 청크 하나를 요약하는 요청 구성"""
+        temperature = 0.3
+        prompt = f"""
+            다음은 긴 소프트웨어 개발 가이드라인의 일부({index}/{total})입니다. 이 부분의 핵심 내용을 요약해주세요.
             
-            logger.info("🤖 실제 GPT API로 요약 생성 시작...")
-            
-            # OpenAI 0.28.1 방식 사용
-            response = openai.ChatCompletion.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "당신은 소프트웨어 개발 문서를 분석하고 요약하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
+            가이드라인 일부:
+            {chunk}
             
-            content = response.choices[0].message.content.strip()
-            logger.info(f"✅ GPT API 응답 성공! (길이: {len(content)}자)")
-            logger.info(f"응답 미리보기: {content[:100]}...")
+            다음 JSON 형식으로 응답해주세요:
+            {{
+                "title": "이 부분의 주제",
+                "content": "이 부분의 요약 (1-2문장)",
+                "key_points": ["핵심 포인트 1", "핵심 포인트 2"]
+            }}
             
-            # JSON 파싱 (마크다운 코드 블록 제거)
-            try:
-                # ```json과 ``` 제거
-                if content.startswith('```json'):
-                    content = content[7:]  # ```json 제거
-                if content.startswith('```'):
-                    content = content[3:]   # ``` 제거
-                if content.endswith('```'):
-                    content = content[:-3]  # 끝의 ``` 제거
-                
-                content = content.strip()
-                summary_data = json.loads(content)
-                logger.info("🎉 실제 GPT가 생성한 요약 완료!")
-                
-                # GPT 응답임을 표시하기 위해 메타 정보 추가
-                summary_data['_source'] = 'openai_gpt'
-                summary_data['_model'] = self.model_name
-                
-                return summary_data
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 파싱 에러: {e}")
-                logger.error(f"정제된 응답: {content[:200]}...")
-                return self._get_default_summary()
-                
-        except Exception as e:
-            logger.error(f"❌ GPT 요약 생성 오류: {e}")
-            return self._get_default_summary()
+            JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
+            """
+        
+        return GPTStep(
+            kind='summary_chunk',
+            label=f'요약 조각 {index}/{total}',
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 소프트웨어 개발 문서를 분석하고 요약하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=600,
+            cache_key=make_cache_key('summary_chunk', chunk, self.model_name, SUMMARY_CHUNK_PROMPT_VERSION, temperature),
+            stream_field='key_points',
+        )
     
-    def generate_checklist(self, summary: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        요약 데이터를 바탕으로 체크리스트를 생성
-        """
-        # Fallback 사용
-        if self.use_fallback:
-            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 체크리스트를 반환합니다.")
-            return self._get_default_checklist()
+    def build_reduce_step(self, partials: List[Dict[str, Any]]) -> GPTStep:
+        """대용량 문서 reduce 단계: 청크 요약들을 하나의 요약으로 통합하는 요청 구성"""
+        temperature = 0.3
+        partial_text = '\n'.join(
+            f"{i}. {p.get('title', '')}: {p.get('content', '')} (핵심: {', '.join(p.get('key_points', []))})"
+            for i, p in enumerate(partials, start=1)
+        )
+        prompt = f"""
+            다음은 하나의 소프트웨어 개발 가이드라인을 여러 부분으로 나누어 요약한 결과입니다.
+            이를 하나의 요약으로 통합해주세요.
             
-        try:
-            prompt = f"""
+            부분 요약:
+            {partial_text}
+            
+            다음 JSON 형식으로 응답해주세요:
+            {{
+                "title": "가이드라인의 제목",
+                "content": "가이드라인의 전체적인 요약 (2-3문장)",
+                "key_points": ["핵심 포인트 1", "핵심 포인트 2", "핵심 포인트 3"],
+                "word_count": 0
+            }}
+            
+            핵심 포인트는 중요도 순으로 3-7개를 작성해주세요.
+            JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
+            """
+        
+        return GPTStep(
+            kind='summary',
+            label=f'요약 병합 ({len(partials)}개)',
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 소프트웨어 개발 문서를 분석하고 요약하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=1000,
+            cache_key=make_cache_key('summary_reduce', partial_text, self.model_name, SUMMARY_REDUCE_PROMPT_VERSION, temperature),
+            stream_field='key_points',
+        )
+    
+    def build_checklist_step(self, summary: Dict[str, Any]) -> GPTStep:
+        """체크리스트 단계 요청 구성"""
+        temperature = 0.2
+        summary_text = json.dumps(
+            [summary.get('title', ''), summary.get('content', ''), summary.get('key_points', [])],
+            ensure_ascii=False,
+        )
+        prompt = f"""
             다음 가이드라인 요약을 바탕으로 개발자들이 사용할 수 있는 체크리스트를 생성해주세요.
             
             요약:
@@ -231,57 +461,818 @@ class GPTService:
             카테고리는 4-5개, 각 카테고리당 3-5개 항목을 만들어주세요.
             JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
             """
+        
+        return GPTStep(
+            kind='checklist',
+            label='체크리스트',
+            messages=[
+                {
+                    "role": "system", 
+                    "content": "당신은 소프트웨어 개발 체크리스트 작성 전문가입니다. 실용적이고 구체적인 체크리스트를 JSON 형식으로만 제공하세요."
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=1500,
+            cache_key=make_cache_key('checklist', summary_text, self.model_name, CHECKLIST_PROMPT_VERSION, temperature),
+            stream_field='categories',
+        )
+    
+    def build_fused_step(self, guideline_text: str = None) -> GPTStep:
+        """단일 호출 모드: 요약과 체크리스트를 한 번에 요청하는 단계 구성"""
+        if not guideline_text:
+            guideline_text = DEFAULT_GUIDELINE_TEXT
+        
+        temperature = 0.2
+        prompt = f"""
+            다음 소프트웨어 개발 가이드라인을 요약하고, 그 내용을 바탕으로 개발자들이 사용할 수 있는 체크리스트를 생성해주세요.
             
-            logger.info("🤖 실제 GPT API로 체크리스트 생성 시작...")
+            가이드라인:
+            {guideline_text}
             
-            # OpenAI 0.28.1 방식 사용
-            response = openai.ChatCompletion.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "당신은 소프트웨어 개발 체크리스트 작성 전문가입니다. 실용적이고 구체적인 체크리스트를 JSON 형식으로만 제공하세요."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
+            다음 JSON 형식으로 응답해주세요:
+            {{
+                "title": "가이드라인의 제목",
+                "content": "가이드라인의 전체적인 요약 (2-3문장)",
+                "key_points": ["핵심 포인트 1", "핵심 포인트 2", "핵심 포인트 3"],
+                "word_count": 단어수,
+                "categories": [
+                    {{
+                        "name": "카테고리명",
+                        "items": [
+                            {{
+                                "id": 1,
+                                "text": "체크할 내용 (질문 형태)",
+                                "required": true
+                            }}
+                        ]
+                    }}
+                ]
+            }}
+            
+            카테고리는 4-5개, 각 카테고리당 3-5개 항목을 만들어주세요.
+            JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
+            """
+        
+        return GPTStep(
+            kind='fused',
+            label='요약+체크리스트',
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 소프트웨어 개발 문서를 요약하고 실용적인 체크리스트를 작성하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=2500,
+            cache_key=make_cache_key('fused', guideline_text, self.model_name, FUSED_PROMPT_VERSION, temperature),
+            stream_field='categories',
+        )
+    
+    def build_revision_step(self, previous: Dict[str, Any], changes: List[SectionChange]) -> GPTStep:
+        """
+        증분 처리 단계 구성: 이전 요약/체크리스트와 변경된 섹션만 전달하여
+        갱신된 요약과 영향을 받은 카테고리만 요청합니다.
+        """
+        temperature = 0.2
+        summary = previous['summary']
+        categories = json.dumps(
+            [
+                {'name': category['name'], 'items': [item['text'] for item in category['items']]}
+                for category in previous['checklist'].get('categories', [])
+            ],
+            ensure_ascii=False,
+        )
+        labels = {'modified': '수정', 'added': '추가', 'removed': '삭제'}
+        change_text = '\n\n'.join(
+            f"[{labels[change.kind]}]\n"
+            + (f"이전:\n{change.old}\n" if change.old else '')
+            + (f"이후:\n{change.new}" if change.new else '')
+            for change in changes
+        )
+        prompt = f"""
+            다음은 기존 소프트웨어 개발 가이드라인의 요약과 체크리스트, 그리고 새 버전에서 변경된 섹션입니다.
+            변경 사항을 반영하여 요약을 갱신하고, 변경의 영향을 받은 체크리스트 카테고리만 다시 작성해주세요.
+            
+            기존 요약:
+            제목: {summary.get('title', '')}
+            내용: {summary.get('content', '')}
+            핵심 포인트: {', '.join(summary.get('key_points', []))}
+            
+            기존 체크리스트 카테고리:
+            {categories}
+            
+            변경된 섹션:
+            {change_text}
+            
+            다음 JSON 형식으로 응답해주세요:
+            {{
+                "title": "가이드라인의 제목",
+                "content": "갱신된 전체 요약 (2-3문장)",
+                "key_points": ["핵심 포인트 1", "핵심 포인트 2", "핵심 포인트 3"],
+                "categories": [
+                    {{
+                        "name": "변경된 카테고리명 (기존 이름 유지) 또는 새 카테고리명",
+                        "items": [
+                            {{
+                                "id": 1,
+                                "text": "체크할 내용 (질문 형태)",
+                                "required": true
+                            }}
+                        ]
+                    }}
                 ],
-                temperature=0.2,
-                max_tokens=1500
-            )
+                "removed_categories": ["더 이상 필요 없는 기존 카테고리명"]
+            }}
             
-            content = response.choices[0].message.content.strip()
-            logger.info(f"✅ GPT API 응답 성공! (길이: {len(content)}자)")
-            logger.info(f"응답 미리보기: {content[:100]}...")
+            영향을 받지 않은 카테고리는 categories에 포함하지 마세요.
+            JSON 형식만 반환하고 다른 텍스트는 포함하지 마세요.
+            """
+        
+        return GPTStep(
+            kind='revision',
+            label=f'증분 갱신 ({len(changes)}개 섹션)',
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 소프트웨어 개발 문서를 요약하고 실용적인 체크리스트를 작성하는 전문가입니다. 정확한 JSON 형식으로만 응답하세요."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=1500,
+            cache_key=make_cache_key('revision', prompt, self.model_name, REVISION_PROMPT_VERSION, temperature),
+            stream_field='categories',
+        )
+    
+    def generate_summary(self, guideline_text: str = None, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        가이드라인 텍스트를 요약하여 구조화된 데이터로 반환
+        on_partial이 주어지면 스트리밍으로 완성된 key_points를 즉시 전달합니다.
+        """
+        self._ensure_model()
+        
+        # Fallback 사용
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 데이터를 반환합니다.")
+            return self._get_default_summary()
+        
+        # 토큰 예산을 넘는 문서는 청크 단위 병렬 요약 후 병합 (map-reduce)
+        if self._needs_map_reduce(guideline_text):
+            return self._map_reduce_summary(guideline_text, on_partial)
+        
+        return self._run_step(self.build_summary_step(guideline_text), on_partial)
+    
+    def generate_checklist(self, summary: Dict[str, Any], on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        요약 데이터를 바탕으로 체크리스트를 생성
+        on_partial이 주어지면 스트리밍으로 완성된 카테고리를 즉시 전달합니다.
+        """
+        self._ensure_model()
+        
+        # Fallback 사용
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 체크리스트를 반환합니다.")
+            return self._get_default_checklist()
+        
+        return self._run_step(self.build_checklist_step(summary), on_partial)
+    
+    def generate_fused(self, guideline_text: str = None, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        요약과 체크리스트를 한 번의 호출로 생성하여 {'summary', 'checklist'} 반환
+        on_partial이 주어지면 완성된 체크리스트 카테고리를 즉시 전달합니다.
+        map-reduce가 필요한 대용량 문서는 2단계 체인으로 처리합니다.
+        """
+        self._ensure_model()
+        
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 데이터를 반환합니다.")
+            return {'summary': self._get_default_summary(), 'checklist': self._get_default_checklist()}
+        
+        if self._needs_map_reduce(guideline_text):
+            summary = self._map_reduce_summary(guideline_text)
+            return {'summary': summary, 'checklist': self.generate_checklist(summary, on_partial)}
+        
+        return self._split_fused(self._run_step(self.build_fused_step(guideline_text), on_partial))
+    
+    def generate_revision(self, previous: Dict[str, Any], changes: List[SectionChange],
+                          on_partial: PartialCallback = None) -> Optional[Dict[str, Any]]:
+        """
+        변경된 섹션만으로 요약/체크리스트 갱신 응답 생성
+        실제 GPT를 사용할 수 없거나 실패하면 None (전체 재처리 필요)
+        """
+        self._ensure_model()
+        if self.use_fallback:
+            return None
+        
+        revision = self._run_step(self.build_revision_step(previous, changes), on_partial)
+        return None if revision.get('_source') == 'fallback_dummy' else revision
+    
+    async def agenerate_summary(self, guideline_text: str = None, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        generate_summary의 비동기 버전 (이벤트 루프 기반 워커용)
+        """
+        self._ensure_model()
+        
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 데이터를 반환합니다.")
+            return self._get_default_summary()
+        
+        if self._needs_map_reduce(guideline_text):
+            return await self._amap_reduce_summary(guideline_text, on_partial)
+        
+        return await self._arun_step(self.build_summary_step(guideline_text), on_partial)
+    
+    async def agenerate_checklist(self, summary: Dict[str, Any], on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        generate_checklist의 비동기 버전 (이벤트 루프 기반 워커용)
+        """
+        self._ensure_model()
+        
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 체크리스트를 반환합니다.")
+            return self._get_default_checklist()
+        
+        return await self._arun_step(self.build_checklist_step(summary), on_partial)
+    
+    async def agenerate_fused(self, guideline_text: str = None, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        generate_fused의 비동기 버전 (이벤트 루프 기반 워커용)
+        """
+        self._ensure_model()
+        
+        if self.use_fallback:
+            logger.warning("🔄 실제 GPT API를 사용할 수 없어 더미 데이터를 반환합니다.")
+            return {'summary': self._get_default_summary(), 'checklist': self._get_default_checklist()}
+        
+        if self._needs_map_reduce(guideline_text):
+            summary = await self._amap_reduce_summary(guideline_text)
+            return {'summary': summary, 'checklist': await self.agenerate_checklist(summary, on_partial)}
+        
+        return self._split_fused(await self._arun_step(self.build_fused_step(guideline_text), on_partial))
+    
+    async def agenerate_revision(self, previous: Dict[str, Any], changes: List[SectionChange],
+                                 on_partial: PartialCallback = None) -> Optional[Dict[str, Any]]:
+        """
+        generate_revision의 비동기 버전 (이벤트 루프 기반 워커용)
+        """
+        self._ensure_model()
+        if self.use_fallback:
+            return None
+        
+        revision = await self._arun_step(self.build_revision_step(previous, changes), on_partial)
+        return None if revision.get('_source') == 'fallback_dummy' else revision
+    
+    @staticmethod
+    def _split_fused(data: Dict[str, Any]) -> Dict[str, Any]:
+        """단일 호출 응답을 2단계 체인과 같은 summary/checklist 구조로 분리"""
+        meta = {key: data[key] for key in ('_source', '_model') if key in data}
+        summary = {key: data[key] for key in ('title', 'content', 'key_points', 'word_count') if key in data}
+        checklist = {key: data[key] for key in ('categories', 'total_items', 'required_items') if key in data}
+        return {'summary': {**summary, **meta}, 'checklist': {**checklist, **meta}}
+    
+    @staticmethod
+    def _needs_map_reduce(guideline_text: str) -> bool:
+        budget = getattr(settings, 'GPT_SUMMARY_CHUNK_TOKENS', 3000)
+        return bool(guideline_text) and estimate_tokens(guideline_text) > budget
+    
+    def _map_reduce_summary(self, guideline_text: str, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """
+        대용량 가이드라인 요약
+        섹션 경계로 나눈 청크를 스레드 풀에서 병렬 요약(map)한 뒤 하나로 병합(reduce)합니다.
+        지연 시간은 문서 길이가 아니라 병렬 폭(GPT_SUMMARY_MAP_CONCURRENCY)에 비례합니다.
+        """
+        budget = getattr(settings, 'GPT_SUMMARY_CHUNK_TOKENS', 3000)
+        chunks = chunk_document(guideline_text, budget)
+        logger.info(f"📚 대용량 가이드라인: {len(chunks)}개 청크로 나누어 병렬 요약합니다.")
+        
+        with ThreadPoolExecutor(max_workers=getattr(settings, 'GPT_SUMMARY_MAP_CONCURRENCY', 8)) as pool:
+            steps = [self.build_chunk_summary_step(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, start=1)]
+            partials = self._usable_partials(pool.map(self._run_step, steps))
             
-            # JSON 파싱 (마크다운 코드 블록 제거)
+            # 청크 요약이 많아 한 번에 병합할 수 없으면 단계적으로 병합
+            groups = self._group_partials(partials, budget)
+            while len(groups) > 1 and len(groups) < len(partials):
+                partials = self._usable_partials(pool.map(self._run_step, map(self.build_reduce_step, groups)))
+                groups = self._group_partials(partials, budget)
+        
+        if not partials:
+            return self._get_default_summary()
+        
+        summary = self._run_step(self.build_reduce_step(partials), on_partial)
+        return self._finish_map_reduce(summary, guideline_text, len(chunks))
+    
+    async def _amap_reduce_summary(self, guideline_text: str, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """_map_reduce_summary의 비동기 버전 (동시 호출 수는 비동기 세마포어로 제한)"""
+        budget = getattr(settings, 'GPT_SUMMARY_CHUNK_TOKENS', 3000)
+        chunks = chunk_document(guideline_text, budget)
+        logger.info(f"📚 대용량 가이드라인: {len(chunks)}개 청크로 나누어 병렬 요약합니다. (async)")
+        
+        steps = [self.build_chunk_summary_step(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, start=1)]
+        partials = self._usable_partials(await asyncio.gather(*map(self._arun_step, steps)))
+        
+        groups = self._group_partials(partials, budget)
+        while len(groups) > 1 and len(groups) < len(partials):
+            partials = self._usable_partials(
+                await asyncio.gather(*(self._arun_step(self.build_reduce_step(group)) for group in groups))
+            )
+            groups = self._group_partials(partials, budget)
+        
+        if not partials:
+            return self._get_default_summary()
+        
+        summary = await self._arun_step(self.build_reduce_step(partials), on_partial)
+        return self._finish_map_reduce(summary, guideline_text, len(chunks))
+    
+    @staticmethod
+    def _usable_partials(results) -> List[Dict[str, Any]]:
+        """실패(더미)한 청크 요약 제외"""
+        return [r for r in results if r.get('_source') != 'fallback_dummy']
+    
+    @staticmethod
+    def _group_partials(partials: List[Dict[str, Any]], budget: int) -> List[List[Dict[str, Any]]]:
+        """병합 프롬프트가 토큰 예산을 넘지 않도록 청크 요약을 묶음"""
+        groups, current, current_tokens = [], [], 0
+        for partial in partials:
+            tokens = estimate_tokens(json.dumps(partial, ensure_ascii=False))
+            if current and current_tokens + tokens > budget:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(partial)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    @staticmethod
+    def _finish_map_reduce(summary: Dict[str, Any], guideline_text: str, chunk_count: int) -> Dict[str, Any]:
+        if summary.get('_source') != 'fallback_dummy':
+            # 병합 단계는 원문을 보지 못하므로 단어 수는 원문 기준으로 계산
+            summary['word_count'] = len(guideline_text.split())
+            summary['_chunks'] = chunk_count
+        return summary
+    
+    def _run_step(self, step: GPTStep, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """캐시 확인 후 GPT 호출 및 응답 처리 (응답이 잘못되면 이 단계만 재요청)"""
+        # 동일 입력에 대한 캐시된 결과 재사용
+        cached = self.result_cache.get(step.cache_key)
+        if cached is not None:
+            logger.info(f"♻️ 캐시된 {step.label} 결과를 사용합니다.")
+            return cached
+        
+        for attempt in range(self.output_retries + 1):
+            response = self._request(step, on_partial)
+            if response is None:
+                return self._get_default(step)
+            content, model = response
             try:
-                # ```json과 ``` 제거
-                if content.startswith('```json'):
-                    content = content[7:]  # ```json 제거
-                if content.startswith('```'):
-                    content = content[3:]   # ``` 제거
-                if content.endswith('```'):
-                    content = content[:-3]  # 끝의 ``` 제거
-                
-                content = content.strip()
-                checklist_data = json.loads(content)
-                logger.info("🎉 실제 GPT가 생성한 체크리스트 완료!")
-                
-                # GPT 응답임을 표시하기 위해 메타 정보 추가
-                checklist_data['_source'] = 'openai_gpt'
-                checklist_data['_model'] = self.model_name
+                return self._handle_content(step, content, model)
+            except OutputError as e:
+                step = self._on_output_error(step, content, e, attempt)
+                # 재요청은 스트리밍하지 않으므로 잘못된 응답에서 게시한 부분 결과를 지움
+                if on_partial is not None:
+                    on_partial([])
+                on_partial = None
+        return self._get_default(step)
+    
+    async def _arun_step(self, step: GPTStep, on_partial: PartialCallback = None) -> Dict[str, Any]:
+        """_run_step의 비동기 버전 (Redis 캐시 조회/저장과 지표 기록은 스레드에서 실행)"""
+        cached = await asyncio.to_thread(self.result_cache.get, step.cache_key)
+        if cached is not None:
+            logger.info(f"♻️ 캐시된 {step.label} 결과를 사용합니다.")
+            return cached
+        
+        for attempt in range(self.output_retries + 1):
+            response = await self._arequest(step, on_partial)
+            if response is None:
+                return self._get_default(step)
+            content, model = response
+            try:
+                return await asyncio.to_thread(self._handle_content, step, content, model)
+            except OutputError as e:
+                step = await asyncio.to_thread(self._on_output_error, step, content, e, attempt)
+                if on_partial is not None:
+                    on_partial([])
+                on_partial = None
+        return self._get_default(step)
+    
+    def _request(self, step: GPTStep, on_partial: PartialCallback = None) -> Optional[Tuple[str, str]]:
+        """
+        GPT 호출 후 (응답 텍스트, 응답한 모델) 반환 (재시도할 수 없는 오류는 None)
+        주 모델이 최근 p95 안에 응답하지 않으면 다음 모델로 hedge 요청을 보내 먼저 온 응답을 사용합니다.
+        """
+        models = self._route(step)
+        hedge_delay = self._hedge_delay(step, models) if self.sync_hedging else None
+        
+        try:
+            logger.info(f"🤖 실제 GPT API로 {step.label} 생성 시작... ({models[0]})")
+            if hedge_delay is None:
+                return self._call_model(step, models[0], on_partial), models[0]
+            return self._hedged_call(step, models[0], models[1], hedge_delay, on_partial)
+        
+        except RetryLater:
+            raise
                 
-                return checklist_data
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 파싱 에러: {e}")
-                logger.error(f"정제된 응답: {content[:200]}...")
-                return self._get_default_checklist()
+        except Exception as e:
+            logger.error(f"❌ GPT {step.label} 생성 오류: {e}")
+            return None
+    
+    async def _arequest(self, step: GPTStep, on_partial: PartialCallback = None) -> Optional[Tuple[str, str]]:
+        """_request의 비동기 버전 (늦게 끝난 hedge 요청은 취소)"""
+        models = await asyncio.to_thread(self._route, step)
+        hedge_delay = self._hedge_delay(step, models)
+        
+        try:
+            logger.info(f"🤖 실제 GPT API로 {step.label} 생성 시작... ({models[0]}, async)")
+            if hedge_delay is None:
+                return await self._acall_model(step, models[0], on_partial), models[0]
+            return await self._ahedged_call(step, models[0], models[1], hedge_delay, on_partial)
+        
+        except RetryLater:
+            raise
                 
         except Exception as e:
-            logger.error(f"❌ GPT 체크리스트 생성 오류: {e}")
-            return self._get_default_checklist()
+            logger.error(f"❌ GPT {step.label} 생성 오류: {e}")
+            return None
+    
+    def _call_model(self, step: GPTStep, model: str, on_partial: PartialCallback = None) -> str:
+        """지정한 모델로 호출 (시도마다 차단기 확인 → 호출 예산 확보 → 결과 기록, 백오프 재시도)"""
+        breaker = self._get_breaker(model)
+        tokens = estimate_request_tokens(step.messages, step.max_tokens)
+        
+        def call():
+            # 재시도도 upstream 요청 1건이므로 시도마다 차단기 확인과 예산 확보
+            # (차단기가 열려 있으면 CircuitOpenError, 한도 초과 시 RateLimitExceeded로 작업 재예약)
+            breaker.before_call()
+            if self.rate_limiter:
+                self.rate_limiter.acquire(model, tokens)
+            try:
+                if self._should_stream(on_partial):
+                    content = self._complete_stream(step, on_partial, model)
+                else:
+                    content = self._complete(step, model)
+            except RETRYABLE_ERRORS:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return content
+        
+        started = time.monotonic()
+        try:
+            content = self._call_with_retry(step, call)
+        except Exception:
+            self._record_call(step, model, ok=False)
+            raise
+        self._record_call(step, model, latency=time.monotonic() - started)
+        return content
+    
+    async def _acall_model(self, step: GPTStep, model: str, on_partial: PartialCallback = None) -> str:
+        """_call_model의 비동기 버전"""
+        breaker = self._get_breaker(model)
+        tokens = estimate_request_tokens(step.messages, step.max_tokens)
+        
+        async def call():
+            await asyncio.to_thread(breaker.before_call)
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire(model, tokens)
+            try:
+                async with self._get_async_semaphore():
+                    if self._should_stream(on_partial):
+                        content = await self._acomplete_stream(step, on_partial, model)
+                    else:
+                        content = await self._acomplete(step, model)
+            except RETRYABLE_ERRORS:
+                await asyncio.to_thread(breaker.record_failure)
+                raise
+            await asyncio.to_thread(breaker.record_success)
+            return content
+        
+        started = time.monotonic()
+        try:
+            content = await self._acall_with_retry(step, call)
+        except Exception:
+            self._record_call(step, model, ok=False)
+            raise
+        await asyncio.to_thread(self._record_call, step, model, time.monotonic() - started)
+        return content
+    
+    def _hedged_call(self, step: GPTStep, primary: str, secondary: str, delay: float,
+                     on_partial: PartialCallback = None) -> Tuple[str, str]:
+        """
+        주 모델 호출이 delay초 안에 끝나지 않으면 보조 모델로 중복 요청하고 먼저 성공한 응답 반환
+        스레드 호출은 취소할 수 없어 늦은 쪽 요청도 끝까지 실행되고 비용이 청구됩니다 (GPT_HEDGE_SYNC_ENABLED일 때만 사용).
+        """
+        gate = _PartialGate(on_partial)
+        pool = self._get_hedge_pool()
+        futures = {pool.submit(self._call_model, step, primary, gate.writer(primary)): primary}
+        
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            logger.info(f"⏱️ {step.label}: {primary} 응답이 {delay:.1f}초를 넘어 {secondary}로 hedge 요청")
+            metrics.incr('gpt_hedge.sent')
+            futures[pool.submit(self._call_model, step, secondary, gate.writer(secondary))] = secondary
+        
+        # 먼저 성공한 응답 사용 (늦은 쪽 결과는 버림)
+        pending, error = set(futures), None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return self._hedge_winner(future.result(), futures[future], primary), futures[future]
+                error = error or future.exception()
+        raise error
+    
+    async def _ahedged_call(self, step: GPTStep, primary: str, secondary: str, delay: float,
+                            on_partial: PartialCallback = None) -> Tuple[str, str]:
+        """_hedged_call의 비동기 버전 (늦은 쪽 요청은 취소)"""
+        gate = _PartialGate(on_partial)
+        tasks = {asyncio.ensure_future(self._acall_model(step, primary, gate.writer(primary))): primary}
+        
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            logger.info(f"⏱️ {step.label}: {primary} 응답이 {delay:.1f}초를 넘어 {secondary}로 hedge 요청 (async)")
+            await asyncio.to_thread(metrics.incr, 'gpt_hedge.sent')
+            tasks[asyncio.ensure_future(self._acall_model(step, secondary, gate.writer(secondary)))] = secondary
+        
+        pending, error = set(tasks), None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        content = await asyncio.to_thread(self._hedge_winner, task.result(), tasks[task], primary)
+                        return content, tasks[task]
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _route(self, step: GPTStep) -> List[str]:
+        """단계별 호출 모델 순서 (라우터 미사용 시 선택된 모델 하나)"""
+        if self.router is None:
+            return [self.model_name]
+        candidates = getattr(settings, 'GPT_MODEL_CANDIDATES', ['gpt-4o-mini', 'gpt-3.5-turbo'])
+        models = [self.model_name] + [model for model in candidates if model != self.model_name]
+        # 차단기가 열린 모델 제외 (모두 열려 있으면 주 모델 호출 시 CircuitOpenError로 재예약)
+        models = [model for model in models if not self._get_breaker(model).is_open()] or models[:1]
+        return self.router.route(models, step.kind, estimate_request_tokens(step.messages, step.max_tokens))
+    
+    def _hedge_delay(self, step: GPTStep, models: List[str]) -> Optional[float]:
+        if self.router is None or len(models) < 2 or step.kind not in self.hedge_steps:
+            return None
+        return self.router.hedge_delay(models[0], step.kind)
+    
+    @staticmethod
+    def _hedge_winner(content, model: str, primary: str):
+        if model != primary:
+            metrics.incr('gpt_hedge.won')
+        return content
+    
+    def _record_call(self, step: GPTStep, model: str, latency: float = None, ok: bool = True):
+        if self.router is not None:
+            self.router.record(model, step.kind, latency, ok)
+    
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        if self._hedge_pool is None:
+            with self._hedge_pool_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=getattr(settings, 'GPT_HEDGE_POOL_SIZE', 16),
+                        thread_name_prefix='gpt-hedge',
+                    )
+        return self._hedge_pool
+    
+    def _on_output_error(self, step: GPTStep, content: str, error: OutputError, attempt: int) -> GPTStep:
+        """파싱/스키마 실패 기록 후 재요청할 단계 구성"""
+        metrics.incr('gpt_output.failures')
+        metrics.incr(f'gpt_output.failures.{step.kind}')
+        logger.error(f"❌ {step.label} 응답 처리 실패: {error}")
+        logger.error(f"응답 미리보기: {content[:200]}...")
+        
+        if attempt < self.output_retries:
+            metrics.incr('gpt_output.recalls')
+            logger.warning(f"🔁 {step.label} 단계만 다시 요청합니다. ({attempt + 1}/{self.output_retries})")
+        return self.build_repair_step(step, content, error)
+    
+    def build_repair_step(self, step: GPTStep, content: str, error: OutputError) -> GPTStep:
+        """잘못된 응답과 오류를 알려주고 스키마에 맞는 JSON만 다시 요청"""
+        schema = json.dumps(OUTPUT_SCHEMAS.get(step.kind, {}), ensure_ascii=False)
+        return step._replace(
+            label=f'{step.label} 재요청',
+            messages=step.messages + [
+                {"role": "assistant", "content": content},
+                {
+                    "role": "user",
+                    "content": (
+                        f"직전 응답을 사용할 수 없습니다: {error}\n"
+                        f"다음 JSON 스키마를 만족하는 JSON 객체 하나만 응답하세요. 설명, 코드 블록, 생략 없이 끝까지 작성하세요.\n"
+                        f"{schema}"
+                    ),
+                },
+            ],
+            temperature=0,
+        )
+    
+    def _call_with_retry(self, step: GPTStep, call: Callable[[], str]) -> str:
+        """
+        재시도 가능한 오류(타임아웃, 429, 5xx, 연결 오류)는 지터를 준 지수 백오프로 재시도
+        모두 실패하면 GPTUnavailable을 발생시켜 더미 데이터 대신 작업을 재예약하게 합니다.
+        """
+        attempts = getattr(settings, 'GPT_RETRY_MAX_ATTEMPTS', 3)
+        for attempt in range(1, attempts + 1):
+            try:
+                return call()
+            except RETRYABLE_ERRORS as e:
+                self._on_retryable_error(step, e, attempt, attempts)
+                time.sleep(self._backoff_delay(attempt, e))
+    
+    async def _acall_with_retry(self, step: GPTStep, call: Callable[[], Awaitable[str]]) -> str:
+        """_call_with_retry의 비동기 버전"""
+        attempts = getattr(settings, 'GPT_RETRY_MAX_ATTEMPTS', 3)
+        for attempt in range(1, attempts + 1):
+            try:
+                return await call()
+            except RETRYABLE_ERRORS as e:
+                await asyncio.to_thread(self._on_retryable_error, step, e, attempt, attempts)
+                await asyncio.sleep(self._backoff_delay(attempt, e))
+    
+    def _on_retryable_error(self, step: GPTStep, error: Exception, attempt: int, attempts: int):
+        if attempt >= attempts:
+            logger.error(f"❌ GPT {step.label} 호출 {attempts}회 실패: {error}")
+            raise GPTUnavailable(
+                f"GPT {step.label} 호출 실패 ({attempts}회 시도): {error}",
+                retry_after=getattr(settings, 'GPT_CIRCUIT_COOLDOWN', 30),
+            ) from error
+        metrics.incr('gpt.retries')
+        logger.warning(f"⚠️ GPT {step.label} 호출 실패 ({attempt}/{attempts}), 재시도합니다: {error}")
+    
+    @staticmethod
+    def _backoff_delay(attempt: int, error: Exception) -> float:
+        """full jitter 지수 백오프 (서버가 Retry-After를 주면 그 이상 대기)"""
+        base = getattr(settings, 'GPT_RETRY_BASE_DELAY', 0.5)
+        cap = getattr(settings, 'GPT_RETRY_MAX_DELAY', 8)
+        delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+        
+        headers = getattr(error, 'headers', None) or {}
+        try:
+            delay = max(delay, float(headers.get('retry-after', 0)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+    
+    def _get_breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(f'openai:{model}')
+        return self._breakers[model]
+    
+    def _complete(self, step: GPTStep, model: str = None) -> str:
+        """LLM 백엔드로 completion 호출 후 응답 텍스트 반환"""
+        response = self.backend.chat(
+            model=model or self.model_name,
+            messages=step.messages,
+            temperature=step.temperature,
+            max_tokens=step.max_tokens,
+            request_timeout=self.request_timeout,
+            **self._output_kwargs(step)
+        )
+        self._record_usage(step, response.get('usage'))
+        return self._message_text(response.choices[0].message).strip()
+    
+    async def _acomplete(self, step: GPTStep, model: str = None) -> str:
+        """비동기 completion 호출 (OpenAI 백엔드는 openai.aiosession 세션 공유)"""
+        response = await self.backend.achat(
+            model=model or self.model_name,
+            messages=step.messages,
+            temperature=step.temperature,
+            max_tokens=step.max_tokens,
+            request_timeout=self.request_timeout,
+            **self._output_kwargs(step)
+        )
+        await asyncio.to_thread(self._record_usage, step, response.get('usage'))
+        return self._message_text(response.choices[0].message).strip()
+    
+    def _complete_stream(self, step: GPTStep, on_partial: PartialCallback, model: str = None) -> str:
+        """
+        stream=True로 토큰을 받는 즉시 점진 파싱하여
+        완성된 배열 원소 목록을 on_partial로 전달하고 전체 응답 텍스트 반환
+        """
+        parser = IncrementalJSONParser(step.stream_field)
+        for chunk in self.backend.chat(
+            model=model or self.model_name,
+            messages=step.messages,
+            temperature=step.temperature,
+            max_tokens=step.max_tokens,
+            request_timeout=self.request_timeout,
+            stream=True,
+            **self._output_kwargs(step)
+        ):
+            delta = self._message_text(chunk['choices'][0]['delta'])
+            if delta and parser.feed(delta):
+                on_partial(list(parser.items))
+        return parser.text.strip()
+    
+    async def _acomplete_stream(self, step: GPTStep, on_partial: PartialCallback, model: str = None) -> str:
+        """_complete_stream의 비동기 버전"""
+        parser = IncrementalJSONParser(step.stream_field)
+        response = await self.backend.achat(
+            model=model or self.model_name,
+            messages=step.messages,
+            temperature=step.temperature,
+            max_tokens=step.max_tokens,
+            request_timeout=self.request_timeout,
+            stream=True,
+            **self._output_kwargs(step)
+        )
+        async for chunk in response:
+            delta = self._message_text(chunk['choices'][0]['delta'])
+            if delta and parser.feed(delta):
+                on_partial(list(parser.items))
+        return parser.text.strip()
+    
+    def _record_usage(self, step: GPTStep, usage: Optional[Dict[str, int]]):
+        """응답의 토큰 사용량 기록 (스트리밍 응답에는 사용량이 없음)"""
+        if not usage:
+            return
+        metrics.incr('gpt_tokens.prompt', usage.get('prompt_tokens', 0))
+        metrics.incr('gpt_tokens.completion', usage.get('completion_tokens', 0))
+        metrics.incr(f'gpt_tokens.{step.kind}', usage.get('total_tokens', 0))
+    
+    def _output_kwargs(self, step: GPTStep) -> Dict[str, Any]:
+        """구조화 출력 모드별 추가 파라미터 (function calling 또는 JSON mode)"""
+        if self.output_mode == 'function' and step.kind in OUTPUT_SCHEMAS:
+            spec = function_spec(step.kind)
+            return {'functions': [spec], 'function_call': {'name': spec['name']}}
+        if self.output_mode == 'json':
+            return {'response_format': {'type': 'json_object'}}
+        return {}
+    
+    @staticmethod
+    def _message_text(message) -> str:
+        """응답 메시지(또는 스트리밍 delta)에서 function 인자 또는 본문 텍스트 추출"""
+        function_call = message.get('function_call')
+        if function_call:
+            return function_call.get('arguments') or ''
+        return message.get('content') or ''
+    
+    @staticmethod
+    def _should_stream(on_partial: PartialCallback) -> bool:
+        return on_partial is not None and getattr(settings, 'GPT_STREAMING_ENABLED', True)
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """
+        현재 이벤트 루프의 동시 GPT 호출 수 제한 세마포어
+        (GPT_ASYNC_MAX_CONCURRENCY)
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_semaphore is None or self._async_semaphore_loop is not loop:
+            self._async_semaphore = asyncio.Semaphore(getattr(settings, 'GPT_ASYNC_MAX_CONCURRENCY', 50))
+            self._async_semaphore_loop = loop
+        return self._async_semaphore
+    
+    def _handle_content(self, step: GPTStep, content: str, model: str = None) -> Dict[str, Any]:
+        """
+        응답 텍스트를 JSON으로 파싱/스키마 검증하고 메타 정보 추가 후 캐시에 저장 (주 모델 응답만)
+        사용할 수 없는 응답이면 OutputError를 발생시킵니다.
+        """
+        logger.info(f"✅ GPT API 응답 성공! (길이: {len(content)}자)")
+        logger.info(f"응답 미리보기: {content[:100]}...")
+        metrics.incr('gpt_output.responses')
+        
+        # 코드 블록/설명문 무시, 잘린 JSON 복구
+        data, repaired = parse_output(content)
+        if repaired:
+            metrics.incr('gpt_output.repaired')
+            logger.warning(f"🩹 {step.label} 응답의 깨진 JSON을 복구했습니다.")
+        data = validate_output(step.kind, data)
+        logger.info(f"🎉 실제 GPT가 생성한 {step.label} 완료!")
+        
+        # GPT 응답임을 표시하기 위해 메타 정보 추가
+        data['_source'] = 'openai_gpt'
+        data['_model'] = model or self.model_name
+        
+        # 캐시 키는 주 모델(self.model_name) 기준이므로 라우터/hedge로 다른 모델이 응답한 결과는 저장하지 않음
+        if data['_model'] == self.model_name:
+            self.result_cache.set(step.cache_key, data)
+        return data
+    
+    def _get_default(self, step: GPTStep) -> Dict[str, Any]:
+        """단계별 기본값 반환"""
+        if step.kind in ('summary', 'summary_chunk'):
+            return self._get_default_summary()
+        if step.kind in ('fused', 'revision'):
+            return {**self._get_default_summary(), **self._get_default_checklist()}
+        return self._get_default_checklist()
     
     def _get_default_summary(self) -> Dict[str, Any]:
         """기본 요약 반환 (더미 데이터)"""
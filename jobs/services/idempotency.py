@@ -0,0 +1,34 @@
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+
+from common.utils import get_redis
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key → event_id 조회용 Redis 캐시 (idem:<tenant>:<키 해시>)
+
+    원본은 Job.idempotency_key 유니크 열이고, 여기에는 보존 기간(ttl) 동안
+    재시도 요청이 Postgres를 거치지 않도록 사본만 둡니다.
+    """
+
+    def __init__(self, ttl: int = None, prefix: str = 'idem:'):
+        self.ttl = ttl or getattr(settings, 'JOB_IDEMPOTENCY_TTL', 60 * 60 * 24)
+        self.prefix = prefix
+        self._redis = get_redis()
+
+    def get(self, tenant: str, key: str) -> Optional[str]:
+        event_id = self._redis.get(self._key(tenant, key))
+        if event_id is None:
+            return None
+        return event_id.decode() if isinstance(event_id, bytes) else str(event_id)
+
+    def remember(self, tenant: str, key: str, event_id, ttl: float = None):
+        """처음 기록된 event_id만 유지 (SET NX), ttl은 남은 보존 기간"""
+        self._redis.set(self._key(tenant, key), str(event_id), nx=True, ex=max(1, int(ttl or self.ttl)))
+
+    def _key(self, tenant: str, key: str) -> str:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return f'{self.prefix}{tenant}:{digest}'
@@ -0,0 +1,92 @@
+import copy
+import difflib
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .chunking import split_sections
+from .single_flight import content_hash
+
+
+class SectionChange(NamedTuple):
+    kind: str                   # 'modified' | 'added' | 'removed'
+    old: Optional[str]
+    new: Optional[str]
+
+
+class SectionDiff(NamedTuple):
+    changes: List[SectionChange]
+    total_sections: int
+    changed_sections: int
+
+    @property
+    def change_ratio(self) -> float:
+        return self.changed_sections / max(1, self.total_sections)
+
+
+def diff_sections(old_text: str, new_text: str) -> SectionDiff:
+    """
+    두 버전의 가이드라인을 섹션 단위로 비교
+    섹션 내용 해시(공백 차이 무시)가 같으면 변경되지 않은 것으로 봅니다.
+    """
+    old_sections, new_sections = split_sections(old_text), split_sections(new_text)
+    matcher = difflib.SequenceMatcher(
+        a=[content_hash(section) for section in old_sections],
+        b=[content_hash(section) for section in new_sections],
+        autojunk=False,
+    )
+
+    changes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        old, new = old_sections[i1:i2], new_sections[j1:j2]
+        # 같은 위치에서 바뀐 섹션은 수정으로, 남는 섹션은 추가/삭제로 처리
+        for k in range(max(len(old), len(new))):
+            if k < len(old) and k < len(new):
+                changes.append(SectionChange('modified', old[k], new[k]))
+            elif k < len(new):
+                changes.append(SectionChange('added', None, new[k]))
+            else:
+                changes.append(SectionChange('removed', old[k], None))
+
+    return SectionDiff(
+        changes=changes,
+        total_sections=max(len(old_sections), len(new_sections)),
+        changed_sections=len(changes),
+    )
+
+
+def merge_revision(previous: Dict[str, Any], revision: Dict[str, Any], guideline_text: str) -> Dict[str, Any]:
+    """
+    이전 결과에 revision 응답을 병합하여 {'summary', 'checklist'} 반환
+    변경된 카테고리는 이름 기준으로 교체하고, 새 카테고리는 추가, removed_categories는 제거합니다.
+    """
+    meta = {key: revision[key] for key in ('_source', '_model') if key in revision}
+
+    summary = copy.deepcopy(previous['summary'])
+    summary.update({key: revision[key] for key in ('title', 'content', 'key_points')})
+    summary['word_count'] = len(guideline_text.split())
+    summary.update(meta)
+
+    updated = {category['name']: category for category in revision.get('categories', [])}
+    removed = set(revision.get('removed_categories', [])) - set(updated)
+
+    categories = []
+    for category in previous['checklist'].get('categories', []):
+        if category['name'] in removed:
+            continue
+        categories.append(copy.deepcopy(updated.pop(category['name'], category)))
+    categories.extend(copy.deepcopy(list(updated.values())))
+
+    # 항목 번호 재부여 및 개수 재계산
+    items = [item for category in categories for item in category['items']]
+    for number, item in enumerate(items, start=1):
+        item['id'] = number
+
+    checklist = copy.deepcopy(previous['checklist'])
+    checklist.update({
+        'categories': categories,
+        'total_items': len(items),
+        'required_items': sum(1 for item in items if item.get('required')),
+        **meta,
+    })
+    return {'summary': summary, 'checklist': checklist}
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from common.utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 작업별 상태 변경 알림 채널 (jobevents:<event_id>, 메시지는 새 상태)
+CHANNEL_PREFIX = 'jobevents:'
+
+
+def publish_job_event(event_id, status: str = None):
+    """작업 상태 변경 알림 (기다리는 SSE / long-poll 연결을 깨움, 실패해도 작업은 계속)"""
+    try:
+        get_redis().publish(f'{CHANNEL_PREFIX}{event_id}', status or '')
+    except Exception as e:
+        logger.warning(f"작업 알림 게시 실패 ({event_id}): {e}")
+
+
+class JobEventListener:
+    """
+    프로세스당 Redis 구독 하나(PSUBSCRIBE jobevents:*)로 받은 알림을 작업별 대기자에게 전달
+
+    구독은 별도 스레드 하나가 담당하고, 대기 중인 연결은 asyncio.Queue만 들고 있으므로
+    기다리는 요청 수만큼 스레드나 Redis 연결이 늘어나지 않습니다.
+    연결이 끊기면 다시 구독하며, 그 사이의 알림은 대기자가 timeout 후 상태를 다시 읽어 보완합니다.
+    """
+
+    def __init__(self, poll_timeout: float = 1.0):
+        self.poll_timeout = poll_timeout
+        self._waiters = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def add(self, event_id: str, loop, queue: asyncio.Queue):
+        with self._lock:
+            self._waiters[event_id].add((loop, queue))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='job-events', daemon=True)
+                self._thread.start()
+
+    def remove(self, event_id: str, loop, queue: asyncio.Queue):
+        with self._lock:
+            waiters = self._waiters.get(event_id)
+            if waiters is not None:
+                waiters.discard((loop, queue))
+                if not waiters:
+                    del self._waiters[event_id]
+
+    async def wait_ready(self, timeout: float):
+        """구독이 서버에 등록될 때까지 대기 (이후 게시된 알림은 놓치지 않음)"""
+        if not self._ready.is_set():
+            await asyncio.get_running_loop().run_in_executor(None, self._ready.wait, timeout)
+
+    def _run(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub()
+                pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+                while True:
+                    message = pubsub.get_message(timeout=self.poll_timeout)
+                    if message is None:
+                        continue
+                    if message['type'] == 'psubscribe':
+                        self._ready.set()
+                    elif message['type'] == 'pmessage':
+                        self._dispatch(_text(message['channel'])[len(CHANNEL_PREFIX):], _text(message['data']))
+            except Exception as e:
+                self._ready.clear()
+                logger.warning(f"작업 알림 구독 끊김, 다시 연결합니다: {e}")
+                time.sleep(self.poll_timeout)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+    def _dispatch(self, event_id: str, status: str):
+        with self._lock:
+            waiters = list(self._waiters.get(event_id, ()))
+        for loop, queue in waiters:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, status)
+            except RuntimeError:
+                # 이미 닫힌 이벤트 루프 (연결 종료)
+                self.remove(event_id, loop, queue)
+
+
+_listener = JobEventListener()
+
+
+@asynccontextmanager
+async def subscribe(event_id, ready_timeout: float = 5.0):
+    """
+    작업 알림을 받는 asyncio.Queue
+    진입 시점에는 구독이 준비되어 있으므로, 상태를 읽은 뒤 기다려도 그 사이의 변경을 놓치지 않습니다.
+    """
+    loop, queue = asyncio.get_running_loop(), asyncio.Queue()
+    _listener.add(str(event_id), loop, queue)
+    try:
+        await _listener.wait_ready(ready_timeout)
+        yield queue
+    finally:
+        _listener.remove(str(event_id), loop, queue)
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
@@ -0,0 +1,55 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from common.utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 부분 결과 보관 시간 (작업 완료 후에는 Job.result가 기준이 됨)
+PROGRESS_TTL = 60 * 60
+
+
+def _key(event_id) -> str:
+    return f'job_progress:{event_id}'
+
+
+def publish_partial(event_id, step: str, field: str, items: List[Any]):
+    """
+    스트리밍 중 완성된 부분 결과를 Redis 해시에 게시 ((단계, 필드)마다 HSET 1회, 읽고 다시 쓰지 않음)
+    items가 비어 있으면 그 (단계, 필드)의 부분 결과를 지웁니다 (잘못된 응답을 다시 요청할 때).
+    예: publish_partial(event_id, 'checklist', 'categories', [...])
+    """
+    try:
+        redis = get_redis()
+        if not items:
+            redis.hdel(_key(event_id), f'{step}.{field}')
+            return
+        pipe = redis.pipeline(transaction=False)
+        pipe.hset(_key(event_id), f'{step}.{field}', json.dumps(items, ensure_ascii=False))
+        pipe.expire(_key(event_id), PROGRESS_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"부분 결과 게시 실패 ({event_id}): {e}")
+
+
+def get_partial(event_id) -> Optional[Dict[str, Any]]:
+    """게시된 부분 결과 조회 ({단계: {필드: 목록}}, 없으면 None)"""
+    try:
+        fields = get_redis().hgetall(_key(event_id))
+    except Exception as e:
+        logger.warning(f"부분 결과 조회 실패 ({event_id}): {e}")
+        return None
+    partial = {}
+    for name, value in fields.items():
+        step, field = (name.decode() if isinstance(name, bytes) else name).split('.', 1)
+        partial.setdefault(step, {})[field] = json.loads(value)
+    return partial or None
+
+
+def clear_partial(event_id):
+    """작업 종료 후 부분 결과 삭제"""
+    try:
+        get_redis().delete(_key(event_id))
+    except Exception as e:
+        logger.warning(f"부분 결과 삭제 실패 ({event_id}): {e}")
@@ -0,0 +1,128 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from common.utils import get_redis
+
+# 종료 상태 (Postgres에 반영할 대상)
+TERMINAL_STATUSES = ('completed', 'failed')
+_DATETIME_FIELDS = ('created_at', 'updated_at')
+
+
+class JobStateStore:
+    """
+    작업의 상태(status / message / result)를 Redis 해시에 보관 (jobstate:<event_id>)
+
+    - 작업 단계와 상태 조회 API가 같은 해시를 읽고 쓰므로 중간 상태는 Postgres에 쓰지 않음
+    - 종료 상태는 dirty 집합에 올려 두고 flush 작업이 묶음으로 Postgres에 반영
+      (반영 전까지는 만료되지 않고, 반영 후 ttl 동안 조회용으로 남음)
+    값은 필드별 JSON으로 저장합니다.
+    """
+
+    def __init__(self, ttl: int = None, prefix: str = 'jobstate:'):
+        self.ttl = ttl or getattr(settings, 'JOB_STATE_TTL', 60 * 60 * 24)
+        self.prefix = prefix
+        self.dirty_key = f'{prefix}dirty'
+        self._redis = get_redis()
+
+    def create(self, jobs: Iterable[Any]):
+        """
+        새 작업의 초기 상태 기록 (파이프라인 2번 왕복)
+        발행을 다시 시도할 때 워커가 이미 쓴 상태를 덮어쓰지 않도록 상태가 없는 작업만 기록합니다.
+        """
+        jobs = list(jobs)
+        pipe = self._redis.pipeline(transaction=False)
+        for job in jobs:
+            pipe.hsetnx(self._key(job.event_id), 'status', _encode({'status': job.status})['status'])
+        created = pipe.execute()
+
+        pipe = self._redis.pipeline(transaction=False)
+        for job, is_new in zip(jobs, created):
+            if is_new:
+                key = self._key(job.event_id)
+                pipe.hset(key, mapping=_encode({'created_at': job.created_at, 'updated_at': job.created_at}))
+                pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def update(self, event_id, **fields):
+        """진행 중 상태 갱신 (status / message / result 중 바뀐 필드만)"""
+        key = self._key(event_id)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hset(key, mapping=_encode({**fields, 'updated_at': timezone.now()}))
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def finish(self, event_id, **fields):
+        """종료 상태 기록 후 Postgres 반영 대기열(dirty)에 추가"""
+        key = self._key(event_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=_encode({**fields, 'updated_at': timezone.now()}))
+        pipe.persist(key)
+        pipe.sadd(self.dirty_key, str(event_id))
+        pipe.execute()
+
+    def get(self, event_id) -> Optional[Dict[str, Any]]:
+        """저장된 상태 (없으면 None)"""
+        return _decode(self._redis.hgetall(self._key(event_id))) or None
+
+    def statuses(self, event_ids: List[str]) -> Dict[str, str]:
+        """작업별 status {event_id: status} (파이프라인 1번 왕복, 상태가 없는 작업은 제외)"""
+        pipe = self._redis.pipeline(transaction=False)
+        for event_id in event_ids:
+            pipe.hget(self._key(event_id), 'status')
+        return {
+            str(event_id): json.loads(raw)
+            for event_id, raw in zip(event_ids, pipe.execute()) if raw is not None
+        }
+
+    def dirty(self, limit: int) -> Dict[str, Dict[str, Any]]:
+        """Postgres에 반영할 종료 상태 최대 limit개 {event_id: 상태} (반영 전까지 집합에 남김)"""
+        event_ids = [_text(event_id) for event_id in self._redis.srandmember(self.dirty_key, limit)]
+        if not event_ids:
+            return {}
+        pipe = self._redis.pipeline(transaction=False)
+        for event_id in event_ids:
+            pipe.hgetall(self._key(event_id))
+        states = {event_id: _decode(raw) for event_id, raw in zip(event_ids, pipe.execute())}
+        missing = [event_id for event_id, state in states.items() if not state]
+        if missing:
+            self._redis.srem(self.dirty_key, *missing)
+        return {event_id: state for event_id, state in states.items() if state}
+
+    def mark_flushed(self, event_ids: List[str]):
+        """반영이 끝난 상태를 dirty에서 빼고 조회용으로 ttl만 유지"""
+        if not event_ids:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.srem(self.dirty_key, *event_ids)
+        for event_id in event_ids:
+            pipe.expire(self._key(event_id), self.ttl)
+        pipe.execute()
+
+    def pending_flush(self) -> int:
+        return self._redis.scard(self.dirty_key)
+
+    def _key(self, event_id) -> str:
+        return f'{self.prefix}{event_id}'
+
+
+def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        name: json.dumps(value.isoformat() if hasattr(value, 'isoformat') else value, ensure_ascii=False)
+        for name, value in fields.items()
+    }
+
+
+def _decode(raw: Dict[Any, Any]) -> Dict[str, Any]:
+    state = {_text(name): json.loads(value) for name, value in raw.items()}
+    for name in _DATETIME_FIELDS:
+        if state.get(name):
+            state[name] = parse_datetime(state[name])
+    return state
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
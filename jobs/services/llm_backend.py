@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+class LLMBackend:
+    """
+    GPTService가 사용하는 채팅 completion 백엔드 인터페이스
+
+    응답은 OpenAI chat completion 형식(choices[0].message / 스트리밍 시 choices[0].delta)을 따릅니다.
+    """
+
+    name = 'base'
+    requires_api_key = False
+
+    def check_model(self, model: str, timeout: float):
+        """모델 사용 가능 여부 확인 (사용할 수 없으면 예외 발생)"""
+        raise NotImplementedError
+
+    def chat(self, model: str, messages: List[Dict[str, str]], **params) -> Any:
+        """completion 호출 (stream=True면 청크 iterator 반환)"""
+        raise NotImplementedError
+
+    async def achat(self, model: str, messages: List[Dict[str, str]], **params) -> Any:
+        """chat의 비동기 버전 (stream=True면 async iterator 반환)"""
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """openai 0.28.1 라이브러리 백엔드 (api_base를 지정하면 OpenAI 호환 서버 사용)"""
+
+    name = 'openai'
+    requires_api_key = True
+
+    def __init__(self, api_base: str = None):
+        self.api_base = api_base
+
+    def check_model(self, model: str, timeout: float):
+        openai.Model.retrieve(model, request_timeout=timeout, **self._base())
+
+    def chat(self, model: str, messages: List[Dict[str, str]], **params) -> Any:
+        return openai.ChatCompletion.create(model=model, messages=messages, **params, **self._base())
+
+    async def achat(self, model: str, messages: List[Dict[str, str]], **params) -> Any:
+        return await openai.ChatCompletion.acreate(model=model, messages=messages, **params, **self._base())
+
+    def _base(self) -> Dict[str, str]:
+        return {'api_base': self.api_base} if self.api_base else {}
+
+
+class StubBackend(OpenAIBackend):
+    """로컬 OpenAI 호환 stub 서버 백엔드 (manage.py run_llm_stub, API 키 불필요)"""
+
+    name = 'stub'
+    requires_api_key = False
+
+    def __init__(self, api_base: str = None):
+        super().__init__(api_base or getattr(settings, 'LLM_STUB_BASE_URL', 'http://localhost:8090/v1'))
+
+    def _base(self) -> Dict[str, str]:
+        # openai 라이브러리는 키가 없으면 요청 전에 오류를 내므로 더미 키 전달
+        return {'api_base': self.api_base, 'api_key': 'sk-stub'}
+
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'stub': StubBackend,
+}
+
+
+def get_llm_backend() -> LLMBackend:
+    """LLM_BACKEND 설정('openai' | 'stub' | 클래스 경로)에 해당하는 백엔드 생성"""
+    name = getattr(settings, 'LLM_BACKEND', 'openai')
+    backend_class = BACKENDS.get(name) or import_string(name)
+    logger.info(f"LLM 백엔드: {backend_class.name}")
+    return backend_class()
@@ -0,0 +1,76 @@
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+from django.conf import settings
+
+from common import metrics
+
+# 모델별 최대 컨텍스트 (프롬프트 + 응답 토큰), 목록에 없는 모델은 제한 없음으로 간주
+DEFAULT_CONTEXT_WINDOWS = {
+    'gpt-4o-mini': 128000,
+    'gpt-4o': 128000,
+    'gpt-3.5-turbo': 16385,
+}
+
+
+class ModelRouter:
+    """
+    단계별로 호출할 모델 순서와 hedge 지연 시간 결정
+
+    - 입력 토큰 + max_tokens가 컨텍스트를 넘는 모델은 제외
+    - 최근 관측한 (모델, 단계)별 지연 시간 중앙값과 오류율로 순위 결정
+      (관측치가 없는 모델은 후보 순서 유지)
+    - hedge 지연 시간은 주 모델의 최근 p95
+    관측치는 워커 프로세스 메모리에만 보관합니다.
+    """
+
+    def __init__(self, window: int = None, min_samples: int = None):
+        self.window = window or getattr(settings, 'GPT_ROUTER_WINDOW', 200)
+        self.min_samples = min_samples or getattr(settings, 'GPT_HEDGE_MIN_SAMPLES', 20)
+        self.context_windows = {**DEFAULT_CONTEXT_WINDOWS, **getattr(settings, 'GPT_MODEL_CONTEXT_WINDOWS', {})}
+        self.error_penalty = getattr(settings, 'GPT_ROUTER_ERROR_PENALTY', 4.0)
+
+        self._latencies: Dict[tuple, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._error_rates: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def route(self, models: Sequence[str], kind: str, request_tokens: int) -> List[str]:
+        """호출할 모델 순서 (첫 번째가 주 모델, 두 번째가 hedge 대상)"""
+        fitting = [model for model in models if request_tokens <= self.context_windows.get(model, float('inf'))]
+        if not fitting:
+            return list(models[:1])
+
+        with self._lock:
+            medians = {model: self._median(model, kind) for model in fitting}
+            errors = {model: self._error_rates[model] for model in fitting}
+        known = [median for median in medians.values() if median is not None]
+        # 관측치가 없는 모델은 가장 빠른 모델과 같은 지연 시간으로 간주 (동점이면 오류율, 후보 순서)
+        neutral = min(known) if known else 0.0
+
+        def score(model):
+            median = neutral if medians[model] is None else medians[model]
+            return median * (1 + self.error_penalty * errors[model]), errors[model]
+
+        return sorted(fitting, key=score)
+
+    def hedge_delay(self, model: str, kind: str) -> Optional[float]:
+        """주 모델의 최근 p95 지연 시간 (관측치가 부족하면 None → hedge 안 함)"""
+        with self._lock:
+            samples = sorted(self._latencies[(model, kind)])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def record(self, model: str, kind: str, latency: float = None, ok: bool = True):
+        """호출 결과 기록 (성공 시 지연 시간, 실패 시 오류율 반영)"""
+        with self._lock:
+            if ok and latency is not None:
+                self._latencies[(model, kind)].append(latency)
+            self._error_rates[model] = 0.9 * self._error_rates[model] + (0.0 if ok else 0.1)
+        if ok and latency is not None:
+            metrics.observe(f'gpt_latency.{kind}', latency)
+
+    def _median(self, model: str, kind: str) -> Optional[float]:
+        samples = sorted(self._latencies[(model, kind)])
+        return samples[len(samples) // 2] if samples else None
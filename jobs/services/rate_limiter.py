@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from common import metrics
+from common.utils import get_redis
+from .chunking import estimate_tokens
+from .exceptions import RetryLater
+
+logger = logging.getLogger(__name__)
+
+# 요청 수(RPM)/토큰 수(TPM) 두 개의 토큰 버킷을 원자적으로 갱신
+# 반환값: 0이면 통과(버킷에서 차감), 양수면 다시 시도하기까지 기다려야 할 밀리초
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', key, 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+
+local elapsed = math.max(0, now - ts)
+requests = math.min(rpm, requests + elapsed * rpm / 60000)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60000)
+
+local wait = 0
+if requests < 1 then
+    wait = math.max(wait, (1 - requests) * 60000 / rpm)
+end
+if tokens < cost then
+    wait = math.max(wait, (cost - tokens) * 60000 / tpm)
+end
+if wait == 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+end
+
+redis.call('HSET', key, 'requests', tostring(requests), 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', key, 120000)
+return math.ceil(wait)
+"""
+
+
+class RateLimitExceeded(RetryLater):
+    """허용 대기 시간 안에 호출 예산을 확보하지 못함 (작업 재예약 필요)"""
+
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """TPM 차감량 추정: 프롬프트 토큰 + 최대 응답 토큰"""
+    return sum(estimate_tokens(message.get('content', '')) for message in messages) + max_tokens
+
+
+class RateLimiter:
+    """
+    모든 워커가 공유하는 Redis 토큰 버킷 기반 OpenAI 호출 제한기
+    모델별로 분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 제한합니다.
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None, max_wait: float = None):
+        self.rpm = rpm or getattr(settings, 'GPT_RATE_LIMIT_RPM', 500)
+        self.tpm = tpm or getattr(settings, 'GPT_RATE_LIMIT_TPM', 200000)
+        self.max_wait = max_wait if max_wait is not None else getattr(settings, 'GPT_RATE_LIMIT_MAX_WAIT', 30)
+        self._script = None
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """
+        호출 예산을 확보할 때까지 대기 후 대기한 시간(초) 반환
+        max_wait를 넘게 기다려야 하면 RateLimitExceeded를 발생시킵니다.
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(model, tokens)
+            if wait == 0:
+                self._record(waited)
+                return waited
+            self._check_budget(model, waited, wait)
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, model: str, tokens: int) -> float:
+        """acquire의 비동기 버전 (Redis 호출은 스레드에서 실행)"""
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, model, tokens)
+            if wait == 0:
+                await asyncio.to_thread(self._record, waited)
+                return waited
+            await asyncio.to_thread(self._check_budget, model, waited, wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def _try_acquire(self, model: str, tokens: int) -> float:
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+            wait_ms = self._script(keys=[f'ratelimit:{model}'], args=[self.rpm, self.tpm, tokens])
+            return wait_ms / 1000
+        except RedisError as e:
+            # 제한기 장애로 작업 전체가 멈추지 않도록 통과 처리
+            logger.warning(f"Rate limiter 사용 불가, 제한 없이 호출합니다: {e}")
+            return 0
+
+    def _check_budget(self, model: str, waited: float, wait: float):
+        if waited + wait > self.max_wait:
+            metrics.incr('rate_limiter.rescheduled')
+            raise RateLimitExceeded(
+                f"{model} 호출 한도 초과: {wait:.1f}초 후 재시도 필요",
+                retry_after=wait,
+            )
+
+    @staticmethod
+    def _record(waited: float):
+        metrics.observe('rate_limiter.wait_seconds', waited)
+        if waited:
+            metrics.incr('rate_limiter.throttled')
@@ -0,0 +1,157 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common import metrics
+from common.utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis 캐시 항목 인덱스 (저장 시각 기준 정렬 집합, 개수 제한 eviction용)
+INDEX_KEY = 'gpt_cache:index'
+
+
+def normalize_text(text: str) -> str:
+    """공백/줄바꿈 차이를 무시하도록 입력 텍스트 정규화"""
+    return ' '.join((text or '').split())
+
+
+def make_cache_key(kind: str, text: str, model: str, prompt_version: str, temperature: float) -> str:
+    """
+    (정규화된 입력, 모델명, 프롬프트 버전, temperature) 해시 기반 캐시 키 생성
+    """
+    payload = json.dumps(
+        [kind, normalize_text(text), model, prompt_version, temperature],
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f'gpt_cache:{kind}:{digest}'
+
+
+class ResultCache:
+    """
+    GPT 생성 결과 캐시
+    프로세스 로컬 LRU → Redis(django_redis) 순으로 조회합니다.
+    """
+
+    def __init__(self, local_size: int = None, ttl: int = None, max_entries: int = None):
+        self.local_size = local_size or getattr(settings, 'GPT_RESULT_CACHE_LOCAL_SIZE', 256)
+        self.ttl = ttl or getattr(settings, 'GPT_RESULT_CACHE_TTL', 60 * 60 * 24)
+        self.max_entries = max_entries or getattr(settings, 'GPT_RESULT_CACHE_MAX_ENTRIES', 10000)
+
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'sets': 0}
+        # 조회마다 Redis에 기록하지 않도록 적중/미스 지표는 묶어서 반영
+        self._counters = metrics.BufferedCounters()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (없으면 None)"""
+        value = self._get_local(key)
+        if value is not None:
+            self._record('local_hits', 'gpt_cache.local_hit')
+            return value
+
+        try:
+            value = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Redis 캐시 조회 실패: {e}")
+            value = None
+
+        if value is not None:
+            self._set_local(key, value)
+            self._record('redis_hits', 'gpt_cache.redis_hit')
+            return value
+
+        self._record('misses', 'gpt_cache.miss')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """캐시 저장 후 최대 항목 수를 넘는 오래된 항목 제거"""
+        self._set_local(key, value)
+        self._stats['sets'] += 1
+
+        try:
+            cache.set(key, value, timeout=self.ttl)
+            redis = get_redis()
+            now = time.time()
+            pipe = redis.pipeline(transaction=False)
+            pipe.zadd(INDEX_KEY, {key: now})
+            # TTL로 이미 만료된 항목은 인덱스에서도 정리
+            pipe.zremrangebyscore(INDEX_KEY, 0, now - self.ttl)
+            pipe.zcard(INDEX_KEY)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = [
+                    member.decode() if isinstance(member, bytes) else member
+                    for member, _ in redis.zpopmin(INDEX_KEY, overflow)
+                ]
+                cache.delete_many(evicted)
+                metrics.incr('gpt_cache.evicted', len(evicted))
+        except Exception as e:
+            logger.warning(f"Redis 캐시 저장 실패: {e}")
+
+    def clear_local(self):
+        """프로세스 로컬 캐시 비우기"""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """프로세스 로컬 적중/미스 카운터"""
+        return dict(self._stats, local_size=len(self._local))
+
+    def flush_metrics(self):
+        """모아 둔 적중/미스 지표를 바로 반영"""
+        self._counters.flush()
+
+    def _get_local(self, key: str):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def _set_local(self, key: str, value):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _record(self, stat: str, metric: str):
+        self._stats[stat] += 1
+        self._counters.incr(metric)
+
+
+class NullResultCache:
+    """캐시 비활성화 시 사용하는 빈 구현"""
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        pass
+
+    def clear_local(self):
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    def flush_metrics(self):
+        pass
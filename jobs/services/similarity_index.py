@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import random
+import re
+import time
+from array import array
+from collections import Counter
+from typing import List, NamedTuple, Optional, Set
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from common import metrics
+from common.utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+# MinHash 서명 길이 = BANDS * ROWS
+# 16 밴드 x 8 행: Jaccard 약 0.7 이상인 문서가 후보로 잡힐 확률이 높음 ((1/16)^(1/8) ≈ 0.71)
+BANDS = 16
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 모든 프로세스에서 같은 서명이 나오도록 고정 시드로 해시 함수 계수 생성
+_rng = random.Random(20250613)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# 번호/글머리표 ("1.", "2)", "가.", "-", "•", "①") 차이는 무시
+_LIST_MARKER = re.compile(r'(?:[-*•·]|\d+(?:\.\d+)*[.)]|\w[.)]|[①-⑳])')
+_PUNCTUATION = re.compile(r'[^\w]')
+
+
+class SimilarMatch(NamedTuple):
+    doc_id: str
+    similarity: float
+
+
+def shingles(text: str) -> Set[str]:
+    """번호/기호/대소문자/공백 차이를 제거한 단어 k-gram 집합"""
+    words = [_PUNCTUATION.sub('', word) for word in (text or '').lower().split() if not _LIST_MARKER.fullmatch(word)]
+    words = [word for word in words if word]
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> Optional[List[int]]:
+    """MinHash 서명 (비교할 단어가 없으면 None)"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        for shingle in shingles(text)
+    ]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(first: List[int], second: List[int]) -> float:
+    """두 서명이 일치하는 비율 = Jaccard 유사도 추정치"""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+class SimilarityIndex:
+    """
+    처리 완료된 가이드라인의 MinHash 서명을 Redis LSH 밴드에 저장하는 근사 중복 인덱스
+
+    - band 키: {namespace}:band:{i}:{밴드 해시} → 문서 ID 집합
+    - sig 키: {namespace}:sig:{문서 ID} → 서명 (uint32 배열)
+    조회는 밴드 조회 1회 + 후보 서명 조회 1회의 파이프라인 왕복 2번이므로
+    저장된 문서 수와 관계없이 일정한 시간에 끝납니다.
+    """
+
+    def __init__(self, namespace: str = 'simindex', threshold: float = None, max_candidates: int = None):
+        self.namespace = namespace
+        self.threshold = threshold if threshold is not None else getattr(settings, 'GPT_SIMILARITY_THRESHOLD', 0.85)
+        self.max_candidates = max_candidates or getattr(settings, 'GPT_SIMILARITY_MAX_CANDIDATES', 50)
+
+    def add(self, doc_id: str, text: str, signature: List[int] = None) -> bool:
+        """문서 서명을 인덱스에 추가"""
+        signature = signature or minhash(text)
+        if signature is None:
+            return False
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.set(self._sig_key(doc_id), array('I', signature).tobytes())
+            for band_key in self._band_keys(signature):
+                pipe.sadd(band_key, doc_id)
+            pipe.execute()
+            return True
+        except RedisError as e:
+            logger.warning(f"유사도 인덱스 저장 실패: {e}")
+            return False
+
+    def remove(self, doc_id: str):
+        """문서를 인덱스에서 제거 (결과를 더 이상 재사용할 수 없을 때)"""
+        try:
+            redis = get_redis()
+            raw = redis.get(self._sig_key(doc_id))
+            if raw is None:
+                return
+            pipe = redis.pipeline(transaction=False)
+            for band_key in self._band_keys(array('I', raw).tolist()):
+                pipe.srem(band_key, doc_id)
+            pipe.delete(self._sig_key(doc_id))
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"유사도 인덱스 삭제 실패: {e}")
+
+    def lookup(self, text: str, signature: List[int] = None) -> Optional[SimilarMatch]:
+        """threshold 이상으로 가장 유사한 문서 반환 (없으면 None)"""
+        signature = signature or minhash(text)
+        if signature is None:
+            return None
+
+        started = time.perf_counter()
+        try:
+            redis = get_redis()
+            pipe = redis.pipeline(transaction=False)
+            for band_key in self._band_keys(signature):
+                pipe.smembers(band_key)
+            # 일치하는 밴드가 많은 후보부터 비교
+            band_hits = Counter(member for members in pipe.execute() for member in members)
+            candidates = [
+                c.decode() if isinstance(c, bytes) else c
+                for c, _ in band_hits.most_common(self.max_candidates)
+            ]
+
+            best = None
+            if candidates:
+                stored = redis.mget([self._sig_key(doc_id) for doc_id in candidates])
+                for doc_id, raw in zip(candidates, stored):
+                    if raw is None:
+                        continue
+                    similarity = estimate_similarity(signature, array('I', raw).tolist())
+                    if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                        best = SimilarMatch(doc_id, similarity)
+        except RedisError as e:
+            logger.warning(f"유사도 인덱스 조회 실패: {e}")
+            return None
+
+        metrics.observe('similarity.lookup_ms', (time.perf_counter() - started) * 1000)
+        metrics.incr('similarity.hit' if best else 'similarity.miss')
+        return best
+
+    def _band_keys(self, signature: List[int]) -> List[str]:
+        keys = []
+        for band in range(BANDS):
+            rows = array('I', signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+            keys.append(f'{self.namespace}:band:{band}:{hashlib.blake2b(rows, digest_size=8).hexdigest()}')
+        return keys
+
+    def _sig_key(self, doc_id: str) -> str:
+        return f'{self.namespace}:sig:{doc_id}'
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from common import metrics
+from common.utils import get_redis
+from .exceptions import RetryLater
+from .result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# 소유자가 일치할 때만 lease 해제 (다른 워커가 넘겨받은 lease 보호)
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# 소유자가 일치할 때만 lease 연장 (leader heartbeat)
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlightTimeout(RetryLater):
+    """
+    선행 작업 결과를 기다리다 시간 초과
+    워커 슬롯을 계속 잡고 기다리지 않도록 leader의 lease가 끝날 무렵으로 재예약합니다.
+    """
+
+
+class FlightResult(NamedTuple):
+    value: Any
+    leader: str
+    shared: bool
+
+
+def content_hash(text: str) -> str:
+    """정규화된 가이드라인 텍스트의 해시 (동일 작업 판별용)"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """
+    동일 키에 대한 동시 작업을 하나로 합치는 Redis lease 기반 single-flight
+
+    최초 작업(leader)만 fn을 실행하고, 나머지(follower)는 결과가 저장될 때까지
+    기다린 뒤 그 결과를 공유합니다. leader는 fn을 실행하는 동안 lease_ttl/3마다 lease를 연장하므로
+    느린 leader는 lease를 잃지 않고, leader 워커가 죽으면 lease_ttl 안에 follower 중 하나가 넘겨받습니다.
+    """
+
+    def __init__(self, namespace: str = 'guideline', lease_ttl: float = None,
+                 wait_timeout: float = None, poll_interval: float = None, result_ttl: int = None):
+        self.namespace = namespace
+        self.lease_ttl = lease_ttl or getattr(settings, 'SINGLE_FLIGHT_LEASE_TTL', 60)
+        self.wait_timeout = wait_timeout or getattr(settings, 'SINGLE_FLIGHT_WAIT_TIMEOUT', 600)
+        self.poll_interval = poll_interval or getattr(settings, 'SINGLE_FLIGHT_POLL_INTERVAL', 0.5)
+        self.result_ttl = result_ttl or getattr(settings, 'SINGLE_FLIGHT_RESULT_TTL', 600)
+
+    def run(self, key: str, owner: str, fn: Callable[[], Any]) -> FlightResult:
+        """
+        key에 대한 작업을 한 번만 실행하고 결과를 공유
+        owner는 lease 소유자 식별자 (보통 event_id)
+        """
+        lease_key, result_key = self._keys(key)
+
+        try:
+            redis = get_redis()
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                shared, is_leader = self._poll(redis, lease_key, result_key, owner)
+                if shared is not None:
+                    return shared
+                if is_leader:
+                    break
+                if time.monotonic() > deadline:
+                    raise self._timeout(redis, key, lease_key)
+                time.sleep(self.poll_interval)
+
+        except RedisError as e:
+            logger.warning(f"Single-flight 사용 불가, 단독 실행합니다: {e}")
+            return FlightResult(fn(), owner, False)
+
+        metrics.incr('single_flight.leader')
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(redis, lease_key, owner, stop), name='single-flight-heartbeat', daemon=True,
+        )
+        heartbeat.start()
+        try:
+            value = fn()
+            self._publish(redis, result_key, owner, value)
+            return FlightResult(value, owner, False)
+        finally:
+            stop.set()
+            heartbeat.join()
+            self._release(redis, lease_key, owner)
+
+    async def arun(self, key: str, owner: str, fn: Callable[[], Awaitable[Any]]) -> FlightResult:
+        """
+        run의 비동기 버전 - follower 대기 중에도 이벤트 루프를 막지 않습니다.
+        Redis 호출은 모두 스레드에서 실행합니다.
+        """
+        lease_key, result_key = self._keys(key)
+
+        try:
+            redis = get_redis()
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                shared, is_leader = await asyncio.to_thread(self._poll, redis, lease_key, result_key, owner)
+                if shared is not None:
+                    return shared
+                if is_leader:
+                    break
+                if time.monotonic() > deadline:
+                    raise await asyncio.to_thread(self._timeout, redis, key, lease_key)
+                await asyncio.sleep(self.poll_interval)
+
+        except RedisError as e:
+            logger.warning(f"Single-flight 사용 불가, 단독 실행합니다: {e}")
+            return FlightResult(await fn(), owner, False)
+
+        await asyncio.to_thread(metrics.incr, 'single_flight.leader')
+        heartbeat = asyncio.ensure_future(self._aheartbeat(redis, lease_key, owner))
+        try:
+            value = await fn()
+            await asyncio.to_thread(self._publish, redis, result_key, owner, value)
+            return FlightResult(value, owner, False)
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._release, redis, lease_key, owner)
+
+    def _keys(self, key: str):
+        return (
+            f'singleflight:{self.namespace}:lease:{key}',
+            f'singleflight:{self.namespace}:result:{key}',
+        )
+
+    def _poll(self, redis, lease_key: str, result_key: str, owner: str):
+        """
+        공유 결과 확인 및 lease 획득 시도
+        (공유 결과 또는 None, leader 여부)를 반환합니다.
+        """
+        shared = self._get_result(redis, result_key)
+        if shared is None and self._acquire(redis, lease_key, owner):
+            # lease 획득 직전에 이전 leader가 결과를 남겼을 수 있으므로 재확인
+            shared = self._get_result(redis, result_key)
+            if shared is None:
+                return None, True
+            redis.eval(RELEASE_SCRIPT, 1, lease_key, owner)
+
+        if shared is not None:
+            metrics.incr('single_flight.shared')
+            return FlightResult(shared['value'], shared['leader'], shared['leader'] != owner), False
+        return None, False
+
+    def _timeout(self, redis, key: str, lease_key: str) -> SingleFlightTimeout:
+        """follower 대기 시간 초과 (leader의 남은 lease 뒤에 다시 시도)"""
+        remaining = redis.pttl(lease_key) / 1000
+        return SingleFlightTimeout(f"선행 작업 대기 시간 초과: {key}", retry_after=max(remaining, self.poll_interval))
+
+    def _publish(self, redis, result_key: str, owner: str, value: Any):
+        """결과 공유 (실패해도 leader 결과는 그대로 사용, follower는 lease 해제 후 직접 실행)"""
+        try:
+            redis.set(
+                result_key,
+                json.dumps({'leader': owner, 'value': value}, ensure_ascii=False),
+                ex=self.result_ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"Single-flight 결과 공유 실패 ({result_key}): {e}")
+
+    def _heartbeat(self, redis, lease_key: str, owner: str, stop: threading.Event):
+        """fn이 끝날 때까지 lease_ttl/3마다 lease 연장"""
+        while not stop.wait(self.lease_ttl / 3):
+            self._renew(redis, lease_key, owner)
+
+    async def _aheartbeat(self, redis, lease_key: str, owner: str):
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            await asyncio.to_thread(self._renew, redis, lease_key, owner)
+
+    def _renew(self, redis, lease_key: str, owner: str):
+        try:
+            if not redis.eval(RENEW_SCRIPT, 1, lease_key, owner, int(self.lease_ttl * 1000)):
+                logger.warning(f"Single-flight lease를 잃었습니다 ({lease_key})")
+        except RedisError as e:
+            logger.warning(f"Single-flight lease 연장 실패 ({lease_key}): {e}")
+
+    @staticmethod
+    def _release(redis, lease_key: str, owner: str):
+        try:
+            redis.eval(RELEASE_SCRIPT, 1, lease_key, owner)
+        except RedisError as e:
+            logger.warning(f"Single-flight lease 해제 실패, 만료를 기다립니다 ({lease_key}): {e}")
+
+    def _acquire(self, redis, lease_key: str, owner: str) -> bool:
+        if redis.set(lease_key, owner, nx=True, px=int(self.lease_ttl * 1000)):
+            return True
+        # 같은 작업이 재전달된 경우 (워커 손실 후 redelivery) 자신의 lease를 넘겨받음
+        holder = redis.get(lease_key)
+        if holder is not None and holder.decode() == owner:
+            redis.pexpire(lease_key, int(self.lease_ttl * 1000))
+            return True
+        return False
+
+    @staticmethod
+    def _get_result(redis, result_key: str):
+        raw = redis.get(result_key)
+        return json.loads(raw) if raw else None
@@ -0,0 +1,43 @@
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+from common.utils import get_redis
+
+
+class CachedStatus(NamedTuple):
+    body: bytes  # 직렬화한 응답 본문 (JSON)
+    etag: str
+    last_modified: int  # updated_at (unix 초)
+
+
+class StatusCache:
+    """
+    종료된 작업의 상태 조회 응답 캐시 (jobstatus:<event_id> 해시)
+
+    completed / failed 작업의 응답은 더 이상 바뀌지 않으므로 직렬화한 본문을 그대로 보관해
+    조회 시 DB 조회와 결과(result) JSON 인코딩을 건너뜁니다. 작업 상태를 쓸 때마다 지웁니다.
+    """
+
+    def __init__(self, ttl: int = None, prefix: str = 'jobstatus:'):
+        self.ttl = ttl or getattr(settings, 'JOB_STATUS_CACHE_TTL', 60 * 60)
+        self.prefix = prefix
+        self._redis = get_redis()
+
+    def get(self, event_id) -> Optional[CachedStatus]:
+        cached = self._redis.hgetall(self._key(event_id))
+        if not cached:
+            return None
+        return CachedStatus(cached[b'body'], cached[b'etag'].decode(), int(cached[b'last_modified']))
+
+    def put(self, event_id, status: CachedStatus):
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(self._key(event_id), mapping=status._asdict())
+        pipe.expire(self._key(event_id), self.ttl)
+        pipe.execute()
+
+    def invalidate(self, event_id):
+        self._redis.delete(self._key(event_id))
+
+    def _key(self, event_id) -> str:
+        return f'{self.prefix}{event_id}'
@@ -0,0 +1,118 @@
+import json
+import logging
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONParser:
+    """
+    스트리밍으로 도착하는 JSON 텍스트를 점진적으로 파싱
+
+    최상위 객체의 `array_key` 배열 원소가 완성될 때마다 반환하므로
+    전체 응답이 끝나기 전에 체크리스트 카테고리 등을 먼저 사용할 수 있습니다.
+    첫 '{' 이전의 텍스트(```json 코드 블록 표시 등)는 무시합니다.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.items: List[Any] = []
+
+        self._chunks: List[str] = []
+        self._buffer = []           # 첫 '{'부터 누적된 문자
+        self._started = False
+        self._done = False
+        self._stack = []            # (종류('obj'|'arr'), 부모에서의 키)
+        self._expect_key = False    # 객체 안에서 다음 문자열이 키인지 여부
+        self._last_key = None
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._item_start = None     # 추적 중인 배열 원소의 시작 위치
+
+    @property
+    def text(self) -> str:
+        """지금까지 수신한 전체 텍스트"""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Any]:
+        """청크를 추가하고 이번에 새로 완성된 배열 원소 목록 반환"""
+        self._chunks.append(chunk)
+        completed = []
+
+        for char in chunk:
+            if self._done:
+                break
+            if not self._started:
+                if char != '{':
+                    continue
+                self._started = True
+
+            position = len(self._buffer)
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._in_tracked_array() and self._item_start is not None:
+                        # 문자열 원소 완료
+                        self._complete(position + 1, completed)
+                    elif self._expect_key and self._stack[-1][0] == 'obj':
+                        self._last_key = ''.join(self._buffer[self._string_start + 1:position])
+                continue
+
+            tracked = self._in_tracked_array()
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+                if tracked and self._item_start is None:
+                    self._item_start = position
+            elif char in '{[':
+                if tracked and self._item_start is None:
+                    self._item_start = position
+                parent_key = self._last_key if self._stack and self._stack[-1][0] == 'obj' else None
+                self._stack.append(('obj' if char == '{' else 'arr', parent_key))
+                self._expect_key = char == '{'
+            elif char in '}]':
+                if tracked and self._item_start is not None:
+                    # 배열이 닫히기 직전의 스칼라 원소 완료
+                    self._complete(position, completed)
+                self._stack.pop()
+                if self._in_tracked_array() and self._item_start is not None:
+                    # 객체/배열 원소 완료
+                    self._complete(position + 1, completed)
+                self._expect_key = False
+                if not self._stack:
+                    self._done = True
+            elif char == ',':
+                if tracked and self._item_start is not None:
+                    self._complete(position, completed)
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == 'obj'
+            elif char == ':':
+                self._expect_key = False
+            elif not char.isspace() and tracked and self._item_start is None:
+                # 스칼라 원소 시작 (숫자/true/false/null)
+                self._item_start = position
+
+        self.items.extend(completed)
+        return completed
+
+    def _complete(self, end: int, completed: List[Any]):
+        raw = ''.join(self._buffer[self._item_start:end]).strip()
+        self._item_start = None
+        try:
+            completed.append(json.loads(raw))
+        except json.JSONDecodeError as e:
+            logger.warning(f"스트리밍 원소 파싱 실패: {e}")
+
+    def _in_tracked_array(self) -> bool:
+        """현재 위치가 최상위 객체의 array_key 배열 바로 안쪽인지 여부"""
+        return (
+            len(self._stack) == 2
+            and self._stack[1][0] == 'arr'
+            and self._stack[1][1] == self.array_key
+        )
@@ -0,0 +1,217 @@
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+
+from jsonschema import Draft7Validator
+
+logger = logging.getLogger(__name__)
+
+# 단계별 응답 스키마 (function calling 파라미터 및 응답 검증에 사용)
+SUMMARY_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string', 'minLength': 1},
+        'content': {'type': 'string', 'minLength': 1},
+        'key_points': {'type': 'array', 'items': {'type': 'string'}},
+        'word_count': {'type': 'integer', 'minimum': 0},
+    },
+    'required': ['title', 'content', 'key_points'],
+}
+
+SUMMARY_CHUNK_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'content': {'type': 'string', 'minLength': 1},
+        'key_points': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['content', 'key_points'],
+}
+
+CHECKLIST_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'categories': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'items': {
+                        'type': 'array',
+                        'minItems': 1,
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'id': {'type': 'integer'},
+                                'text': {'type': 'string', 'minLength': 1},
+                                'required': {'type': 'boolean'},
+                            },
+                            'required': ['id', 'text', 'required'],
+                        },
+                    },
+                },
+                'required': ['name', 'items'],
+            },
+        },
+        'total_items': {'type': 'integer'},
+        'required_items': {'type': 'integer'},
+    },
+    'required': ['categories'],
+}
+
+# 단일 호출(fused) 모드: 요약 필드와 체크리스트 필드를 한 객체로 받음
+# (categories를 최상위 배열로 두어 스트리밍 부분 결과를 그대로 게시)
+FUSED_SCHEMA = {
+    'type': 'object',
+    'properties': {**SUMMARY_SCHEMA['properties'], **CHECKLIST_SCHEMA['properties']},
+    'required': SUMMARY_SCHEMA['required'] + CHECKLIST_SCHEMA['required'],
+}
+
+# 증분 처리(revision): 갱신된 요약 + 변경의 영향을 받은 카테고리만
+REVISION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        **SUMMARY_SCHEMA['properties'],
+        'categories': {**CHECKLIST_SCHEMA['properties']['categories'], 'minItems': 0},
+        'removed_categories': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': SUMMARY_SCHEMA['required'] + ['categories'],
+}
+
+OUTPUT_SCHEMAS = {
+    'summary': SUMMARY_SCHEMA,
+    'summary_chunk': SUMMARY_CHUNK_SCHEMA,
+    'checklist': CHECKLIST_SCHEMA,
+    'fused': FUSED_SCHEMA,
+    'revision': REVISION_SCHEMA,
+}
+
+# 스키마는 import 시 한 번만 컴파일
+_VALIDATORS = {kind: Draft7Validator(schema) for kind, schema in OUTPUT_SCHEMAS.items()}
+
+
+class OutputError(ValueError):
+    """GPT 응답을 사용할 수 없음 (해당 단계만 재요청 대상)"""
+
+
+class OutputParseError(OutputError):
+    """복구를 시도해도 JSON으로 파싱할 수 없음"""
+
+
+class SchemaValidationError(OutputError):
+    """JSON이지만 단계별 스키마와 맞지 않음"""
+
+    def __init__(self, kind: str, errors: List[str]):
+        super().__init__(f"{kind} 스키마 불일치: {'; '.join(errors[:3])}")
+        self.errors = errors
+
+
+def function_spec(kind: str) -> Dict[str, Any]:
+    """function calling용 함수 정의 (스키마를 그대로 파라미터로 사용)"""
+    return {
+        'name': f'submit_{kind}',
+        'description': f'{kind} 결과를 제출합니다.',
+        'parameters': OUTPUT_SCHEMAS[kind],
+    }
+
+
+def parse_output(content: str) -> Tuple[Any, bool]:
+    """
+    응답 텍스트에서 JSON 객체를 추출하여 (데이터, 복구 여부) 반환
+    코드 블록/앞뒤 설명문은 무시하고, 잘렸거나 약간 깨진 JSON은 복구를 시도합니다.
+    """
+    start = (content or '').find('{')
+    if start < 0:
+        raise OutputParseError("응답에 JSON 객체가 없습니다.")
+    text = content[start:]
+
+    try:
+        data, _ = json.JSONDecoder().raw_decode(text)
+        return data, False
+    except json.JSONDecodeError:
+        pass
+    return _repair(text), True
+
+
+def validate_output(kind: str, data: Any) -> Dict[str, Any]:
+    """단계별 스키마 검증 후 파생 필드(항목 수) 보정"""
+    validator = _VALIDATORS.get(kind)
+    if validator is not None:
+        errors = [
+            f"{'/'.join(str(p) for p in error.absolute_path) or '(root)'}: {error.message}"
+            for error in validator.iter_errors(data)
+        ]
+        if errors:
+            raise SchemaValidationError(kind, errors)
+
+    if kind in ('checklist', 'fused'):
+        items = [item for category in data['categories'] for item in category['items']]
+        data['total_items'] = len(items)
+        data['required_items'] = sum(1 for item in items if item['required'])
+    return data
+
+
+def _repair(text: str) -> Any:
+    """
+    문자열/괄호 상태를 추적하며 잘린 JSON을 닫고 끝의 쉼표를 제거
+    그래도 파싱되지 않으면 마지막으로 완성된 원소 위치까지 잘라냅니다.
+    """
+    out, stack = [], []
+    checkpoints = []    # (',' 직전 위치, 그 시점의 괄호 스택)
+    in_string = escape = False
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            _strip_trailing_comma(out)
+            if not stack or stack[-1] != char:
+                continue
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        elif char == ',':
+            checkpoints.append((len(out), list(stack)))
+        out.append(char)
+
+    candidates = [_close(out, stack, in_string)]
+    candidates += [_close(out[:position], snapshot, False) for position, snapshot in reversed(checkpoints)]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise OutputParseError("JSON 복구 실패")
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+
+def _close(out: List[str], stack: List[str], in_string: bool) -> str:
+    text = ''.join(out) + ('"' if in_string else '')
+    text = text.rstrip()
+    if text.endswith(','):
+        text = text[:-1]
+    elif text.endswith(':'):
+        text += ' null'
+    return text + ''.join(reversed(stack))
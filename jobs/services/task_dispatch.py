@@ -0,0 +1,20 @@
+import logging
+from typing import Any, Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def publish_tasks(task, args_list: Iterable[Sequence[Any]]) -> int:
+    """
+    같은 task를 여러 인자로 발행
+    producer(브로커 연결) 하나를 빌려 apply_async를 반복하므로 task마다 연결 풀을 오가지 않고,
+    메시지는 Celery / kombu가 직접 만듭니다.
+    작업 상태는 DB로 조회하므로 결과 백엔드 구독(task마다 SUBSCRIBE 1회)은 생략합니다.
+    """
+    count = 0
+    with task.app.producer_or_acquire() as producer:
+        for args in args_list:
+            task.apply_async(args=list(args), producer=producer, ignore_result=True)
+            count += 1
+    logger.info(f"📤 {count}개 task 발행 ({task.name})")
+    return count
@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+from django.utils.dateparse import parse_datetime
+
+from .models import Job
+from .services.job_progress import get_partial
+from .tasks import read_job_state
+
+
+def job_status_payload(event_id):
+    """
+    상태 조회 응답 본문 (작업이 없으면 None)
+    진행 중인 작업은 Redis의 상태를 읽고, 없을 때만 Postgres를 조회합니다.
+    """
+    state = read_job_state(event_id)
+    if state is None or 'created_at' not in state:
+        job = Job.objects.filter(event_id=event_id).first()
+        if job is None:
+            return None
+        state = {
+            'status': job.status, 'result': job.result,
+            'created_at': job.created_at, 'updated_at': job.updated_at,
+            **(state or {}),
+        }
+    job_status, result = state['status'], state.get('result')
+    
+    response_data = {
+        'event_id': str(event_id),
+        'status': job_status,
+        'created_at': state['created_at'].isoformat(),
+        'updated_at': state['updated_at'].isoformat(),
+    }
+    
+    # 상태별 응답 처리
+    if job_status == 'pending':
+        response_data['message'] = '작업이 대기 중입니다.'
+        
+    elif job_status == 'processing':
+        response_data['message'] = '작업을 처리하고 있습니다.'
+        # 진행 상황이 있다면 포함 (스트리밍 중 완성된 부분 결과 포함)
+        steps_completed = (result or {}).get('steps_completed')
+        partial = get_partial(event_id)
+        if steps_completed is not None or partial:
+            response_data['progress'] = {
+                'steps_completed': steps_completed or [],
+                'current_step': get_current_step(steps_completed)
+            }
+            if partial:
+                response_data['progress']['partial'] = partial
+            
+    elif job_status == 'completed':
+        response_data['message'] = '작업이 완료되었습니다.'
+        if result:
+            response_data['result'] = result
+            
+    elif job_status == 'failed':
+        response_data['message'] = '작업 처리 중 오류가 발생했습니다.'
+        if result and 'error' in result:
+            response_data['error'] = result['error']
+            response_data['failed_at'] = result.get('failed_at')
+    
+    return response_data
+
+
+def get_current_step(steps_completed):
+    """
+    완료된 단계를 바탕으로 현재 진행 중인 단계 반환
+    """
+    if not steps_completed:
+        return 'summary_generation'
+    
+    if 'summary_generated' not in steps_completed:
+        return 'summary_generation'
+    elif 'checklist_generated' not in steps_completed:
+        return 'checklist_generation'
+    else:
+        return 'finalizing'
+
+
+def status_validators(payload):
+    """
+    상태 응답의 (ETag, Last-Modified unix 초) - updated_at 기준
+    진행 중 부분 결과(progress.partial)는 updated_at 없이 바뀌므로 ETag에 그 내용도 반영합니다.
+    """
+    tag = f"{payload['event_id']}:{payload['updated_at']}"
+    partial = payload.get('progress', {}).get('partial')
+    if partial:
+        tag += ':' + json.dumps(partial, sort_keys=True, ensure_ascii=False)
+    etag = f'"{hashlib.sha1(tag.encode()).hexdigest()}"'
+    return etag, int(parse_datetime(payload['updated_at']).timestamp())
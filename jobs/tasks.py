@@ -1,86 +1,576 @@
-from celery import shared_task
+import copy
+import json
+
+from celery import chain, shared_task
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from redis.exceptions import RedisError
 import logging
 
 from .models import Job
-from .services.gpt_service import GPTService
+from .pg_queue import get_job_queue_backend, notify_job_queue
+from .services.gpt_service import DEFAULT_GUIDELINE_TEXT, get_gpt_service
+from .services.job_progress import clear_partial, publish_partial
+from .services.job_events import publish_job_event
+from .services.job_state import TERMINAL_STATUSES, JobStateStore
+from .services.status_cache import StatusCache
+from .services.exceptions import RetryLater
+from .services.fair_scheduler import FairScheduler
+from .services.incremental import diff_sections, merge_revision
+from .services.similarity_index import SimilarityIndex
+from .services.single_flight import SingleFlight, content_hash
+from .services.task_dispatch import publish_tasks
+from .webhooks import schedule_webhooks
 
 logger = logging.getLogger(__name__)
 
 
+# 단계별 체크포인트 (Job.result['steps_completed'])
+SUMMARY_STEP = 'summary_generated'
+CHECKLIST_STEP = 'checklist_generated'
+
+# 단계별 single-flight namespace (Celery 단계 / Postgres 워커 / asyncio 워커가 공유)
+SUMMARY_FLIGHT = 'guideline_summary'
+CHECKLIST_FLIGHT = 'guideline_checklist'
+
+# 종료 시 Postgres에 반영하는 열 (그 외 열은 작업 중에 바뀌지 않음)
+JOB_STATE_FIELDS = ['status', 'message', 'result', 'updated_at']
+
+
 @shared_task(bind=True, name='jobs.tasks.process_guideline_job')
 def process_guideline_job(self, event_id):
     """
-    Guideline ingest 작업을 처리하는 Celery task
-    FIFO 큐에서 처리되며 2단계 GPT 체인을 실행합니다.
+    Guideline ingest 작업 시작
+    단계별 task(요약 → 체크리스트)를 Celery chain으로 연결하여 각 단계 큐에 발행합니다.
+    """
+    job = apply_job_state(Job.objects.filter(event_id=event_id).only('event_id', 'status').first())
+    if job is None:
+        error_msg = f"❌ Job not found for event_id: {event_id}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+    if job.is_completed:
+        logger.info(f"⏭️ Job already {job.status}, skipping event_id: {event_id}")
+        release_job_slot(event_id)
+        return None
+    
+    logger.info(f"🚀 Starting job processing for event_id: {event_id}")
+    build_job_chain(event_id).apply_async()
+    return event_id
+
+
+def build_job_chain(event_id):
+    """작업의 단계별 task chain (큐는 celery.py task_routes로 단계별 지정)"""
+    return chain(
+        generate_summary_step.si(event_id),
+        generate_checklist_step.si(event_id),
+    )
+
+
+@shared_task(
+    bind=True,
+    name='jobs.tasks.generate_summary_step',
+    max_retries=settings.GPT_RATE_LIMIT_MAX_RETRIES,
+    soft_time_limit=settings.GUIDELINE_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.GUIDELINE_TASK_TIME_LIMIT,
+)
+def generate_summary_step(self, event_id):
+    """
+    1단계: 가이드라인 요약 (체크포인트: summary_generated)
+    이전 결과 재사용 / 증분 처리 / fused 모드는 이 단계에서 체크리스트까지 완성합니다.
     """
+    return run_job_step(self, event_id, SUMMARY_STEP, summarize_job)
+
+
+@shared_task(
+    bind=True,
+    name='jobs.tasks.generate_checklist_step',
+    max_retries=settings.GPT_RATE_LIMIT_MAX_RETRIES,
+    soft_time_limit=settings.GUIDELINE_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.GUIDELINE_TASK_TIME_LIMIT,
+)
+def generate_checklist_step(self, event_id):
+    """
+    2단계: 저장된 요약으로 체크리스트 생성 후 작업 완료 (체크포인트: checklist_generated)
+    """
+    return run_job_step(self, event_id, CHECKLIST_STEP, build_checklist_for_job)
+
+
+def enqueue_jobs(jobs, fifo_fallback=True):
+    """
+    작업을 테넌트/우선순위별 대기열에 넣고 빈 실행 슬롯만큼 발행
+    공정 스케줄링을 끄거나 Redis 대기열을 쓸 수 없으면 FIFO 큐에 바로 발행합니다.
+    fifo_fallback=False(outbox relay)면 대기열 제출 실패를 그대로 올려 같은 작업을 다시 제출하게 합니다
+    (제출은 event_id별로 한 번만 들어가므로 일부만 들어간 묶음을 FIFO로 중복 발행하지 않음).
+    대기열에 들어간 뒤의 발행 실패는 beat 주기 발행이 다시 처리하므로 올리지 않습니다.
+    Postgres 큐 백엔드는 pending 행 자체가 대기열이므로 워커만 깨웁니다.
+    """
+    if get_job_queue_backend() == 'postgres':
+        transaction.on_commit(notify_job_queue)
+        return
+    
+    # 발행 전에 초기 상태를 기록 (워커가 먼저 쓴 processing을 덮어쓰지 않도록)
+    init_job_state(jobs)
+    if fair_scheduling_enabled():
+        try:
+            FairScheduler().submit((job.event_id, job.tenant, job.priority) for job in jobs)
+        except RedisError as e:
+            if not fifo_fallback:
+                raise
+            logger.warning(f"공정 스케줄러 사용 불가, FIFO 큐에 바로 발행합니다: {e}")
+        else:
+            try:
+                dispatch_ready_jobs()
+            except Exception as e:
+                logger.warning(f"대기열 작업 발행 실패, 다음 주기 발행 때 다시 시도합니다: {e}")
+            return
+    publish_tasks(process_guideline_job, [[str(job.event_id)] for job in jobs])
+
+
+@shared_task(name='jobs.tasks.dispatch_ready_jobs')
+def dispatch_ready_jobs():
+    """
+    빈 실행 슬롯만큼 대기열의 다음 작업 발행
+    제출 / 작업 종료 시 호출되며, lease 만료로 회수된 슬롯은 beat 주기 실행이 채웁니다.
+    """
+    scheduler = FairScheduler()
+    released = scheduler.release()
+    if released:
+        try:
+            publish_tasks(process_guideline_job, [[job.event_id] for job in released])
+        except Exception:
+            # 꺼낸 작업이 대기열과 실행 슬롯 어디에도 없이 사라지지 않도록 되돌림 (다음 발행 때 다시 꺼냄)
+            scheduler.requeue(released)
+            raise
+    return len(released)
+
+
+def release_job_slot(event_id):
+    """끝난 작업의 실행 슬롯을 반납하고 다음 작업 발행"""
+    if not fair_scheduling_enabled():
+        return
     try:
-        # Job 조회 및 상태를 processing으로 변경
-        job = Job.objects.get(event_id=event_id)
-        job.status = 'processing'
-        job.save()
-        
-        logger.info(f"🚀 Starting job processing for event_id: {event_id}")
-        
-        # GPT 서비스 초기화
-        gpt_service = GPTService()
-        
-        # 1단계: 가이드라인 요약 생성
-        logger.info(f"📝 Step 1: Generating summary for event_id: {event_id}")
-        summary = gpt_service.generate_summary()
-        
-        # 중간 상태 저장 (요약 완료)
-        job.result = {
-            'summary': summary,
-            'steps_completed': ['summary_generated']
-        }
-        job.save()
-        logger.info(f"✅ Summary generated for event_id: {event_id}")
-        
-        # 2단계: 요약을 바탕으로 체크리스트 생성
-        logger.info(f"📋 Step 2: Generating checklist for event_id: {event_id}")
-        checklist = gpt_service.generate_checklist(summary)
-        
-        # 최종 결과 저장
-        result = {
-            'summary': summary,
-            'checklist': checklist,
-            'processed_at': timezone.now().isoformat(),
-            'steps_completed': ['summary_generated', 'checklist_generated']
-        }
+        if FairScheduler().finish(event_id):
+            dispatch_ready_jobs()
+    except RedisError as e:
+        logger.warning(f"실행 슬롯 반납 실패 ({event_id}), lease 만료 후 회수됩니다: {e}")
+
+
+def fair_scheduling_enabled():
+    return getattr(settings, 'JOB_FAIR_SCHEDULING_ENABLED', True) and get_job_queue_backend() == 'celery'
+
+
+def write_behind_enabled():
+    # Postgres 큐 백엔드는 claim / lease가 Job 행의 상태를 기준으로 하므로 바로 기록
+    return getattr(settings, 'JOB_STATE_WRITE_BEHIND', False) and get_job_queue_backend() == 'celery'
+
+
+def read_job_state(event_id):
+    """Redis에 있는 작업 상태 (write-behind를 끄거나 Redis를 쓸 수 없으면 None)"""
+    if not write_behind_enabled():
+        return None
+    try:
+        return JobStateStore().get(event_id)
+    except RedisError as e:
+        logger.warning(f"작업 상태 조회 실패 ({event_id}), Postgres 값을 사용합니다: {e}")
+        return None
+
+
+def read_job_statuses(event_ids):
+    """Redis에 있는 작업별 status {event_id: status} (write-behind를 끄거나 Redis를 쓸 수 없으면 빈 dict)"""
+    if not write_behind_enabled() or not event_ids:
+        return {}
+    try:
+        return JobStateStore().statuses(event_ids)
+    except RedisError as e:
+        logger.warning(f"작업 상태 일괄 조회 실패, Postgres 값을 사용합니다: {e}")
+        return {}
+
+
+def apply_job_state(job):
+    """Postgres에서 읽은 Job에 Redis의 최신 상태를 덮어씀 (상태가 없으면 그대로)"""
+    if job is None:
+        return None
+    state = read_job_state(job.event_id) or {}
+    for field in JOB_STATE_FIELDS:
+        if field in state:
+            setattr(job, field, state[field])
+    return job
+
+
+def init_job_state(jobs):
+    """새 작업의 초기 상태를 Redis에 기록 (상태 조회가 Postgres를 거치지 않도록)"""
+    if not write_behind_enabled():
+        return
+    try:
+        JobStateStore().create(jobs)
+    except RedisError as e:
+        logger.warning(f"작업 초기 상태 기록 실패, 조회 시 Postgres 값을 사용합니다: {e}")
+
+
+def set_job_state(event_id, **fields):
+    """진행 중 상태 기록 (Redis 해시, 쓸 수 없으면 Postgres에 바로 기록) 후 대기 중인 조회 연결에 알림"""
+    _write_job_state(JobStateStore.update, event_id, fields)
+    invalidate_status_cache(event_id)
+    publish_job_event(event_id, fields.get('status'))
+
+
+def finish_job_state(event_id, **fields):
+    """종료 상태 기록 (write-behind: flush_job_states가 묶음으로 Postgres에 반영) 후 대기 중인 조회 연결에 알림"""
+    _write_job_state(JobStateStore.finish, event_id, fields)
+    invalidate_status_cache(event_id)
+    publish_job_event(event_id, fields.get('status'))
+
+
+def invalidate_status_cache(event_id):
+    """캐시된 상태 조회 응답 삭제 (상태를 쓸 때마다)"""
+    if not getattr(settings, 'JOB_STATUS_CACHE_ENABLED', True):
+        return
+    try:
+        StatusCache().invalidate(event_id)
+    except RedisError as e:
+        logger.warning(f"상태 응답 캐시 삭제 실패 ({event_id}): {e}")
+
+
+def _write_job_state(write, event_id, fields):
+    if write_behind_enabled():
+        try:
+            write(JobStateStore(), event_id, **fields)
+            return
+        except RedisError as e:
+            logger.warning(f"작업 상태 기록 실패 ({event_id}), Postgres에 바로 기록합니다: {e}")
+    if fields.get('status') not in TERMINAL_STATUSES:
+        Job.objects.filter(event_id=event_id).update(**fields, updated_at=timezone.now())
+        return
+    # 종료 상태와 완료 웹훅을 한 트랜잭션에 기록
+    with transaction.atomic():
+        Job.objects.filter(event_id=event_id).update(**fields, updated_at=timezone.now())
+        schedule_webhooks(Job.objects.filter(event_id=event_id, callback_url__isnull=False)
+                          .only('id', 'callback_url', 'callback_batch'))
+
+
+@shared_task(name='jobs.tasks.flush_job_states')
+def flush_job_states(limit=None):
+    """
+    Redis의 종료 상태를 Postgres에 반영 (beat 주기 실행)
+    묶음당 SELECT 1회 + bulk UPDATE 1회, 바뀌는 열(JOB_STATE_FIELDS)만 갱신하고
+    callback_url이 있는 작업의 완료 웹훅을 같은 트랜잭션에 등록합니다.
+    """
+    store = JobStateStore()
+    flushed = 0
+    while True:
+        states = store.dirty(limit or getattr(settings, 'JOB_STATE_FLUSH_BATCH', 1000))
+        if not states:
+            return flushed
+        jobs = list(
+            Job.objects.filter(event_id__in=list(states)).only('id', 'event_id', 'callback_url', 'callback_batch')
+        )
+        for job in jobs:
+            state = states[str(job.event_id)]
+            for field in JOB_STATE_FIELDS:
+                setattr(job, field, state.get(field))
+        with transaction.atomic():
+            Job.objects.bulk_update(jobs, JOB_STATE_FIELDS)
+            schedule_webhooks(jobs)
+        store.mark_flushed(list(states))
+        flushed += len(jobs)
+        logger.info(f"💾 Flushed {len(jobs)} finished job states to Postgres")
+
+
+# 작업 단계 순서 (chain 구성 순서와 동일)
+JOB_STEPS = (generate_summary_step, generate_checklist_step)
+
+
+def run_job_step(task, event_id, step, fn):
+    """
+    단계 task 공통 처리
+    - 작업이 끝났거나 체크포인트에 이미 있는 단계는 건너뜀 (재전달 / 중복 chain)
+    - RetryLater는 회복 시점으로 재예약, 그 외 오류는 실패 처리
+    """
+    try:
+        job = load_job(event_id)
+        if step_done(job, step):
+            logger.info(f"⏭️ {step} already done for event_id: {event_id}, skipping")
+            return event_id
         
-        job.result = result
-        job.status = 'completed'
-        job.save()
+        if job.status != 'processing':
+            job.status = 'processing'
+            set_job_state(event_id, status='processing')
         
-        logger.info(f"🎉 Successfully completed job processing for event_id: {event_id}")
-        return result
+        fn(job, job.get_guideline_text() or DEFAULT_GUIDELINE_TEXT)
+        return event_id
         
     except Job.DoesNotExist:
         error_msg = f"❌ Job not found for event_id: {event_id}"
         logger.error(error_msg)
         raise Exception(error_msg)
         
-    except Exception as exc:
-        error_msg = f"❌ Error processing job {event_id}: {str(exc)}"
-        logger.error(error_msg)
+    except RetryLater as exc:
+        # 호출 한도 초과 / 차단기 open / GPT 장애: 더미 결과 대신 회복 시점으로 재예약 (chain 유지)
+        if task.request.retries >= task.max_retries:
+            mark_job_failed(event_id, exc)
+            raise exc
+        logger.warning(f"⏳ {type(exc).__name__}, rescheduling {step} of event_id: {event_id} in {exc.retry_after:.1f}s")
+        set_job_state(event_id, status='pending', message=str(exc))
+        raise task.retry(exc=exc, countdown=exc.retry_after)
         
-        # Job 상태를 failed로 변경
-        try:
-            job = Job.objects.get(event_id=event_id)
-            job.status = 'failed'
-            job.result = {
-                'error': str(exc),
-                'failed_at': timezone.now().isoformat()
-            }
-            job.save()
-            logger.info(f"💾 Updated job status to failed for event_id: {event_id}")
-        except Job.DoesNotExist:
-            logger.error(f"Could not update job status to failed for event_id: {event_id}")
-            
+    except Exception as exc:
+        mark_job_failed(event_id, exc)
         raise exc
 
 
+def load_job(event_id):
+    """Job + Redis의 최신 상태 (없으면 Job.DoesNotExist)"""
+    return apply_job_state(Job.objects.get(event_id=event_id))
+
+
+def step_done(job, step):
+    """작업이 끝났거나 체크포인트에 이미 있는 단계 (재전달 / 중복 실행 시 건너뜀)"""
+    return job.is_completed or step in (job.result or {}).get('steps_completed', [])
+
+
+def summarize_job(job, guideline_text):
+    """1단계 실행 후 체크포인트 저장 (체크리스트까지 나온 경우 작업 완료)"""
+    # 동일 가이드라인을 처리 중인 작업이 있으면 그 결과를 공유 (single-flight)
+    flight = SingleFlight(namespace=SUMMARY_FLIGHT).run(
+        summary_flight_key(job, guideline_text),
+        owner=str(job.event_id),
+        fn=lambda: run_summary_stage(job, guideline_text),
+    )
+    save_summary(job, guideline_text, flight)
+
+
+def save_summary(job, guideline_text, flight):
+    """1단계 결과를 체크포인트로 저장 (체크리스트까지 나온 경우 작업 완료)"""
+    result = dict(flight.value)
+    if flight.shared:
+        logger.info(f"♻️ Reusing summary of in-flight job {flight.leader} for event_id: {job.event_id}")
+        result['shared_from'] = flight.leader
+    
+    if 'checklist' in result:
+        complete_job(job, guideline_text, result)
+        return
+    
+    # 중간 상태 저장 (요약 완료)
+    result['steps_completed'] = [SUMMARY_STEP]
+    job.result = result
+    set_job_state(job.event_id, result=result)
+    logger.info(f"✅ Summary generated for event_id: {job.event_id}")
+
+
+def build_checklist_for_job(job, guideline_text):
+    """2단계 실행: 체크포인트의 요약으로 체크리스트를 만들고 작업 완료"""
+    summary = checkpointed_summary(job)
+    flight = SingleFlight(namespace=CHECKLIST_FLIGHT).run(
+        checklist_flight_key(summary),
+        owner=str(job.event_id),
+        fn=lambda: run_checklist_stage(job, summary),
+    )
+    save_checklist(job, guideline_text, flight)
+
+
+def checkpointed_summary(job):
+    """체크포인트에 저장된 요약 (없으면 RuntimeError)"""
+    if 'summary' not in (job.result or {}):
+        raise RuntimeError(f"요약 단계가 완료되지 않았습니다: {job.event_id}")
+    return job.result['summary']
+
+
+def summary_flight_key(job, guideline_text):
+    """1단계 single-flight 키 - 처리 방식과 이전 버전 작업이 다르면 결과도 다르므로 함께 구분"""
+    return f'{content_hash(guideline_text)}:{job.get_pipeline_mode()}:{job.previous_job_id or "-"}'
+
+
+def checklist_flight_key(summary):
+    return content_hash(json.dumps(summary, sort_keys=True, ensure_ascii=False))
+
+
+def save_checklist(job, guideline_text, flight):
+    """2단계 결과를 합쳐 작업 완료"""
+    result = dict(job.result or {})
+    result['checklist'] = flight.value
+    if flight.shared:
+        logger.info(f"♻️ Reusing checklist of in-flight job {flight.leader} for event_id: {job.event_id}")
+        result.setdefault('shared_from', flight.leader)
+    complete_job(job, guideline_text, result)
+
+
+def complete_job(job, guideline_text, result):
+    """최종 결과 저장 (두 단계 완료)"""
+    result['processed_at'] = timezone.now().isoformat()
+    result['steps_completed'] = [SUMMARY_STEP, CHECKLIST_STEP]
+    job.result = result
+    job.status = 'completed'
+    finish_job_state(job.event_id, status='completed', result=result)
+    clear_partial(job.event_id)
+    if 'shared_from' not in result:
+        index_guideline(job.event_id, guideline_text, result)
+    logger.info(f"🎉 Successfully completed job processing for event_id: {job.event_id}")
+    release_job_slot(job.event_id)
+
+
+def find_similar_result(guideline_text):
+    """
+    거의 같은 가이드라인(MinHash Jaccard ≥ GPT_SIMILARITY_THRESHOLD)의 완료된 결과를 찾아
+    새 입력에 맞게 보정한 {'summary', 'checklist'} 반환 (없으면 None)
+    """
+    if not getattr(settings, 'GPT_SIMILARITY_ENABLED', True):
+        return None
+    
+    index = SimilarityIndex()
+    match = index.lookup(guideline_text)
+    if match is None:
+        return None
+    
+    state = read_job_state(match.doc_id) or {}
+    if state.get('status') == 'completed':
+        source = state.get('result')
+    else:
+        source = Job.objects.filter(event_id=match.doc_id, status='completed').values_list('result', flat=True).first()
+    if not source or 'summary' not in source or 'checklist' not in source:
+        # 결과를 재사용할 수 없는 작업은 인덱스에서 제거
+        index.remove(match.doc_id)
+        return None
+    
+    logger.info(f"🧬 Reusing result of similar job {match.doc_id} (similarity {match.similarity:.2f})")
+    summary = copy.deepcopy(source['summary'])
+    summary['word_count'] = len(guideline_text.split())
+    return {
+        'summary': summary,
+        'checklist': copy.deepcopy(source['checklist']),
+        'reused_from': match.doc_id,
+        'similarity': round(match.similarity, 3),
+    }
+
+
+def load_revision_base(job, guideline_text):
+    """
+    이전 버전 작업과 섹션 diff 반환
+    이전 결과를 쓸 수 없거나 변경 비율이 GPT_INCREMENTAL_MAX_CHANGE_RATIO를 넘으면 None (전체 처리)
+    """
+    previous = apply_job_state(job.previous_job)
+    if previous is None or previous.status != 'completed':
+        return None
+    if 'summary' not in (previous.result or {}) or 'checklist' not in previous.result:
+        return None
+    
+    diff = diff_sections(previous.get_guideline_text() or DEFAULT_GUIDELINE_TEXT, guideline_text)
+    if diff.change_ratio > getattr(settings, 'GPT_INCREMENTAL_MAX_CHANGE_RATIO', 0.5):
+        logger.info(f"📄 {diff.changed_sections}/{diff.total_sections} sections changed, re-processing whole document")
+        return None
+    return previous, diff
+
+
+def build_revision_result(previous, diff, revision, guideline_text):
+    """이전 결과에 변경분을 병합 (변경이 없으면 이전 결과 그대로)"""
+    if revision is None:
+        result = {'summary': copy.deepcopy(previous.result['summary']), 'checklist': copy.deepcopy(previous.result['checklist'])}
+    else:
+        result = merge_revision(previous.result, revision, guideline_text)
+    result['revision_of'] = str(previous.event_id)
+    result['changed_sections'] = diff.changed_sections
+    return result
+
+
+def run_revision(job, guideline_text):
+    """
+    이전 버전 대비 변경된 섹션만 다시 처리
+    증분 처리할 수 없으면 None (전체 처리)
+    """
+    base = load_revision_base(job, guideline_text)
+    if base is None:
+        return None
+    previous, diff = base
+    
+    if not diff.changes:
+        logger.info(f"♻️ No sections changed since {previous.event_id}, reusing its result")
+        return build_revision_result(previous, diff, None, guideline_text)
+    
+    logger.info(f"✏️ Re-processing {diff.changed_sections}/{diff.total_sections} changed sections for event_id: {job.event_id}")
+    revision = get_gpt_service().generate_revision(
+        previous.result,
+        diff.changes,
+        on_partial=lambda items: publish_partial(job.event_id, 'checklist', 'categories', items),
+    )
+    if revision is None:
+        return None
+    return build_revision_result(previous, diff, revision, guideline_text)
+
+
+def index_guideline(event_id, guideline_text, result):
+    """실제 GPT로 생성한 결과만 근사 중복 인덱스에 등록"""
+    if not getattr(settings, 'GPT_SIMILARITY_ENABLED', True) or 'reused_from' in result:
+        return
+    if result['summary'].get('_source') != 'openai_gpt' or result['checklist'].get('_source') != 'openai_gpt':
+        return
+    SimilarityIndex().add(str(event_id), guideline_text)
+
+
+def mark_job_failed(event_id, exc):
+    """
+    오류 발생 시 Job 상태를 failed로 변경
+    """
+    error_msg = f"❌ Error processing job {event_id}: {str(exc)}"
+    logger.error(error_msg)
+    
+    if not Job.objects.filter(event_id=event_id).exists():
+        logger.error(f"Could not update job status to failed for event_id: {event_id}")
+    else:
+        finish_job_state(event_id, status='failed', result={
+            'error': str(exc),
+            'failed_at': timezone.now().isoformat()
+        })
+        clear_partial(event_id)
+        logger.info(f"💾 Updated job status to failed for event_id: {event_id}")
+    release_job_slot(event_id)
+
+
+def run_summary_stage(job, guideline_text):
+    """
+    1단계 결과 {'summary'} 반환
+    이전 결과 재사용 / 증분 처리 / fused 모드는 체크리스트까지 포함한 결과를 반환합니다.
+    """
+    event_id = job.event_id
+    
+    if job.previous_job_id:
+        # 이전 버전이 지정되면 변경된 섹션만 다시 처리
+        revised = run_revision(job, guideline_text)
+        if revised is not None:
+            return revised
+    else:
+        # 거의 같은 가이드라인의 이전 결과가 있으면 GPT 호출 없이 재사용
+        reused = find_similar_result(guideline_text)
+        if reused is not None:
+            return reused
+    
+    # 워커 프로세스 공용 GPT 서비스 (최초 1회만 초기화)
+    gpt_service = get_gpt_service()
+    
+    if job.get_pipeline_mode() == 'fused':
+        logger.info(f"⚡ Generating summary and checklist in one call for event_id: {event_id}")
+        return gpt_service.generate_fused(
+            guideline_text,
+            on_partial=lambda items: publish_partial(event_id, 'checklist', 'categories', items),
+        )
+    
+    # 1단계: 가이드라인 요약 생성
+    logger.info(f"📝 Step 1: Generating summary for event_id: {event_id}")
+    summary = gpt_service.generate_summary(
+        guideline_text,
+        on_partial=lambda items: publish_partial(event_id, 'summary', 'key_points', items),
+    )
+    return {'summary': summary}
+
+
+def run_checklist_stage(job, summary):
+    """2단계: 요약을 바탕으로 체크리스트 생성"""
+    logger.info(f"📋 Step 2: Generating checklist for event_id: {job.event_id}")
+    return get_gpt_service().generate_checklist(
+        summary,
+        on_partial=lambda items: publish_partial(job.event_id, 'checklist', 'categories', items),
+    )
+
+
 # Celery.py에서 사용되는 별칭 함수
 @shared_task(bind=True, name='jobs.tasks.guideline_ingest_task')
 def guideline_ingest_task(self, event_id):
@@ -1,11 +1,80 @@
+import asyncio
+import gc
+import gzip
+import io
+import json
+import os
+import tempfile
+import random
+import threading
+import time
 import uuid
-from unittest.mock import patch, MagicMock
-from django.test import TestCase
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import ANY, patch, AsyncMock, MagicMock
+import openai
+import requests
+from aiohttp import web
+from asgiref.sync import sync_to_async
+from kombu import Connection
+from openai.openai_object import OpenAIObject
+from redis.exceptions import RedisError
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from jobs.models import Job
+from common.metrics import BufferedCounters, get_metrics, reset_metrics
+from common.utils import get_redis
+from jobs.async_worker import process_guideline_job_async
+from jobs.checks import check_single_flight_limits
+from jobs.llm_stub import MALFORMED_KINDS, LLMStubServer, StubConfig, content_rng, corrupt_json, sample_from_schema
+from jobs.models import Job, JobOutbox, WebhookDeadLetter, WebhookDelivery
+from jobs.outbox import OutboxRelay, relay_outbox
+from jobs.pg_queue import claim_jobs, requeue_expired_jobs
+from jobs.pg_worker import PostgresJobWorker, run_claimed_job
+from jobs.services.blob_store import BlobStore, DocumentTooLarge, InvalidDocument
+from jobs.services.chunking import chunk_document, estimate_tokens
+from jobs.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from jobs.services.exceptions import GPTUnavailable, RetryLater
+from jobs.services.fair_scheduler import FairScheduler
+from jobs.services.gpt_service import DEFAULT_GUIDELINE_TEXT, GPTService, get_gpt_service, reset_gpt_service
+from jobs.services.incremental import diff_sections, merge_revision
+from jobs.services.job_progress import clear_partial, get_partial, publish_partial
+from jobs.services.model_router import ModelRouter
+from jobs.services.rate_limiter import RateLimiter, RateLimitExceeded
+from jobs.services.result_cache import ResultCache, make_cache_key
+from jobs.services.similarity_index import SimilarityIndex
+from jobs.services.status_cache import StatusCache
+from jobs.services.single_flight import SingleFlight, SingleFlightTimeout
+from jobs.services.stream_parser import IncrementalJSONParser
+from jobs.services.structured_output import (
+    OUTPUT_SCHEMAS, OutputParseError, SchemaValidationError, parse_output, validate_output,
+)
+from jobs.services.task_dispatch import publish_tasks
+from jobs.webhook_worker import WebhookWorker, sign_body
+from jobs.tasks import (
+    JOB_STEPS, build_job_chain, dispatch_ready_jobs, enqueue_jobs, find_similar_result, finish_job_state,
+    flush_job_states, generate_checklist_step, generate_summary_step, index_guideline, mark_job_failed,
+    process_guideline_job, set_job_state, summary_flight_key,
+)
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def run_job_steps(event_id):
+    """브로커 없이 작업의 단계별 task를 chain 순서대로 직접 실행 후 종료 상태를 Postgres에 반영"""
+    for step in JOB_STEPS:
+        step(event_id)
+    flush_job_states()
 
 class JobModelTest(TestCase):
     """Test Job model"""
@@ -37,7 +106,10 @@ class JobModelTest(TestCase):
 class JobAPITest(APITestCase):
     """Test Job API endpoints"""
     
-    @patch('jobs.tasks.process_guideline_job.delay')
+    def setUp(self):
+        cache.clear()
+    
+    @patch('jobs.tasks.publish_tasks')
     def test_create_job_success(self, mock_task):
         """Test successful job creation"""
         response = self.client.post('/api/jobs', {}, format='json')
@@ -50,8 +122,11 @@ class JobAPITest(APITestCase):
         job = Job.objects.get(event_id=event_id)
         self.assertEqual(job.status, 'pending')
         
-        # Verify task was queued
-        mock_task.assert_called_once_with(event_id)
+        # Verify the request only wrote an outbox row and the relay queued the task
+        mock_task.assert_not_called()
+        self.assertEqual(relay_outbox(), 1)
+        mock_task.assert_called_once_with(process_guideline_job, [[event_id]])
+        self.assertFalse(JobOutbox.objects.exists())
     
     def test_get_job_success(self):
         """Test successful job retrieval"""
@@ -69,9 +144,9 @@ class JobAPITest(APITestCase):
         response = self.client.get(f'/api/jobs/{job.event_id}')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['event_id'], str(job.event_id))
-        self.assertEqual(response.data['status'], 'completed')
-        self.assertIn('result', response.data)
+        self.assertEqual(response.json()['event_id'], str(job.event_id))
+        self.assertEqual(response.json()['status'], 'completed')
+        self.assertIn('result', response.json())
     
     def test_get_job_not_found(self):
         """Test job not found scenario"""
@@ -92,3 +167,1938 @@ class JobAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'pending')
         self.assertIsNone(response.data.get('result'))
+    
+    def test_async_status_view_is_documented(self):
+        """Test the ASGI status route is documented with the DRF view's schema"""
+        response = self.client.get('/api/schema/', HTTP_ACCEPT='application/json')
+        
+        operation = response.json()['paths']['/api/jobs/{event_id}']['get']
+        self.assertEqual(operation['operationId'], 'get_job_status')
+        self.assertIn('wait', [parameter['name'] for parameter in operation['parameters']])
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_MODEL_HEALTH_TTL=300)
+class GPTServiceWarmupTest(TestCase):
+    """Test process-wide GPTService reuse"""
+    
+    def setUp(self):
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_service_is_created_once_without_completion_probe(self, mock_retrieve, mock_create):
+        """Test the service is reused and model selection costs no completion call"""
+        first = get_gpt_service()
+        second = get_gpt_service()
+        
+        self.assertIs(first, second)
+        self.assertEqual(first.model_name, 'gpt-4o-mini')
+        self.assertFalse(first.use_fallback)
+        mock_retrieve.assert_called_once_with('gpt-4o-mini', request_timeout=30)
+        mock_create.assert_not_called()
+    
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_model_selection_falls_back_to_next_candidate(self, mock_retrieve):
+        """Test the next candidate model is selected when the first one fails"""
+        mock_retrieve.side_effect = [Exception('model not found'), MagicMock()]
+        
+        service = get_gpt_service()
+        
+        self.assertEqual(service.model_name, 'gpt-3.5-turbo')
+        self.assertFalse(service.use_fallback)
+
+
+def make_completion(content=None, arguments=None):
+    """Build a fake ChatCompletion response (plain content or function call arguments)"""
+    message = {'role': 'assistant', 'content': content}
+    if arguments is not None:
+        message['function_call'] = {'name': 'submit', 'arguments': arguments}
+    return OpenAIObject.construct_from({'choices': [{'message': message}]})
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key')
+class GPTResultCacheTest(TestCase):
+    """Test content-addressed GPT result cache"""
+    
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+        patcher = patch('jobs.services.gpt_service.openai.Model.retrieve')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    def test_identical_guideline_hits_cache(self, mock_create):
+        """Test whitespace-only differences reuse the cached summary"""
+        mock_create.return_value = make_completion(
+            '{"title": "T", "content": "C", "key_points": ["a"], "word_count": 3}'
+        )
+        service = get_gpt_service()
+        
+        first = service.generate_summary('1. 코드 리뷰\n- 필수')
+        service.result_cache.clear_local()
+        second = service.generate_summary('  1. 코드 리뷰 - 필수  ')
+        third = service.generate_summary('1. 코드 리뷰 - 필수')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(second, third)
+        mock_create.assert_called_once()
+        self.assertEqual(service.result_cache.stats()['redis_hits'], 1)
+        self.assertEqual(service.result_cache.stats()['local_hits'], 1)
+        service.result_cache.flush_metrics()
+        self.assertEqual(get_metrics('gpt_cache')['gpt_cache.miss'], 1)
+    
+    def test_hit_metrics_are_flushed_in_batches(self):
+        """Test local hits do not touch Redis and counts are written once the batch fills"""
+        result_cache = ResultCache()
+        result_cache._counters = BufferedCounters(flush_every=5, flush_interval=60)
+        result_cache.set('gpt_cache:test:batched', {'title': 'T'})
+        
+        with patch('common.metrics.get_redis') as mock_redis:
+            for _ in range(4):
+                result_cache.get('gpt_cache:test:batched')
+            mock_redis.assert_not_called()
+        result_cache.get('gpt_cache:test:batched')
+        
+        self.assertEqual(get_metrics('gpt_cache'), {'gpt_cache.local_hit': 5})
+    
+    def test_redis_tier_is_size_bounded(self):
+        """Test the oldest entries are evicted above max_entries"""
+        result_cache = ResultCache(max_entries=2)
+        keys = [make_cache_key('summary', f'text {i}', 'gpt-4o-mini', 'v1', 0.3) for i in range(3)]
+        for i, key in enumerate(keys):
+            result_cache.set(key, {'index': i})
+        result_cache.clear_local()
+        
+        self.assertIsNone(result_cache.get(keys[0]))
+        self.assertEqual(result_cache.get(keys[2]), {'index': 2})
+
+
+class SingleFlightTest(TestCase):
+    """Test single-flight deduplication of identical guideline jobs"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_follower_reuses_leader_result(self):
+        """Test a second run with the same key does not call fn again"""
+        flight = SingleFlight(namespace='test')
+        fn = MagicMock(return_value={'summary': {'title': 'T'}})
+        
+        leader = flight.run('same-hash', owner='job-1', fn=fn)
+        follower = flight.run('same-hash', owner='job-2', fn=fn)
+        
+        fn.assert_called_once()
+        self.assertFalse(leader.shared)
+        self.assertTrue(follower.shared)
+        self.assertEqual(follower.leader, 'job-1')
+        self.assertEqual(follower.value, leader.value)
+    
+    def test_stale_lease_expires(self):
+        """Test a crashed leader's lease expires and a follower takes over"""
+        get_redis().set('singleflight:test:lease:crashed', 'dead-job', px=50)
+        flight = SingleFlight(namespace='test', poll_interval=0.01, wait_timeout=5)
+        
+        outcome = flight.run('crashed', owner='job-2', fn=lambda: {'ok': True})
+        
+        self.assertFalse(outcome.shared)
+        self.assertEqual(outcome.value, {'ok': True})
+    
+    def test_follower_timeout_reschedules_instead_of_blocking(self):
+        """Test a follower that outwaits its timeout raises RetryLater timed to the leader's remaining lease"""
+        get_redis().set('singleflight:test:lease:busy', 'leader-job', px=30000)
+        flight = SingleFlight(namespace='test', poll_interval=0.01, wait_timeout=0.05)
+        
+        with self.assertRaises(RetryLater) as raised:
+            flight.run('busy', owner='job-2', fn=lambda: {'ok': True})
+        
+        self.assertIsInstance(raised.exception, SingleFlightTimeout)
+        self.assertGreater(raised.exception.retry_after, 20)
+    
+    def test_wait_longer_than_the_soft_time_limit_fails_the_system_check(self):
+        """Test the follower wait timeout must stay below GUIDELINE_TASK_SOFT_TIME_LIMIT"""
+        self.assertEqual(check_single_flight_limits(None), [])
+        with self.settings(SINGLE_FLIGHT_WAIT_TIMEOUT=600, GUIDELINE_TASK_SOFT_TIME_LIMIT=300):
+            errors = check_single_flight_limits(None)
+        self.assertEqual([error.id for error in errors], ['jobs.E001'])
+    
+    def test_slow_leader_keeps_its_lease(self):
+        """Test the leader renews its lease while fn runs longer than the lease TTL"""
+        redis = get_redis()
+        flight = SingleFlight(namespace='test', lease_ttl=0.15)
+        
+        def slow():
+            time.sleep(0.5)
+            return {'holder': redis.get('singleflight:test:lease:slow').decode()}
+        
+        self.assertEqual(flight.run('slow', owner='job-1', fn=slow).value, {'holder': 'job-1'})
+        self.assertFalse(redis.exists('singleflight:test:lease:slow'))
+    
+    def test_summary_flight_key_separates_modes_and_revisions(self):
+        """Test the same text under another pipeline mode or previous job does not share a result"""
+        previous = Job.objects.create(status='completed')
+        keys = {
+            summary_flight_key(job, '같은 가이드라인')
+            for job in [
+                Job(pipeline_mode='two_step'), Job(pipeline_mode='fused'),
+                Job(pipeline_mode='two_step', previous_job=previous),
+            ]
+        }
+        
+        self.assertEqual(len(keys), 3)
+        self.assertIn(summary_flight_key(Job(pipeline_mode='two_step'), '  같은   가이드라인 '), keys)
+    
+    def test_result_publish_failure_keeps_the_leader_result(self):
+        """Test a Redis error while sharing the result does not fail the leader's job"""
+        flight = SingleFlight(namespace='test')
+        
+        with patch.object(get_redis(), 'set', side_effect=[True, RedisError('down')]):
+            outcome = flight.run('publish-fails', owner='job-1', fn=lambda: {'ok': True})
+        
+        self.assertEqual(outcome.value, {'ok': True})
+    
+    @patch('jobs.tasks.get_gpt_service')
+    def test_duplicate_jobs_copy_result(self, mock_get_service):
+        """Test a duplicate job copies the result into its own row"""
+        service = mock_get_service.return_value
+        service.generate_summary.return_value = {'title': 'T'}
+        service.generate_checklist.return_value = {'categories': []}
+        first = Job.objects.create(status='pending')
+        second = Job.objects.create(status='pending')
+        
+        run_job_steps(str(first.event_id))
+        run_job_steps(str(second.event_id))
+        
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'completed')
+        self.assertEqual(second.result['summary'], {'title': 'T'})
+        self.assertEqual(second.result['shared_from'], str(first.event_id))
+        service.generate_summary.assert_called_once()
+
+
+class AsyncWorkerTest(TestCase):
+    """Test asyncio execution path"""
+    
+    def setUp(self):
+        cache.clear()
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+    
+    @patch('jobs.async_worker.get_gpt_service')
+    async def test_async_pipeline_completes_job(self, mock_get_service):
+        """Test the async pipeline runs both steps and completes the job"""
+        service = mock_get_service.return_value
+        service.agenerate_summary = AsyncMock(return_value={'title': 'T'})
+        service.agenerate_checklist = AsyncMock(return_value={'categories': []})
+        job = await Job.objects.acreate(status='pending')
+        
+        await process_guideline_job_async(str(job.event_id))
+        await sync_to_async(flush_job_states)()
+        
+        job = await Job.objects.aget(pk=job.pk)
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.result['checklist'], {'categories': []})
+        self.assertEqual(service.agenerate_checklist.await_args.args[0], {'title': 'T'})
+    
+    @patch('jobs.tasks.index_guideline')
+    @patch('jobs.tasks.clear_partial')
+    @patch('jobs.async_worker.publish_partial')
+    @patch('jobs.async_worker.get_gpt_service')
+    async def test_async_pipeline_keeps_redis_writes_off_the_event_loop(self, mock_get_service, mock_publish,
+                                                                        mock_clear, mock_index):
+        """Test partial results, partial cleanup and index writes run in worker threads, partials before cleanup"""
+        calls = []
+        mock_publish.side_effect = lambda *args: calls.append(('publish', threading.get_ident()))
+        mock_clear.side_effect = lambda *args: calls.append(('clear', threading.get_ident()))
+        mock_index.side_effect = lambda *args: calls.append(('index', threading.get_ident()))
+        
+        async def summary(text, on_partial=None):
+            on_partial(['key point'])
+            return {'title': 'T'}
+        
+        service = mock_get_service.return_value
+        service.agenerate_summary = AsyncMock(side_effect=summary)
+        service.agenerate_checklist = AsyncMock(return_value={'categories': []})
+        job = await Job.objects.acreate(status='pending')
+        
+        await process_guideline_job_async(str(job.event_id))
+        
+        self.assertEqual([name for name, _ in calls], ['publish', 'clear', 'index'])
+        self.assertNotIn(threading.get_ident(), {thread for _, thread in calls})
+    
+    @patch('jobs.async_worker.get_gpt_service')
+    async def test_async_pipeline_resumes_from_checkpoint_and_skips_finished_jobs(self, mock_get_service):
+        """Test a redelivered job only runs the missing step and a finished job is left untouched"""
+        service = mock_get_service.return_value
+        service.agenerate_summary = AsyncMock(return_value={'title': 'new'})
+        service.agenerate_checklist = AsyncMock(return_value={'categories': []})
+        resumed = await Job.objects.acreate(status='processing', result={
+            'summary': {'title': 'saved'}, 'steps_completed': ['summary_generated'],
+        })
+        finished = await Job.objects.acreate(status='completed', result={'checklist': {'done': True}})
+        
+        await process_guideline_job_async(str(resumed.event_id))
+        await process_guideline_job_async(str(finished.event_id))
+        await sync_to_async(flush_job_states)()
+        
+        service.agenerate_summary.assert_not_awaited()
+        service.agenerate_checklist.assert_awaited_once_with({'title': 'saved'}, on_partial=ANY)
+        resumed = await Job.objects.aget(pk=resumed.pk)
+        self.assertEqual((resumed.status, resumed.result['summary']), ('completed', {'title': 'saved'}))
+        self.assertEqual((await Job.objects.aget(pk=finished.pk)).result, {'checklist': {'done': True}})
+    
+    @patch('jobs.tasks.get_gpt_service')
+    async def test_async_and_sync_steps_share_a_flight(self, mock_get_service):
+        """Test the async worker reuses the summary a Celery step already produced for the same document"""
+        mock_get_service.return_value.generate_summary.return_value = {'title': 'sync'}
+        first = await Job.objects.acreate(status='pending', guideline_text='공유 가이드라인')
+        second = await Job.objects.acreate(status='pending', guideline_text='공유 가이드라인')
+        await sync_to_async(generate_summary_step)(str(first.event_id))
+        
+        with patch('jobs.async_worker.get_gpt_service') as mock_async_service:
+            mock_async_service.return_value.agenerate_checklist = AsyncMock(return_value={'categories': []})
+            await process_guideline_job_async(str(second.event_id))
+            mock_async_service.return_value.agenerate_summary.assert_not_called()
+        
+        await sync_to_async(flush_job_states)()
+        second = await Job.objects.aget(pk=second.pk)
+        self.assertEqual(second.result['summary'], {'title': 'sync'})
+        self.assertEqual(second.result['shared_from'], str(first.event_id))
+    
+    @override_settings(OPENAI_API_KEY='sk-test-key', GPT_ASYNC_MAX_CONCURRENCY=2)
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.acreate')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    async def test_async_calls_respect_concurrency_cap(self, mock_retrieve, mock_acreate):
+        """Test no more than GPT_ASYNC_MAX_CONCURRENCY calls run at once"""
+        active, peak = 0, 0
+        
+        async def slow_completion(**kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return make_completion('{"title": "T", "content": "C", "key_points": [], "word_count": 1}')
+        
+        mock_acreate.side_effect = slow_completion
+        service = get_gpt_service()
+        
+        await asyncio.gather(*(service.agenerate_summary(f'guideline {i}') for i in range(6)))
+        
+        self.assertEqual(mock_acreate.call_count, 6)
+        self.assertEqual(peak, 2)
+    
+    @override_settings(OPENAI_API_KEY='sk-test-key')
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.acreate')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    async def test_async_gpt_call_keeps_redis_off_the_event_loop(self, mock_retrieve, mock_acreate):
+        """Test the result cache, circuit breaker and rate limiter are called from worker threads"""
+        mock_acreate.return_value = make_completion('{"title": "T", "content": "C", "key_points": [], "word_count": 1}')
+        threads = []
+        
+        def spy(method):
+            def wrapper(*args, **kwargs):
+                threads.append((method.__name__, threading.get_ident()))
+                return method(*args, **kwargs)
+            return wrapper
+        
+        with patch.object(ResultCache, 'get', spy(ResultCache.get)), \
+                patch.object(ResultCache, 'set', spy(ResultCache.set)), \
+                patch.object(CircuitBreaker, 'before_call', spy(CircuitBreaker.before_call)), \
+                patch.object(CircuitBreaker, 'record_success', spy(CircuitBreaker.record_success)), \
+                patch.object(RateLimiter, '_try_acquire', spy(RateLimiter._try_acquire)):
+            await get_gpt_service().agenerate_summary('off loop guideline')
+        
+        self.assertEqual({name for name, _ in threads},
+                         {'get', 'set', 'before_call', 'record_success', '_try_acquire'})
+        self.assertNotIn(threading.get_ident(), {thread for _, thread in threads})
+
+
+def make_stream(content, size=7):
+    """Build fake streaming ChatCompletion chunks"""
+    return [
+        {'choices': [{'delta': {'content': content[i:i + size]}}]}
+        for i in range(0, len(content), size)
+    ]
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_STREAMING_ENABLED=True)
+class StreamingTest(APITestCase):
+    """Test streaming GPT responses and partial progress"""
+    
+    CHECKLIST = {
+        'categories': [
+            {'name': '코드 품질', 'items': [{'id': 1, 'text': '리뷰 완료?', 'required': True}]},
+            {'name': '테스팅', 'items': [{'id': 2, 'text': '테스트 "통과"?', 'required': False}]},
+        ],
+        'total_items': 2,
+        'required_items': 1,
+    }
+    
+    def setUp(self):
+        cache.clear()
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+        patcher = patch('jobs.services.gpt_service.openai.Model.retrieve')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_parser_emits_each_category_when_complete(self):
+        """Test categories are emitted as soon as their closing brace arrives"""
+        content = '```json\n' + json.dumps(self.CHECKLIST, ensure_ascii=False) + '\n```'
+        parser = IncrementalJSONParser('categories')
+        
+        emitted = []
+        for chunk in make_stream(content, size=5):
+            emitted.append(len(parser.feed(chunk['choices'][0]['delta']['content'])))
+        
+        self.assertEqual(parser.items, self.CHECKLIST['categories'])
+        # 첫 카테고리는 전체 응답이 끝나기 전에 완성되어야 함
+        first_emitted = next(i for i, count in enumerate(emitted) if count)
+        self.assertLess(first_emitted, len(emitted) - 1)
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    def test_partial_categories_visible_while_processing(self, mock_create):
+        """Test streamed categories are published to the job status endpoint"""
+        mock_create.return_value = make_stream(json.dumps(self.CHECKLIST, ensure_ascii=False))
+        job = Job.objects.create(status='processing')
+        seen = []
+        
+        def on_partial(items):
+            publish_partial(job.event_id, 'checklist', 'categories', items)
+            seen.append(self.client.get(f'/api/jobs/{job.event_id}').data['progress'])
+        
+        checklist = get_gpt_service().generate_checklist({'title': 'T'}, on_partial=on_partial)
+        
+        self.assertEqual(checklist['categories'], self.CHECKLIST['categories'])
+        self.assertTrue(mock_create.call_args.kwargs['stream'])
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(seen[0]['partial']['checklist']['categories'], self.CHECKLIST['categories'][:1])
+        self.assertEqual(seen[0]['current_step'], 'summary_generation')
+
+    def test_partial_fields_are_written_independently(self):
+        """Test each (step, field) is its own hash field so concurrent writers do not overwrite each other"""
+        event_id = uuid.uuid4()
+        publish_partial(event_id, 'summary', 'key_points', ['a'])
+        publish_partial(event_id, 'checklist', 'categories', [{'name': 'c'}])
+        publish_partial(event_id, 'summary', 'key_points', ['a', 'b'])
+        
+        self.assertEqual(get_partial(event_id), {
+            'summary': {'key_points': ['a', 'b']},
+            'checklist': {'categories': [{'name': 'c'}]},
+        })
+        
+        publish_partial(event_id, 'summary', 'key_points', [])
+        self.assertEqual(get_partial(event_id), {'checklist': {'categories': [{'name': 'c'}]}})
+        clear_partial(event_id)
+        self.assertIsNone(get_partial(event_id))
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    def test_partial_is_cleared_before_the_repair_request(self, mock_create):
+        """Test categories streamed from a response that fails validation are withdrawn before the re-request"""
+        invalid = {'categories': [self.CHECKLIST['categories'][0], {'name': '테스팅', 'items': 'none'}]}
+        mock_create.side_effect = [
+            make_stream(json.dumps(invalid, ensure_ascii=False)),
+            make_completion(json.dumps(self.CHECKLIST, ensure_ascii=False)),
+        ]
+        event_id = uuid.uuid4()
+        calls = []
+        
+        def on_partial(items):
+            calls.append(items)
+            publish_partial(event_id, 'checklist', 'categories', items)
+        
+        checklist = get_gpt_service().generate_checklist({'title': 'T'}, on_partial=on_partial)
+        
+        self.assertEqual(checklist['categories'], self.CHECKLIST['categories'])
+        self.assertEqual(calls[0], self.CHECKLIST['categories'][:1])
+        self.assertEqual(calls[-1], [])
+        self.assertIsNone(get_partial(event_id))
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_SUMMARY_CHUNK_TOKENS=60)
+class MapReduceSummaryTest(TestCase):
+    """Test chunked map-reduce summarization of large guidelines"""
+    
+    SECTIONS = [f'{i}. 섹션 {i}\n- 규칙 {i}-1 을 지킵니다\n- 규칙 {i}-2 를 지킵니다' for i in range(1, 7)]
+    
+    def setUp(self):
+        cache.clear()
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+        patcher = patch('jobs.services.gpt_service.openai.Model.retrieve')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_chunks_follow_section_boundaries_within_budget(self):
+        """Test chunks never split a section that fits in the budget"""
+        chunks = chunk_document('\n'.join(self.SECTIONS), max_tokens=60)
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 60)
+            self.assertRegex(chunk, r'^\d+\. 섹션')
+        self.assertEqual(sum(chunk.count('섹션') for chunk in chunks), len(self.SECTIONS))
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    def test_large_guideline_is_summarized_per_chunk_then_reduced(self, mock_create):
+        """Test one call per chunk plus a reduce call in the existing schema"""
+        mock_create.return_value = make_completion(
+            '{"title": "T", "content": "C", "key_points": ["k"], "word_count": 0}'
+        )
+        text = '\n'.join(self.SECTIONS)
+        chunk_count = len(chunk_document(text, max_tokens=60))
+        
+        summary = get_gpt_service().generate_summary(text)
+        
+        self.assertEqual(mock_create.call_count, chunk_count + 1)
+        self.assertTrue({'title', 'content', 'key_points', 'word_count'} <= set(summary))
+        self.assertEqual(summary['word_count'], len(text.split()))
+        self.assertEqual(summary['_chunks'], chunk_count)
+
+
+class RateLimiterTest(TestCase):
+    """Test cluster-wide RPM/TPM token buckets"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_request_budget_is_enforced(self):
+        """Test calls beyond RPM are rejected with a retry delay"""
+        limiter = RateLimiter(rpm=2, tpm=100000, max_wait=1)
+        
+        self.assertEqual(limiter.acquire('gpt-test', 10), 0)
+        self.assertEqual(limiter.acquire('gpt-test', 10), 0)
+        with self.assertRaises(RateLimitExceeded) as ctx:
+            limiter.acquire('gpt-test', 10)
+        
+        self.assertGreater(ctx.exception.retry_after, 1)
+        self.assertEqual(get_metrics('rate_limiter')['rate_limiter.rescheduled'], 1)
+    
+    def test_token_budget_is_enforced(self):
+        """Test calls beyond TPM are rejected even when RPM allows them"""
+        limiter = RateLimiter(rpm=1000, tpm=1000, max_wait=0)
+        
+        limiter.acquire('gpt-test', 600)
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire('gpt-test', 600)
+    
+    @override_settings(OPENAI_API_KEY='sk-test-key', GPT_RETRY_BASE_DELAY=0)
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_each_retry_draws_its_own_budget(self, mock_retrieve, mock_create):
+        """Test a retried call acquires rate-limit budget once per upstream attempt"""
+        mock_create.side_effect = [
+            openai.error.Timeout('timed out'),
+            openai.error.APIError('bad gateway'),
+            make_completion(json.dumps({'title': 'T', 'content': 'C', 'key_points': [], 'word_count': 1})),
+        ]
+        
+        with patch.object(RateLimiter, 'acquire', return_value=0) as mock_acquire:
+            GPTService().generate_summary('budget per attempt')
+        
+        self.assertEqual(mock_create.call_count, 3)
+        self.assertEqual(mock_acquire.call_count, 3)
+    
+    @patch('jobs.tasks.get_gpt_service')
+    def test_rate_limited_job_is_rescheduled(self, mock_get_service):
+        """Test a rate-limited job goes back to pending instead of using dummy data"""
+        mock_get_service.return_value.generate_summary.side_effect = RateLimitExceeded('limited', retry_after=5)
+        job = Job.objects.create(status='pending')
+        
+        with self.assertRaises(RateLimitExceeded):
+            run_job_steps(str(job.event_id))
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_RETRY_BASE_DELAY=0, GPT_CIRCUIT_FAILURE_THRESHOLD=2)
+class CircuitBreakerTest(TestCase):
+    """Test GPT call retries and the shared circuit breaker"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_breaker_opens_and_half_open_probe_closes_it(self):
+        """Test open → fail fast → single half-open probe → closed"""
+        breaker = CircuitBreaker('test', failure_threshold=2, cooldown=30)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        
+        self.assertTrue(breaker.is_open())
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        
+        # cooldown 경과 시뮬레이션
+        get_redis().delete('circuit:test:open')
+        breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()  # 시험 호출은 하나만
+        breaker.record_success()
+        breaker.before_call()
+        self.assertEqual(get_metrics('circuit_breaker')['circuit_breaker.opened'], 1)
+    
+    def test_successes_do_not_reset_the_failure_window(self):
+        """Test interleaved successes still open the breaker and half-open state expires"""
+        breaker = CircuitBreaker('flaky', failure_threshold=3, failure_window=60, cooldown=30)
+        for _ in range(3):
+            breaker.record_failure()
+            breaker.record_success()
+        
+        self.assertTrue(breaker.is_open())
+        redis = get_redis()
+        self.assertTrue(0 < redis.ttl('circuit:flaky:half_open') <= 90)
+        self.assertFalse(redis.exists('circuit:flaky:failures'))
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_transient_error_is_retried(self, mock_retrieve, mock_create):
+        """Test a timeout is retried with backoff instead of returning dummy data"""
+        mock_create.side_effect = [
+            openai.error.Timeout('timed out'),
+            make_completion(json.dumps({'title': 'T', 'content': 'C', 'key_points': [], 'word_count': 1})),
+        ]
+        
+        summary = GPTService().generate_summary('retry me')
+        
+        self.assertEqual(summary['title'], 'T')
+        self.assertEqual(mock_create.call_count, 2)
+        self.assertEqual(mock_create.call_args.kwargs['request_timeout'], 30)
+        self.assertEqual(get_metrics('gpt')['gpt.retries'], 1)
+    
+    @override_settings(GPT_MODEL_CANDIDATES=['gpt-4o-mini'])
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_repeated_outage_opens_breaker_and_fails_fast(self, mock_retrieve, mock_create):
+        """Test each failed attempt counts toward the breaker and later calls skip the API"""
+        mock_create.side_effect = openai.error.ServiceUnavailableError('down')
+        service = GPTService()
+        
+        # 임계치 2: 첫 호출의 두 번째 시도 실패로 열리고 세 번째 시도는 보내지 않음
+        with self.assertRaises(CircuitOpenError):
+            service.generate_summary('outage 1')
+        self.assertEqual(mock_create.call_count, 2)
+        
+        with self.assertRaises(CircuitOpenError):
+            service.generate_summary('outage 2')
+        self.assertEqual(mock_create.call_count, 2)
+    
+    @override_settings(GPT_MODEL_CANDIDATES=['gpt-4o-mini'], GPT_CIRCUIT_FAILURE_THRESHOLD=5)
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_exhausted_retries_count_every_attempt(self, mock_retrieve, mock_create):
+        """Test a call that fails all retries records one breaker failure per upstream attempt"""
+        mock_create.side_effect = openai.error.ServiceUnavailableError('down')
+        
+        with self.assertRaises(GPTUnavailable):
+            GPTService().generate_summary('outage')
+        
+        self.assertEqual(mock_create.call_count, 3)
+        self.assertEqual(int(get_redis().get('circuit:openai:gpt-4o-mini:failures')), 3)
+    
+    @patch('jobs.tasks.get_gpt_service')
+    def test_unavailable_job_is_rescheduled(self, mock_get_service):
+        """Test a GPT outage puts the job back to pending"""
+        mock_get_service.return_value.generate_summary.side_effect = GPTUnavailable('down', retry_after=30)
+        job = Job.objects.create(status='pending')
+        
+        with self.assertRaises(GPTUnavailable):
+            run_job_steps(str(job.event_id))
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key')
+class StructuredOutputTest(TestCase):
+    """Test schema-driven output parsing, repair and step re-requests"""
+    
+    SUMMARY = {'title': 'T', 'content': 'C', 'key_points': ['a'], 'word_count': 3}
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_truncated_and_malformed_json_is_repaired(self):
+        """Test code fences, trailing commas and truncation are tolerated"""
+        data, repaired = parse_output('```json\n{"title": "T", "key_points": ["a", "b",],}\n```')
+        self.assertEqual(data, {'title': 'T', 'key_points': ['a', 'b']})
+        self.assertTrue(repaired)
+        
+        data, repaired = parse_output('{"categories": [{"name": "보안", "items": [{"id": 1, "text": "HTTPS?", "requ')
+        self.assertEqual(data, {'categories': [{'name': '보안', 'items': [{'id': 1, 'text': 'HTTPS?'}]}]})
+        
+        with self.assertRaises(OutputParseError):
+            parse_output('요약할 수 없습니다.')
+    
+    def test_checklist_is_validated_and_counts_are_derived(self):
+        """Test schema errors are reported and item counts come from the items"""
+        checklist = validate_output('checklist', {'categories': [{'name': 'A', 'items': [
+            {'id': 1, 'text': 'x?', 'required': True},
+            {'id': 2, 'text': 'y?', 'required': False},
+        ]}], 'total_items': 99})
+        self.assertEqual((checklist['total_items'], checklist['required_items']), (2, 1))
+        
+        with self.assertRaises(SchemaValidationError):
+            validate_output('checklist', {'categories': [{'name': 'A', 'items': [{'id': 1}]}]})
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_function_call_arguments_are_used(self, mock_retrieve, mock_create):
+        """Test the step schema is sent as a forced function call"""
+        mock_create.return_value = make_completion(arguments=json.dumps(self.SUMMARY))
+        
+        summary = GPTService().generate_summary('function call')
+        
+        self.assertEqual(summary['title'], 'T')
+        kwargs = mock_create.call_args.kwargs
+        self.assertEqual(kwargs['function_call'], {'name': 'submit_summary'})
+        self.assertEqual(kwargs['functions'][0]['parameters']['required'], ['title', 'content', 'key_points'])
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_only_failing_step_is_requested_again(self, mock_retrieve, mock_create):
+        """Test a schema failure re-requests the step with a stricter prompt"""
+        mock_create.side_effect = [
+            make_completion(json.dumps({'title': 'T'})),
+            make_completion(json.dumps(self.SUMMARY)),
+        ]
+        
+        summary = GPTService().generate_summary('bad first answer')
+        
+        self.assertEqual(summary['_source'], 'openai_gpt')
+        retry = mock_create.call_args_list[1].kwargs
+        self.assertEqual(retry['temperature'], 0)
+        self.assertIn('스키마', retry['messages'][-1]['content'])
+        metrics_ = get_metrics('gpt_output')
+        self.assertEqual(metrics_['gpt_output.failures'], 1)
+        self.assertEqual(metrics_['gpt_output.recalls'], 1)
+        self.assertEqual(metrics_['gpt_output.responses'], 2)
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key')
+class FusedPipelineTest(APITestCase):
+    """Test the single-call summary+checklist mode"""
+    
+    FUSED = {
+        'title': 'T', 'content': 'C', 'key_points': ['a'], 'word_count': 3,
+        'categories': [{'name': '보안', 'items': [{'id': 1, 'text': 'HTTPS?', 'required': True}]}],
+    }
+    
+    def setUp(self):
+        cache.clear()
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_mode_is_selected_per_job(self, mock_task):
+        """Test mode is stored on the job and invalid modes are rejected"""
+        response = self.client.post('/api/jobs', {'mode': 'fused'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Job.objects.get(event_id=response.data['event_id']).get_pipeline_mode(), 'fused')
+        
+        response = self.client.post('/api/jobs', {'mode': 'three_step'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_fused_call_keeps_two_step_result_shape(self, mock_retrieve, mock_create):
+        """Test one completion yields separate summary and checklist"""
+        mock_create.return_value = make_completion(arguments=json.dumps(self.FUSED, ensure_ascii=False))
+        
+        result = GPTService().generate_fused('fused guideline')
+        
+        mock_create.assert_called_once()
+        self.assertEqual(mock_create.call_args.kwargs['function_call'], {'name': 'submit_fused'})
+        self.assertEqual(result['summary']['key_points'], ['a'])
+        self.assertNotIn('categories', result['summary'])
+        self.assertEqual(result['checklist']['total_items'], 1)
+        self.assertEqual(result['checklist']['_source'], 'openai_gpt')
+    
+    @override_settings(GPT_PIPELINE_MODE='fused')
+    @patch('jobs.tasks.get_gpt_service')
+    def test_configured_mode_is_used_by_task(self, mock_get_service):
+        """Test the task makes a single fused call and stores the usual result"""
+        service = mock_get_service.return_value
+        service.generate_fused.return_value = {'summary': {'title': 'T'}, 'checklist': {'categories': []}}
+        job = Job.objects.create(status='pending')
+        
+        run_job_steps(str(job.event_id))
+        
+        service.generate_summary.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.result['steps_completed'], ['summary_generated', 'checklist_generated'])
+        self.assertEqual(job.result['checklist'], {'categories': []})
+
+
+@override_settings(GPT_SIMILARITY_THRESHOLD=0.8)
+class SimilarityIndexTest(TestCase):
+    """Test near-duplicate guideline detection and result reuse"""
+    
+    EDITED = DEFAULT_GUIDELINE_TEXT.replace('1. 코드 품질 관리', '가. 코드 품질 관리').replace('80%', '85%')
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_near_duplicates_match_and_unrelated_text_does_not(self):
+        """Test renumbered/edited text matches above the threshold"""
+        index = SimilarityIndex()
+        index.add('job-1', DEFAULT_GUIDELINE_TEXT)
+        
+        match = index.lookup(self.EDITED)
+        self.assertEqual(match.doc_id, 'job-1')
+        self.assertGreaterEqual(match.similarity, 0.8)
+        self.assertIsNone(index.lookup('파스타 조리 가이드: 물을 끓이고 소금을 넣은 뒤 면을 8분간 삶습니다.'))
+        
+        index.remove('job-1')
+        self.assertIsNone(index.lookup(self.EDITED))
+    
+    def test_completed_result_is_reused_for_similar_text(self):
+        """Test a similar guideline reuses the stored Job.result without GPT calls"""
+        source = Job.objects.create(status='completed', result={
+            'summary': {'title': 'T', 'word_count': 1, '_source': 'openai_gpt'},
+            'checklist': {'categories': [], '_source': 'openai_gpt'},
+        })
+        index_guideline(source.event_id, DEFAULT_GUIDELINE_TEXT, source.result)
+        
+        job = Job.objects.create(status='pending', guideline_text=self.EDITED)
+        
+        with patch('jobs.tasks.get_gpt_service') as mock_get_service:
+            generate_summary_step(str(job.event_id))
+        flush_job_states()
+        
+        mock_get_service.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.result['reused_from'], str(source.event_id))
+        self.assertEqual(job.result['summary']['word_count'], len(self.EDITED.split()))
+        self.assertEqual(get_metrics('similarity')['similarity.hit'], 1)
+    
+    def test_dummy_results_are_not_indexed(self):
+        """Test fallback results never become reuse candidates"""
+        result = {'summary': {'_source': 'fallback_dummy'}, 'checklist': {'_source': 'fallback_dummy'}}
+        index_guideline(uuid.uuid4(), DEFAULT_GUIDELINE_TEXT, result)
+        
+        self.assertIsNone(find_similar_result(DEFAULT_GUIDELINE_TEXT))
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_STREAMING_ENABLED=False)
+class IncrementalRevisionTest(TestCase):
+    """Test section-diff re-processing of revised guidelines"""
+    
+    V2 = DEFAULT_GUIDELINE_TEXT.replace('최소 80% 이상을', '최소 90% 이상을')
+    PREVIOUS = {
+        'summary': {'title': 'T', 'content': 'C', 'key_points': ['80%'], 'word_count': 1, '_source': 'openai_gpt'},
+        'checklist': {'categories': [
+            {'name': '코드 품질', 'items': [{'id': 1, 'text': '리뷰?', 'required': True}]},
+            {'name': '테스팅', 'items': [{'id': 2, 'text': '80%?', 'required': True}]},
+            {'name': '보안', 'items': [{'id': 3, 'text': 'HTTPS?', 'required': True}]},
+        ], 'total_items': 3, 'required_items': 3, '_source': 'openai_gpt'},
+    }
+    
+    def setUp(self):
+        cache.clear()
+        self.previous = Job.objects.create(status='completed', guideline_text=DEFAULT_GUIDELINE_TEXT, result=self.PREVIOUS)
+    
+    def test_only_changed_sections_are_reported(self):
+        """Test whitespace-insensitive section diff"""
+        diff = diff_sections(DEFAULT_GUIDELINE_TEXT, self.V2 + '\n5. 운영\n- 장애 대응 절차를 문서화합니다\n')
+        
+        self.assertEqual([change.kind for change in diff.changes], ['modified', 'added'])
+        self.assertIn('90%', diff.changes[0].new)
+        self.assertEqual(diff_sections(DEFAULT_GUIDELINE_TEXT, '  ' + DEFAULT_GUIDELINE_TEXT).changes, [])
+    
+    def test_touched_categories_are_replaced_and_rest_kept(self):
+        """Test revision merge replaces, adds and removes categories by name"""
+        merged = merge_revision(self.PREVIOUS, {
+            'title': 'T2', 'content': 'C2', 'key_points': ['90%'],
+            'categories': [
+                {'name': '테스팅', 'items': [{'id': 1, 'text': '90%?', 'required': True}]},
+                {'name': '운영', 'items': [{'id': 1, 'text': '장애 대응?', 'required': False}]},
+            ],
+            'removed_categories': ['보안'],
+        }, self.V2)
+        
+        categories = merged['checklist']['categories']
+        self.assertEqual([c['name'] for c in categories], ['코드 품질', '테스팅', '운영'])
+        self.assertEqual(categories[1]['items'][0]['text'], '90%?')
+        self.assertEqual([item['id'] for c in categories for item in c['items']], [1, 2, 3])
+        self.assertEqual((merged['checklist']['total_items'], merged['checklist']['required_items']), (3, 2))
+        self.assertEqual(merged['summary']['title'], 'T2')
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_revision_job_sends_only_the_edit(self, mock_retrieve, mock_create):
+        """Test a v2 job makes one call containing only the changed section"""
+        reset_gpt_service()
+        self.addCleanup(reset_gpt_service)
+        mock_create.return_value = make_completion(arguments=json.dumps({
+            'title': 'T', 'content': 'C', 'key_points': ['90%'],
+            'categories': [{'name': '테스팅', 'items': [{'id': 1, 'text': '90%?', 'required': True}]}],
+        }, ensure_ascii=False))
+        job = Job.objects.create(status='pending', guideline_text=self.V2, previous_job=self.previous)
+        
+        run_job_steps(str(job.event_id))
+        
+        mock_create.assert_called_once()
+        prompt = mock_create.call_args.kwargs['messages'][-1]['content']
+        self.assertIn('90%', prompt)
+        self.assertNotIn('HTTPS를 필수로', prompt)
+        job.refresh_from_db()
+        self.assertEqual(job.result['revision_of'], str(self.previous.event_id))
+        self.assertEqual(job.result['changed_sections'], 1)
+        self.assertEqual(len(job.result['checklist']['categories']), 3)
+    
+    @patch('jobs.tasks.get_gpt_service')
+    def test_unchanged_revision_makes_no_calls(self, mock_get_service):
+        """Test resubmitting the same document reuses the previous result"""
+        job = Job.objects.create(status='pending', guideline_text=DEFAULT_GUIDELINE_TEXT, previous_job=self.previous)
+        
+        run_job_steps(str(job.event_id))
+        
+        mock_get_service.return_value.generate_summary.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.result['checklist'], self.PREVIOUS['checklist'])
+        self.assertEqual(job.result['changed_sections'], 0)
+
+
+@override_settings(OPENAI_API_KEY='sk-test-key', GPT_HEDGE_MIN_SAMPLES=5)
+class ModelRoutingTest(TestCase):
+    """Test latency-aware model routing and hedged requests"""
+    
+    CHECKLIST = {'categories': [{'name': 'A', 'items': [{'id': 1, 'text': 'x?', 'required': True}]}]}
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_route_uses_context_window_and_observed_latency(self):
+        """Test oversized requests skip small-context models and faster models are preferred"""
+        router = ModelRouter()
+        models = ['gpt-4o-mini', 'gpt-3.5-turbo']
+        
+        self.assertEqual(router.route(models, 'checklist', 1000), models)
+        self.assertEqual(router.route(models, 'checklist', 50000), ['gpt-4o-mini'])
+        
+        for _ in range(5):
+            router.record('gpt-4o-mini', 'checklist', 4.0)
+            router.record('gpt-3.5-turbo', 'checklist', 1.0)
+        self.assertEqual(router.route(models, 'checklist', 1000), ['gpt-3.5-turbo', 'gpt-4o-mini'])
+        self.assertEqual(router.hedge_delay('gpt-4o-mini', 'checklist'), 4.0)
+        self.assertIsNone(router.hedge_delay('gpt-4o-mini', 'summary'))
+    
+    def _slow_primary_service(self):
+        service = GPTService()
+        for _ in range(5):
+            service.router.record('gpt-4o-mini', 'checklist', 0.05)
+        return service
+    
+    @override_settings(GPT_HEDGE_SYNC_ENABLED=True)
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_slow_primary_is_hedged(self, mock_retrieve, mock_create):
+        """Test a duplicate goes to the second model after the primary's p95 and the first answer wins"""
+        def create(model, **kwargs):
+            if model == 'gpt-4o-mini':
+                time.sleep(0.5)
+            return make_completion(arguments=json.dumps(self.CHECKLIST))
+        mock_create.side_effect = create
+        
+        service = self._slow_primary_service()
+        checklist = service.generate_checklist({'title': 'hedge'})
+        
+        self.assertEqual(checklist['_model'], 'gpt-3.5-turbo')
+        self.assertEqual(get_metrics('gpt_hedge'), {'gpt_hedge.sent': 1, 'gpt_hedge.won': 1})
+        # 캐시 키는 주 모델 기준이므로 다른 모델의 응답은 저장하지 않음
+        self.assertIsNone(service.result_cache.get(service.build_checklist_step({'title': 'hedge'}).cache_key))
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.create')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_sync_path_does_not_hedge_by_default(self, mock_retrieve, mock_create):
+        """Test the sync path waits for the primary instead of paying for an uncancellable duplicate"""
+        def create(model, **kwargs):
+            time.sleep(0.2)
+            return make_completion(arguments=json.dumps(self.CHECKLIST))
+        mock_create.side_effect = create
+        
+        service = self._slow_primary_service()
+        checklist = service.generate_checklist({'title': 'no hedge'})
+        
+        self.assertEqual(checklist['_model'], 'gpt-4o-mini')
+        self.assertEqual(mock_create.call_count, 1)
+        self.assertEqual(get_metrics('gpt_hedge'), {})
+        self.assertIsNotNone(service.result_cache.get(service.build_checklist_step({'title': 'no hedge'}).cache_key))
+    
+    @patch('jobs.services.gpt_service.openai.ChatCompletion.acreate')
+    @patch('jobs.services.gpt_service.openai.Model.retrieve')
+    def test_async_hedge_cancels_the_slower_call(self, mock_retrieve, mock_acreate):
+        """Test the async path cancels the losing request"""
+        cancelled = []
+        
+        async def acreate(model, **kwargs):
+            if model == 'gpt-4o-mini':
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(model)
+                    raise
+            return make_completion(arguments=json.dumps(self.CHECKLIST))
+        mock_acreate.side_effect = acreate
+        
+        checklist = asyncio.run(self._slow_primary_service().agenerate_checklist({'title': 'async hedge'}))
+        
+        self.assertEqual(checklist['_model'], 'gpt-3.5-turbo')
+        self.assertEqual(cancelled, ['gpt-4o-mini'])
+
+
+def start_stub_server(test, **config):
+    """테스트용 stub 서버를 별도 스레드 이벤트 루프에서 실행하고 (서버, base URL) 반환"""
+    server = LLMStubServer(StubConfig(**config))
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server.build_app())
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    
+    def stop():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+    test.addCleanup(stop)
+    return server, f'http://127.0.0.1:{port}/v1'
+
+
+@override_settings(OPENAI_API_KEY='', LLM_BACKEND='stub', GPT_MODEL_CANDIDATES=['gpt-4o-mini'])
+class LLMStubBackendTest(TestCase):
+    """Test the pluggable backend against the local OpenAI-compatible stub server"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_summary_and_checklist_go_through_stub(self):
+        """Test both steps run over HTTP without an API key and return schema-valid output"""
+        server, url = start_stub_server(self, latency='fixed', latency_median=0, tokens_per_second=0)
+        
+        with self.settings(LLM_STUB_BASE_URL=url, GPT_STREAMING_ENABLED=False):
+            service = GPTService()
+            self.assertEqual(service.backend.name, 'stub')
+            self.assertFalse(service.use_fallback)
+            summary = service.generate_summary('stub 백엔드 요약 테스트')
+            checklist = service.generate_checklist(summary)
+        
+        self.assertEqual(summary['_source'], 'openai_gpt')
+        self.assertEqual(checklist['_source'], 'openai_gpt')
+        self.assertGreater(checklist['total_items'], 0)
+        self.assertEqual(server.stats['requests'], 2)
+    
+    def test_streamed_tokens_produce_partials(self):
+        """Test SSE streaming is parsed incrementally by the real client"""
+        server, url = start_stub_server(self, latency='fixed', latency_median=0, tokens_per_second=5000)
+        partials = []
+        
+        with self.settings(LLM_STUB_BASE_URL=url, GPT_STREAMING_ENABLED=True):
+            checklist = GPTService().generate_checklist({'title': 'stream'}, on_partial=partials.append)
+        
+        self.assertEqual(checklist['_source'], 'openai_gpt')
+        self.assertTrue(partials)
+        self.assertEqual(len(partials[-1]), len(checklist['categories']))
+    
+    def test_fault_injection_and_deterministic_content(self):
+        """Test 429 injection, identical answers for identical requests and broken JSON variants"""
+        server, url = start_stub_server(self, latency='fixed', latency_median=0, tokens_per_second=0,
+                                        rate_limit_rate=1.0, retry_after=2)
+        body = {'model': 'gpt-4o-mini', 'messages': [{'role': 'user', 'content': 'hi'}]}
+        response = requests.post(f'{url}/chat/completions', json=body, timeout=5)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '2')
+        
+        for kind, schema in OUTPUT_SCHEMAS.items():
+            first = sample_from_schema(schema, content_rng({'model': 'm', 'messages': [kind]}))
+            self.assertEqual(first, sample_from_schema(schema, content_rng({'model': 'm', 'messages': [kind]})))
+            validate_output(kind, first)
+        
+        rng = random.Random(0)
+        kinds = {corrupt_json('{"title": "T"}', rng)[0] for _ in range(40)}
+        self.assertEqual(kinds, set(MALFORMED_KINDS))
+
+
+class JobBatchAPITest(APITestCase):
+    """Test bulk job submission and batch status aggregation"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_batch_is_bulk_inserted_and_published_once(self, mock_publish):
+        """Test strings and objects are accepted and all tasks go to one grouped publish"""
+        previous = Job.objects.create(status='completed')
+        jobs = ['첫 번째 가이드라인', {'text': '두 번째', 'mode': 'two_step'}, {'previous_event_id': str(previous.event_id)}]
+        
+        response = self.client.post('/api/jobs/batch', {'jobs': jobs, 'mode': 'fused'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 3)
+        created = {str(job.event_id): job for job in Job.objects.filter(batch_id=response.data['batch_id'])}
+        self.assertEqual(set(created), set(response.data['event_ids']))
+        first, second, third = (created[event_id] for event_id in response.data['event_ids'])
+        self.assertEqual((first.guideline_text, first.pipeline_mode), ('첫 번째 가이드라인', 'fused'))
+        self.assertEqual(second.pipeline_mode, 'two_step')
+        self.assertEqual(third.previous_job, previous)
+        
+        self.assertEqual(relay_outbox(), 3)
+        mock_publish.assert_called_once()
+        self.assertEqual(mock_publish.call_args.args[1], [[event_id] for event_id in response.data['event_ids']])
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_invalid_item_rejects_whole_batch(self, mock_publish):
+        """Test the first bad item is reported and nothing is created"""
+        response = self.client.post('/api/jobs/batch', {'jobs': ['ok', {'mode': 'three_step'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('jobs[1]', response.data['error'])
+        
+        response = self.client.post('/api/jobs/batch', {'jobs': [{'previous_event_id': str(uuid.uuid4())}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        self.assertEqual(Job.objects.count(), 0)
+        mock_publish.assert_not_called()
+    
+    def test_batch_status_counts_in_one_query(self):
+        """Test counts by status come from a single grouped query"""
+        batch_id = uuid.uuid4()
+        Job.objects.bulk_create([Job(batch_id=batch_id, status=s) for s in ['pending', 'completed', 'completed', 'failed']])
+        Job.objects.create(status='pending')
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/jobs/batch/{batch_id}')
+        
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['counts'], {'pending': 1, 'processing': 0, 'completed': 2, 'failed': 1})
+        self.assertFalse(response.data['is_completed'])
+        self.assertEqual(self.client.get(f'/api/jobs/batch/{uuid.uuid4()}').status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_publish_reuses_one_producer_for_decodable_messages(self):
+        """Test a batch is published over one producer as messages a Celery worker can decode"""
+        from jobs.tasks import process_guideline_job
+        app = process_guideline_job.app
+        
+        with Connection('memory://') as conn:
+            queue = conn.SimpleQueue('celery')
+            producers = []
+            
+            @contextmanager
+            def producer_or_acquire(producer=None):
+                if producer is None:
+                    producer = app.amqp.Producer(conn.default_channel)
+                    producers.append(producer)
+                yield producer
+            
+            with patch.object(app, 'producer_or_acquire', producer_or_acquire):
+                self.assertEqual(publish_tasks(process_guideline_job, [['a'], ['b'], ['c']]), 3)
+            
+            self.assertEqual(len(producers), 1)
+            messages = [queue.get(timeout=1) for _ in range(3)]
+            self.assertEqual([message.headers['task'] for message in messages], ['jobs.tasks.process_guideline_job'] * 3)
+            self.assertTrue(messages[0].headers['ignore_result'])
+            self.assertEqual([message.decode()[0] for message in messages], [['a'], ['b'], ['c']])
+            queue.close()
+
+
+class JobStepChainTest(TestCase):
+    """Test the per-step Celery chain and checkpoint/resume"""
+    
+    def test_steps_are_chained_on_separate_queues(self):
+        """Test the chain order and that each step is routed to its own queue"""
+        from avo_api.celery import app
+        
+        names = [signature.task for signature in build_job_chain('event').tasks]
+        
+        self.assertEqual(names, ['jobs.tasks.generate_summary_step', 'jobs.tasks.generate_checklist_step'])
+        queues = [app.amqp.router.route({}, name)['queue'].name for name in names]
+        self.assertEqual(queues, ['guideline_summary', 'guideline_checklist'])
+    
+    @patch('jobs.tasks.build_job_chain')
+    def test_start_task_publishes_chain_once(self, mock_chain):
+        """Test the entry task only publishes the chain, and not for finished jobs"""
+        job = Job.objects.create(status='pending')
+        done = Job.objects.create(status='completed')
+        
+        process_guideline_job(str(job.event_id))
+        process_guideline_job(str(done.event_id))
+        
+        mock_chain.assert_called_once_with(str(job.event_id))
+        mock_chain.return_value.apply_async.assert_called_once()
+    
+    @patch('jobs.tasks.get_gpt_service')
+    def test_redelivered_steps_resume_from_checkpoint(self, mock_get_service):
+        """Test a saved summary is not regenerated and a finished step is skipped"""
+        service = mock_get_service.return_value
+        service.generate_checklist.return_value = {'categories': []}
+        job = Job.objects.create(status='processing', result={
+            'summary': {'title': 'saved'}, 'steps_completed': ['summary_generated'],
+        })
+        
+        run_job_steps(str(job.event_id))
+        run_job_steps(str(job.event_id))
+        
+        service.generate_summary.assert_not_called()
+        service.generate_checklist.assert_called_once()
+        self.assertEqual(service.generate_checklist.call_args.args[0], {'title': 'saved'})
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.result['steps_completed'], ['summary_generated', 'checklist_generated'])
+
+
+class FairSchedulerTest(APITestCase):
+    """Test priority levels and weighted fair sharing between tenants"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def submit(self, scheduler, tenant, priority, count):
+        event_ids = [f'{tenant}-{priority}-{index}' for index in range(count)]
+        scheduler.submit((event_id, tenant, priority) for event_id in event_ids)
+        return event_ids
+    
+    def test_tenants_share_by_weight_and_priorities_are_strict(self):
+        """Test a 3:1 weight splits slots 3:1 and later high-priority jobs go first"""
+        scheduler = FairScheduler(weights={'web': 3, 'backfill': 1})
+        self.submit(scheduler, 'backfill', 'normal', 20)
+        self.submit(scheduler, 'web', 'normal', 20)
+        
+        tenants = [job.tenant for job in scheduler.release(limit=8)]
+        self.assertEqual((tenants.count('web'), tenants.count('backfill')), (6, 2))
+        
+        urgent = self.submit(scheduler, 'backfill', 'high', 2)
+        self.assertEqual([job.event_id for job in scheduler.release(limit=2)], urgent)
+    
+    def test_idle_tenant_does_not_bank_credit(self):
+        """Test a tenant joining late starts at the current virtual time"""
+        scheduler = FairScheduler()
+        self.submit(scheduler, 'a', 'normal', 20)
+        scheduler.release(limit=10)
+        self.submit(scheduler, 'b', 'normal', 10)
+        
+        tenants = [job.tenant for job in scheduler.release(limit=4)]
+        self.assertEqual(tenants.count('b'), 2)
+    
+    def test_tenant_missing_from_keys_waits_for_next_release(self):
+        """Test a tenant that joined after the key list was read is left queued until the next release"""
+        scheduler = FairScheduler()
+        event_ids = self.submit(scheduler, 'late', 'normal', 2)
+        
+        with patch.object(scheduler._redis, 'smembers', return_value=set()):
+            self.assertEqual(scheduler.release(), [])
+        self.assertEqual([job.event_id for job in scheduler.release()], event_ids)
+    
+    def test_in_flight_cap_and_stats(self):
+        """Test only max_in_flight jobs are released until slots are returned"""
+        scheduler = FairScheduler(max_in_flight=2)
+        event_ids = self.submit(scheduler, 'web', 'normal', 5)
+        
+        self.assertEqual([job.event_id for job in scheduler.release()], event_ids[:2])
+        self.assertEqual(scheduler.release(), [])
+        self.assertTrue(scheduler.finish(event_ids[0]))
+        self.assertFalse(scheduler.finish(event_ids[0]))
+        self.assertEqual([job.event_id for job in scheduler.release()], event_ids[2:3])
+        
+        stats = scheduler.stats()
+        self.assertEqual((stats['in_flight'], stats['max_in_flight']), (2, 2))
+        self.assertEqual(stats['tenants']['web']['normal']['queued'], 2)
+        self.assertEqual(stats['tenants']['web']['normal']['samples'], 3)
+        self.assertIsNotNone(stats['tenants']['web']['normal']['wait_p95'])
+    
+    def test_drained_tenant_leaves_the_tenant_set(self):
+        """Test a tenant is dropped from the release key list once all its queues are empty"""
+        scheduler = FairScheduler()
+        self.submit(scheduler, 'once', 'normal', 1)
+        self.submit(scheduler, 'once', 'low', 1)
+        
+        scheduler.release(limit=1)
+        self.assertEqual(get_redis().smembers(scheduler.tenants_key), {b'once'})
+        scheduler.release(limit=1)
+        self.assertEqual(get_redis().smembers(scheduler.tenants_key), set())
+        
+        self.submit(scheduler, 'once', 'high', 1)
+        self.assertEqual(len(scheduler.release()), 1)
+    
+    @patch('jobs.tasks.publish_tasks', side_effect=ConnectionError('broker down'))
+    def test_publish_failure_requeues_released_jobs(self, mock_publish):
+        """Test jobs released for a failed publish go back to the head of their queue and free their slots"""
+        scheduler = FairScheduler(max_in_flight=2)
+        event_ids = self.submit(scheduler, 'web', 'normal', 3)
+        
+        with self.assertRaises(ConnectionError):
+            dispatch_ready_jobs()
+        
+        self.assertEqual(get_redis().zcard(scheduler.running_key), 0)
+        self.assertEqual([job.event_id for job in scheduler.release()], event_ids[:2])
+    
+    @override_settings(JOB_SCHEDULER_MAX_IN_FLIGHT=1, JOB_TENANT_WEIGHTS={'web': 4, 'backfill': 1})
+    @patch('jobs.tasks.publish_tasks')
+    def test_api_jobs_wait_for_a_free_slot(self, mock_publish):
+        """Test tenant/priority come from the request and a finished job releases the next one"""
+        first = self.client.post('/api/jobs', {'priority': 'high'}, format='json', HTTP_X_TENANT_ID='web')
+        batch = self.client.post('/api/jobs/batch', {'jobs': ['백필']}, format='json', HTTP_X_TENANT_ID='backfill')
+        
+        job = Job.objects.get(event_id=first.data['event_id'])
+        self.assertEqual((job.tenant, job.priority), ('web', 'high'))
+        backfill = Job.objects.get(event_id=batch.data['event_ids'][0])
+        self.assertEqual((backfill.tenant, backfill.priority), ('backfill', 'low'))
+        relay_outbox()
+        mock_publish.assert_called_once_with(process_guideline_job, [[str(job.event_id)]])
+        
+        mark_job_failed(str(job.event_id), RuntimeError('boom'))
+        mock_publish.assert_called_with(process_guideline_job, [[str(backfill.event_id)]])
+        
+        stats = self.client.get('/api/scheduler/stats').data
+        self.assertEqual(stats['tenants']['backfill']['low']['samples'], 1)
+        invalid = self.client.post('/api/jobs', {'priority': 'urgent'}, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        unknown = self.client.post('/api/jobs', {}, format='json', HTTP_X_TENANT_ID='someone-else')
+        self.assertEqual(unknown.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(JOB_STATE_WRITE_BEHIND=True)
+class JobStateWriteBehindTest(APITestCase):
+    """Test transient job state lives in Redis and only finished states reach Postgres"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_repeated_enqueue_keeps_the_worker_state(self, mock_publish):
+        """Test a relay retry re-initialising state does not reset a job a worker already picked up"""
+        job = Job.objects.create(status='pending')
+        enqueue_jobs([job])
+        set_job_state(str(job.event_id), status='processing')
+        
+        enqueue_jobs([job])
+        
+        self.assertEqual(self.client.get(f'/api/jobs/{job.event_id}').data['status'], 'processing')
+    
+    @patch('jobs.tasks.publish_tasks')
+    @patch('jobs.tasks.get_gpt_service')
+    def test_progress_is_served_from_redis_and_flushed_once(self, mock_get_service, mock_publish):
+        """Test the steps write no rows, status polls skip Postgres and the flush is one narrow UPDATE"""
+        service = mock_get_service.return_value
+        service.generate_summary.return_value = {'title': 'T'}
+        service.generate_checklist.return_value = {'categories': []}
+        event_id = self.client.post('/api/jobs', {}, format='json').data['event_id']
+        relay_outbox()
+        
+        with CaptureQueriesContext(connection) as queries:
+            generate_summary_step(event_id)
+            with self.assertNumQueries(0):
+                progress = self.client.get(f'/api/jobs/{event_id}').data
+            generate_checklist_step(event_id)
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('UPDATE')])
+        self.assertEqual(progress['status'], 'processing')
+        self.assertEqual(progress['progress']['steps_completed'], ['summary_generated'])
+        self.assertEqual(self.client.get(f'/api/jobs/{event_id}').json()['result']['checklist'], {'categories': []})
+        self.assertEqual(Job.objects.get(event_id=event_id).status, 'pending')
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush_job_states(), 1)
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('guideline_text', updates[0])
+        job = Job.objects.get(event_id=event_id)
+        self.assertEqual((job.status, job.result['checklist']), ('completed', {'categories': []}))
+        self.assertEqual(flush_job_states(), 0)
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_batch_status_counts_redis_states(self, mock_publish):
+        """Test running and unflushed finished jobs are counted by their Redis state, not as pending"""
+        response = self.client.post('/api/jobs/batch', {'jobs': ['a', 'b', 'c']}, format='json')
+        running, finished, waiting = response.data['event_ids']
+        set_job_state(running, status='processing')
+        finish_job_state(finished, status='completed', result={})
+        
+        counts = self.client.get(f"/api/jobs/batch/{response.data['batch_id']}").data['counts']
+        
+        self.assertEqual(counts, {'pending': 1, 'processing': 1, 'completed': 1, 'failed': 0})
+    
+    @override_settings(JOB_STATE_WRITE_BEHIND=False)
+    @patch('jobs.tasks.get_gpt_service')
+    def test_disabled_write_behind_writes_through(self, mock_get_service):
+        """Test states go straight to Postgres when write-behind is off"""
+        mock_get_service.return_value.generate_summary.side_effect = RuntimeError('boom')
+        job = Job.objects.create(status='pending')
+        
+        with self.assertRaises(RuntimeError):
+            generate_summary_step(str(job.event_id))
+        
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result['error']), ('failed', 'boom'))
+
+
+class PostgresJobQueueTest(APITestCase):
+    """Test claiming Job rows directly (JOB_QUEUE_BACKEND=postgres)"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_claim_order_lease_and_recovery(self):
+        """Test priority-then-age order, delayed retries and expired lease recovery"""
+        old = Job.objects.create(status='pending')
+        delayed = Job.objects.create(status='pending', leased_until=timezone.now() + timedelta(minutes=5))
+        urgent = Job.objects.create(status='pending', priority='high')
+        
+        claimed = claim_jobs(5, lease=60)
+        
+        self.assertEqual([job.id for job in claimed], [urgent.id, old.id])
+        old.refresh_from_db()
+        self.assertEqual((old.status, old.attempts), ('processing', 1))
+        self.assertGreater(old.leased_until, timezone.now())
+        self.assertEqual(claim_jobs(5), [])
+        
+        Job.objects.filter(id=old.id).update(leased_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(requeue_expired_jobs(), 1)
+        self.assertEqual([job.id for job in claim_jobs(5)], [old.id])
+        self.assertEqual(Job.objects.get(id=delayed.id).status, 'pending')
+    
+    @override_settings(JOB_QUEUE_BACKEND='postgres')
+    @patch('jobs.tasks.publish_tasks')
+    @patch('jobs.tasks.get_gpt_service')
+    def test_claimed_jobs_run_without_broker(self, mock_get_service, mock_publish):
+        """Test API jobs are not published and claimed jobs store results or wait for a retry"""
+        service = mock_get_service.return_value
+        service.generate_summary.side_effect = [{'title': 'T'}, RateLimitExceeded('limited', retry_after=30)]
+        service.generate_checklist.return_value = {'categories': []}
+        first = self.client.post('/api/jobs', {'text': '첫 번째'}, format='json').data['event_id']
+        second = self.client.post('/api/jobs', {'text': '두 번째'}, format='json').data['event_id']
+        mock_publish.assert_not_called()
+        
+        for job in claim_jobs(2):
+            run_claimed_job(job)
+        
+        done = Job.objects.get(event_id=first)
+        self.assertEqual((done.status, done.result['checklist']), ('completed', {'categories': []}))
+        retried = Job.objects.get(event_id=second)
+        self.assertEqual(retried.status, 'pending')
+        self.assertGreater(retried.leased_until, timezone.now())
+        self.assertEqual(claim_jobs(2), [])
+    
+    def test_worker_drains_queue_within_concurrency(self):
+        """Test the worker loop hands every claimed job to the handler exactly once"""
+        jobs = [Job.objects.create(status='pending') for _ in range(7)]
+        handled, active, peak = [], [0], [0]
+        lock = threading.Lock()
+        
+        def handler(job):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+                handled.append(job.id)
+        
+        processed = PostgresJobWorker(concurrency=3, batch_size=2, poll_interval=0.05, handler=handler).run(
+            stop_when_idle=True
+        )
+        
+        self.assertEqual(processed, 7)
+        self.assertEqual(sorted(handled), sorted(job.id for job in jobs))
+        self.assertLessEqual(peak[0], 3)
+
+
+class JobOutboxTest(APITestCase):
+    """Test job dispatch goes through the transactional outbox and its relay"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    @patch('jobs.outbox.enqueue_jobs')
+    def test_request_skips_broker_and_relay_retries(self, mock_enqueue):
+        """Test POST only writes the outbox row and a failed publish is retried after backoff"""
+        mock_enqueue.side_effect = [ConnectionError('broker down'), None]
+        
+        response = self.client.post('/api/jobs', {}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        mock_enqueue.assert_not_called()
+        entry = JobOutbox.objects.get()
+        self.assertEqual(str(entry.job.event_id), response.data['event_id'])
+        
+        self.assertEqual(relay_outbox(), 1)
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn('broker down', entry.last_error)
+        self.assertGreater(entry.available_at, timezone.now())
+        self.assertEqual(relay_outbox(), 0)
+        
+        JobOutbox.objects.update(available_at=timezone.now())
+        self.assertEqual(relay_outbox(), 1)
+        self.assertFalse(JobOutbox.objects.exists())
+        self.assertEqual([job.event_id for job in mock_enqueue.call_args.args[0]], [entry.job.event_id])
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_relay_retry_after_partial_submit_does_not_duplicate(self, mock_publish):
+        """Test a submit that fails after queueing is retried by the relay without FIFO fallback or duplicates"""
+        submit = FairScheduler.submit
+        
+        def submit_then_fail(scheduler, jobs):
+            submit(scheduler, jobs)
+            raise RedisError('connection lost')
+        
+        event_id = self.client.post('/api/jobs', {}, format='json').data['event_id']
+        with patch.object(FairScheduler, 'submit', submit_then_fail):
+            relay_outbox()
+        mock_publish.assert_not_called()
+        self.assertEqual(JobOutbox.objects.get().attempts, 1)
+        
+        JobOutbox.objects.update(available_at=timezone.now())
+        relay_outbox()
+        
+        self.assertFalse(JobOutbox.objects.exists())
+        mock_publish.assert_called_once_with(process_guideline_job, [[event_id]])
+        self.assertEqual(FairScheduler().release(), [])
+    
+    @patch('jobs.tasks.publish_tasks', side_effect=[ConnectionError('broker down'), None])
+    def test_publish_failure_after_submit_completes_the_outbox_row(self, mock_publish):
+        """Test a queued job's outbox row is removed even if publishing fails, and the next dispatch sends it once"""
+        event_id = self.client.post('/api/jobs', {}, format='json').data['event_id']
+        
+        self.assertEqual(relay_outbox(), 1)
+        self.assertFalse(JobOutbox.objects.exists())
+        
+        self.assertEqual(dispatch_ready_jobs(), 1)
+        self.assertEqual(mock_publish.call_args_list[-1].args, (process_guideline_job, [[event_id]]))
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_relay_drains_in_batches(self, mock_publish):
+        """Test the relay loop publishes the backlog in batch-sized publishes"""
+        with override_settings(JOB_FAIR_SCHEDULING_ENABLED=False):
+            self.client.post('/api/jobs/batch', {'jobs': ['a', 'b', 'c', 'd', 'e']}, format='json')
+            relayed = OutboxRelay(batch_size=2, poll_interval=0.01).run(stop_when_empty=True)
+        
+        self.assertEqual(relayed, 5)
+        self.assertEqual([len(call.args[1]) for call in mock_publish.call_args_list], [2, 2, 1])
+        self.assertFalse(JobOutbox.objects.exists())
+    
+    @override_settings(JOB_DISPATCH_OUTBOX=False)
+    @patch('jobs.tasks.publish_tasks')
+    def test_disabled_outbox_publishes_after_commit(self, mock_publish):
+        """Test without the outbox the job is published once the request transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            event_id = self.client.post('/api/jobs', {}, format='json').data['event_id']
+        
+        self.assertFalse(JobOutbox.objects.exists())
+        mock_publish.assert_called_once_with(process_guideline_job, [[event_id]])
+
+
+@override_settings(JOB_TENANT_WEIGHTS={'web': 1, 'backfill': 1})
+class IdempotencyKeyTest(APITestCase):
+    """Test Idempotency-Key makes client retries of POST /api/jobs return the original job"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def post(self, key, tenant='web'):
+        return self.client.post('/api/jobs', {'text': '재시도'}, format='json',
+                                HTTP_IDEMPOTENCY_KEY=key, HTTP_X_TENANT_ID=tenant)
+    
+    def test_retries_return_the_original_job(self):
+        """Test a retry storm creates one job and one outbox row per unique key and tenant"""
+        first = self.post('order-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', first)
+        
+        with self.assertNumQueries(0):
+            retries = [self.post('order-1') for _ in range(5)]
+        self.assertEqual({response.data['event_id'] for response in retries}, {first.data['event_id']})
+        self.assertEqual(retries[0]['Idempotent-Replayed'], 'true')
+        
+        other_tenant = self.post('order-1', tenant='backfill')
+        self.assertNotEqual(other_tenant.data['event_id'], first.data['event_id'])
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(JobOutbox.objects.count(), 2)
+        
+        # Redis를 잃어도 Postgres 유니크 열로 같은 작업 반환
+        cache.clear()
+        self.assertEqual(self.post('order-1').data['event_id'], first.data['event_id'])
+        self.assertEqual(self.post(' ').status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @patch('jobs.views.find_idempotent_job')
+    def test_concurrent_duplicate_loses_on_unique_key(self, mock_find):
+        """Test a request that misses the lookup but hits the unique constraint returns the winner"""
+        winner = Job.objects.create(status='pending', tenant='web', idempotency_key='order-2')
+        mock_find.side_effect = [None, str(winner.event_id)]
+        
+        response = self.post('order-2')
+        
+        self.assertEqual(response.data['event_id'], str(winner.event_id))
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertFalse(JobOutbox.objects.exists())
+    
+    @override_settings(JOB_IDEMPOTENCY_TTL=60)
+    def test_key_is_reusable_after_retention(self):
+        """Test a key older than JOB_IDEMPOTENCY_TTL creates a new job and releases the old row"""
+        old = Job.objects.create(status='completed', tenant='web', idempotency_key='order-3',
+                                 created_at=timezone.now() - timedelta(minutes=5))
+        
+        response = self.post('order-3')
+        
+        self.assertNotEqual(response.data['event_id'], str(old.event_id))
+        old.refresh_from_db()
+        self.assertIsNone(old.idempotency_key)
+        self.assertEqual(Job.objects.get(idempotency_key='order-3').event_id, uuid.UUID(response.data['event_id']))
+
+
+
+def gzip_stream(text):
+    return io.BytesIO(gzip.compress(text.encode('utf-8')))
+
+
+class DocumentUploadTest(APITestCase):
+    """Test guideline documents are streamed into the content-addressed blob store"""
+    
+    DOCUMENT = '# 보안 가이드라인\n\n' + '모든 API 요청은 HTTPS를 사용해야 합니다.\n' * 2000
+    
+    def setUp(self):
+        cache.clear()
+        blob_root = tempfile.TemporaryDirectory()
+        self.addCleanup(blob_root.cleanup)
+        self.blob_root = blob_root.name
+        override = override_settings(JOB_BLOB_ROOT=self.blob_root, JOB_INLINE_TEXT_MAX_BYTES=1024)
+        override.enable()
+        self.addCleanup(override.disable)
+    
+    def stored_files(self):
+        return sorted(name for path, _, names in os.walk(self.blob_root) if not path.endswith('tmp') for name in names)
+    
+    def test_blob_store_deduplicates_and_rejects_bad_bodies(self):
+        """Test identical content is stored once and bad or oversized bodies leave nothing behind"""
+        store = BlobStore()
+        first = store.put_text(self.DOCUMENT)
+        second = store.put(gzip_stream(self.DOCUMENT), 'gzip')
+        
+        self.assertTrue(first.created)
+        self.assertEqual((second.sha256, second.size, second.created), (first.sha256, first.size, False))
+        self.assertEqual(self.stored_files(), [f'{first.sha256}.gz'])
+        self.assertEqual(store.read_text(first.sha256), self.DOCUMENT)
+        
+        with self.assertRaises(InvalidDocument):
+            store.put(gzip_stream('x'), 'br')
+        with self.assertRaises(InvalidDocument):
+            store.put(io.BytesIO(b'not gzip'), 'gzip')
+        with self.assertRaises(DocumentTooLarge):
+            BlobStore(max_bytes=100).put(gzip_stream(self.DOCUMENT), 'gzip')
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(os.listdir(os.path.join(self.blob_root, 'tmp')), [])
+    
+    @patch('jobs.tasks.get_gpt_service')
+    @patch('jobs.tasks.publish_tasks')
+    def test_compressed_body_and_upload_reference_one_blob(self, mock_publish, mock_get_service):
+        """Test raw gzip bodies and multipart uploads store the hash and the task reads the document"""
+        service = mock_get_service.return_value
+        service.generate_summary.return_value = {'title': 'T'}
+        service.generate_checklist.return_value = {'categories': []}
+        
+        raw = self.client.generic(
+            'POST', '/api/jobs?mode=two_step&priority=high', gzip.compress(self.DOCUMENT.encode('utf-8')),
+            content_type='text/markdown', HTTP_CONTENT_ENCODING='gzip',
+        )
+        upload = self.client.post('/api/jobs', {
+            'file': SimpleUploadedFile('guideline.md.gz', gzip.compress(self.DOCUMENT.encode('utf-8'))),
+            'mode': 'fused',
+        }, format='multipart')
+        
+        self.assertEqual(raw.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(upload.status_code, status.HTTP_201_CREATED)
+        raw_job = Job.objects.get(event_id=raw.data['event_id'])
+        upload_job = Job.objects.get(event_id=upload.data['event_id'])
+        self.assertEqual((raw_job.pipeline_mode, raw_job.priority, raw_job.guideline_text), ('two_step', 'high', None))
+        self.assertEqual(upload_job.pipeline_mode, 'fused')
+        self.assertEqual(raw_job.guideline_hash, upload_job.guideline_hash)
+        self.assertEqual(len(self.stored_files()), 1)
+        
+        run_job_steps(str(raw_job.event_id))
+        self.assertEqual(service.generate_summary.call_args.args[0], self.DOCUMENT)
+        
+        bad = self.client.generic('POST', '/api/jobs', b'not gzip', content_type='text/plain',
+                                  HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(JOB_DOCUMENT_MAX_BYTES=1000):
+            too_large = self.client.generic('POST', '/api/jobs', self.DOCUMENT.encode('utf-8'), content_type='text/plain')
+        self.assertEqual(too_large.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_only_large_json_text_goes_to_blob_store(self, mock_publish):
+        """Test short text stays inline while long text in single and batch requests is stored by hash"""
+        response = self.client.post('/api/jobs/batch', {'jobs': ['짧은 가이드라인', self.DOCUMENT]}, format='json')
+        short, long = (Job.objects.get(event_id=event_id) for event_id in response.data['event_ids'])
+        
+        self.assertEqual((short.guideline_text, short.guideline_hash), ('짧은 가이드라인', None))
+        self.assertIsNone(long.guideline_text)
+        self.assertEqual(long.get_guideline_text(), self.DOCUMENT)
+        
+        single = self.client.post('/api/jobs', {'text': self.DOCUMENT}, format='json')
+        self.assertEqual(Job.objects.get(event_id=single.data['event_id']).guideline_hash, long.guideline_hash)
+        self.assertEqual(len(self.stored_files()), 1)
+    
+    @skipUnless(zstandard, 'zstandard is not installed')
+    def test_zstd_bodies_are_decoded(self):
+        """Test zstd bodies store the same blob as the plain document and broken frames are rejected"""
+        store = BlobStore()
+        compressed = zstandard.ZstdCompressor().compress(self.DOCUMENT.encode('utf-8'))
+        
+        self.assertEqual(store.put(io.BytesIO(compressed), 'zstd').sha256, store.put_text(self.DOCUMENT).sha256)
+        with self.assertRaises(InvalidDocument):
+            store.put(io.BytesIO(compressed[:len(compressed) // 2] + b'broken'), 'zstd')
+    
+    @patch('jobs.services.blob_store.zstandard', None)
+    def test_zstd_without_zstandard_is_rejected(self):
+        """Test a zstd body is a bad request when the zstandard package is missing"""
+        response = self.client.generic('POST', '/api/jobs', b'\x28\xb5\x2f\xfd', content_type='text/plain',
+                                       HTTP_CONTENT_ENCODING='zstd')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_rejected_and_replayed_uploads_store_no_blob(self, mock_publish):
+        """Test documents of requests failing validation or replaying an Idempotency-Key are never stored"""
+        body = self.DOCUMENT.encode('utf-8')
+        missing = self.client.generic('POST', f'/api/jobs?previous_event_id={uuid.uuid4()}', body,
+                                      content_type='text/plain')
+        self.client.post('/api/jobs', {'text': '짧은 가이드라인'}, format='json', HTTP_IDEMPOTENCY_KEY='upload-1')
+        replayed = self.client.generic('POST', '/api/jobs', body, content_type='text/plain',
+                                       HTTP_IDEMPOTENCY_KEY='upload-1')
+        
+        self.assertEqual(missing.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(replayed['Idempotent-Replayed'], 'true')
+        del missing, replayed
+        gc.collect()
+        self.assertEqual(self.stored_files(), [])
+        self.assertEqual(os.listdir(os.path.join(self.blob_root, 'tmp')), [])
+    
+    @patch('jobs.tasks.publish_tasks')
+    def test_rejected_batch_stores_no_blob(self, mock_publish):
+        """Test a batch rejected by a later item leaves no blob behind"""
+        response = self.client.post('/api/jobs/batch', {'jobs': [self.DOCUMENT, {'mode': 'three_step'}]}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.stored_files(), [])
+
+
+class JobEventsTest(TestCase):
+    """Test long-poll and Server-Sent Events status reads woken by Redis pub/sub"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    async def test_long_poll_returns_when_job_changes(self):
+        """Test ?wait= blocks until a step publishes a change and returns at once when the status already differs"""
+        job = await Job.objects.acreate(status='processing')
+        url = f'/api/jobs/{job.event_id}'
+        
+        async def finish():
+            await asyncio.sleep(0.2)
+            await sync_to_async(finish_job_state)(job.event_id, status='completed', result={'checklist': {}})
+        
+        started = time.monotonic()
+        response, _ = await asyncio.gather(self.async_client.get(url, {'wait': 10}), finish())
+        
+        self.assertEqual(response.json()['status'], 'completed')
+        self.assertLess(time.monotonic() - started, 5)
+        started = time.monotonic()
+        self.assertEqual((await self.async_client.get(url, {'wait': 10, 'status': 'processing'})).json()['status'],
+                         'completed')
+        self.assertLess(time.monotonic() - started, 1)
+    
+    async def test_long_poll_times_out_and_validates(self):
+        """Test an unchanged job is returned after the wait and bad requests are rejected"""
+        job = await Job.objects.acreate(status='pending')
+        
+        started = time.monotonic()
+        response = await self.async_client.get(f'/api/jobs/{job.event_id}', {'wait': 0.2})
+        
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertEqual((await self.async_client.get(f'/api/jobs/{job.event_id}', {'wait': 'x'})).status_code, 400)
+        self.assertEqual((await self.async_client.get(f'/api/jobs/{uuid.uuid4()}', {'wait': 1})).status_code, 404)
+    
+    async def test_sse_streams_changes_until_finished(self):
+        """Test the event stream sends the current state, each change, and closes on completion"""
+        job = await Job.objects.acreate(status='processing')
+        response = await self.async_client.get(f'/api/jobs/{job.event_id}/events')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        
+        self.assertTrue((await anext(chunks)).decode().startswith('retry:'))
+        first = await anext(chunks)
+        await sync_to_async(set_job_state)(job.event_id, status='processing', result={'steps_completed': ['summary_generated']})
+        second = await anext(chunks)
+        await sync_to_async(finish_job_state)(job.event_id, status='completed', result={'checklist': {}})
+        rest = [chunk async for chunk in chunks]
+        
+        events = [json.loads(chunk.decode().split('data: ', 1)[1]) for chunk in [first, second, *rest]]
+        self.assertEqual([event['status'] for event in events], ['processing', 'processing', 'completed'])
+        self.assertEqual(events[1]['progress']['steps_completed'], ['summary_generated'])
+
+
+@asynccontextmanager
+async def webhook_receiver(status_code=200):
+    """테스트용 웹훅 수신 서버 (받은 요청의 (헤더, 본문, 클라이언트 포트) 기록)"""
+    received = []
+    
+    async def handle(request):
+        received.append((request.headers, await request.read(), request.transport.get_extra_info('peername')[1]))
+        return web.Response(status=status_code)
+    
+    app = web.Application()
+    app.router.add_post('/hook', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    try:
+        yield received, f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/hook'
+    finally:
+        await runner.cleanup()
+
+
+class WebhookDeliveryTest(TestCase):
+    """Test completion webhooks are queued with the final state and delivered by the separate worker"""
+    
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+    
+    def test_callback_is_validated_and_stored(self):
+        """Test only http(s) callbacks (on allowed hosts) are accepted"""
+        response = self.client.post('/api/jobs', {'callback_url': 'https://hooks.example.com/done', 'callback_batch': True},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        job = Job.objects.get(event_id=response.data['event_id'])
+        self.assertEqual((job.callback_url, job.callback_batch), ('https://hooks.example.com/done', True))
+        
+        self.assertEqual(self.client.post('/api/jobs', {'callback_url': 'ftp://hooks.example.com'},
+                                          content_type='application/json').status_code, 400)
+        with self.settings(WEBHOOK_ALLOWED_HOSTS=['hooks.example.com']):
+            self.assertEqual(self.client.post('/api/jobs', {'callback_url': 'http://10.0.0.1/hook'},
+                                              content_type='application/json').status_code, 400)
+    
+    @override_settings(JOB_STATE_WRITE_BEHIND=True)
+    async def test_final_status_is_posted_after_flush(self):
+        """Test the flush queues one delivery and the worker POSTs the status payload, signed"""
+        async with webhook_receiver() as (received, url):
+            job = await Job.objects.acreate(status='processing', callback_url=url)
+            other = await Job.objects.acreate(status='processing')
+            for event_id in (job.event_id, other.event_id):
+                await sync_to_async(finish_job_state)(event_id, status='completed', result={'checklist': {'n': 1}})
+            self.assertEqual(await WebhookDelivery.objects.acount(), 0)
+            await sync_to_async(flush_job_states)()
+            self.assertEqual(await WebhookDelivery.objects.acount(), 1)
+            
+            with self.settings(WEBHOOK_SECRET='s3cret'):
+                self.assertEqual(await WebhookWorker().arun(stop_when_idle=True), 1)
+        
+        self.assertEqual(len(received), 1)
+        headers, body, _ = received[0]
+        payload = json.loads(body)
+        self.assertEqual((payload['event_id'], payload['status']), (str(job.event_id), 'completed'))
+        self.assertEqual(payload['result'], {'checklist': {'n': 1}})
+        self.assertEqual(headers['X-Webhook-Signature'], sign_body(body, 's3cret'))
+        self.assertEqual(await WebhookDelivery.objects.acount(), 0)
+        self.assertEqual(get_metrics('webhook.')['webhook.delivered'], 1)
+    
+    async def test_opted_in_receivers_get_batches_over_pooled_connections(self):
+        """Test batch receivers get one request per URL and all requests reuse one keep-alive connection"""
+        async with webhook_receiver() as (received, url):
+            jobs = [await Job.objects.acreate(status='processing', callback_url=url, callback_batch=index < 3)
+                    for index in range(5)]
+            for job in jobs:
+                await sync_to_async(finish_job_state)(job.event_id, status='completed', result={})
+            await sync_to_async(flush_job_states)()
+            
+            self.assertEqual(await WebhookWorker(per_host=1).arun(stop_when_idle=True), 5)
+        
+        bodies = sorted((json.loads(body) for _, body, _ in received), key=lambda body: 'events' not in body)
+        self.assertEqual(len(bodies), 3)
+        self.assertEqual({event['event_id'] for event in bodies[0]['events']}, {str(job.event_id) for job in jobs[:3]})
+        self.assertEqual({body['event_id'] for body in bodies[1:]}, {str(job.event_id) for job in jobs[3:]})
+        self.assertEqual(len({port for *_, port in received}), 1)
+    
+    async def test_failures_back_off_then_dead_letter(self):
+        """Test a failing receiver is retried with backoff and moved to the dead-letter table after the last attempt"""
+        with self.settings(JOB_STATE_WRITE_BEHIND=False, WEBHOOK_MAX_ATTEMPTS=2):
+            async with webhook_receiver(status_code=500) as (received, url):
+                job = await Job.objects.acreate(status='processing', callback_url=url)
+                await sync_to_async(mark_job_failed)(str(job.event_id), RuntimeError('boom'))
+                
+                await WebhookWorker().arun(stop_when_idle=True)
+                delivery = await WebhookDelivery.objects.aget()
+                self.assertEqual((delivery.attempts, delivery.last_error), (1, 'HTTP 500'))
+                self.assertGreater(delivery.next_attempt_at, timezone.now())
+                
+                await WebhookDelivery.objects.filter(id=delivery.id).aupdate(next_attempt_at=timezone.now())
+                await WebhookWorker().arun(stop_when_idle=True)
+        
+        self.assertEqual(len(received), 2)
+        self.assertEqual(await WebhookDelivery.objects.acount(), 0)
+        dead = await WebhookDeadLetter.objects.aget()
+        self.assertEqual((dead.job_id, dead.attempts, dead.last_error), (job.id, 2, 'HTTP 500'))
+        self.assertEqual((dead.payload['status'], dead.payload['error']), ('failed', 'boom'))
+        self.assertEqual(get_metrics('webhook.')['webhook.dead_lettered'], 1)
+
+
+class JobStatusCacheTest(APITestCase):
+    """Test conditional status reads and the read-through cache of finished job responses"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_etag_revalidation_of_running_job(self):
+        """Test If-None-Match gives 304 until the job state changes"""
+        job = Job.objects.create(status='processing')
+        url = f'/api/jobs/{job.event_id}'
+        
+        first = self.client.get(url)
+        self.assertIn('Last-Modified', first)
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+        # 진행 중 작업은 초 단위 If-Modified-Since만으로는 304가 아님
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 200)
+        
+        set_job_state(job.event_id, status='processing', result={'steps_completed': ['summary_generated']})
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+    
+    @override_settings(JOB_STATE_WRITE_BEHIND=False)
+    def test_finished_job_is_served_from_cache(self):
+        """Test a finished job is read from Postgres once, then served (and revalidated) without queries"""
+        job = Job.objects.create(status='completed', result={'checklist': {'categories': ['x' * 1000]}})
+        url = f'/api/jobs/{job.event_id}'
+        
+        first = self.client.get(url)
+        self.assertIsNotNone(StatusCache().get(job.event_id))
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.json()['result'], job.result)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_state_write_invalidates_cached_response(self):
+        """Test writing the job state drops the cached response so the next read sees the new state"""
+        job = Job.objects.create(status='processing')
+        finish_job_state(job.event_id, status='failed', result={'error': 'boom'})
+        url = f'/api/jobs/{job.event_id}'
+        self.assertEqual(self.client.get(url).json()['status'], 'failed')
+        
+        finish_job_state(job.event_id, status='completed', result={'checklist': {}})
+        
+        self.assertIsNone(StatusCache().get(job.event_id))
+        self.assertEqual(self.client.get(url).json()['status'], 'completed')
@@ -5,5 +5,10 @@ app_name = 'jobs'
 
 urlpatterns = [
     path('jobs', views.create_job, name='create_job'),
-    path('jobs/<uuid:event_id>', views.get_job_status, name='get_job_status'),
+    path('jobs/batch', views.create_job_batch, name='create_job_batch'),
+    path('jobs/batch/<uuid:batch_id>', views.get_job_batch_status, name='get_job_batch_status'),
+    path('jobs/<uuid:event_id>', views.job_status, name='get_job_status'),
+    path('jobs/<uuid:event_id>/events', views.job_events_stream, name='job_events'),
+    path('metrics', views.get_processing_metrics, name='get_metrics'),
+    path('scheduler/stats', views.get_scheduler_stats, name='get_scheduler_stats'),
 ]
\ No newline at end of file
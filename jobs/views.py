@@ -1,38 +1,154 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from drf_spectacular.openapi import AutoSchema
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from redis.exceptions import RedisError
 
+from common import metrics
+from common.metrics import get_metrics
 from .models import Job
-from .tasks import process_guideline_job
+from .outbox import submit_jobs
+from .parsers import BinaryDocumentParser, DocumentParser, spool_document
+from .schema import documented_by
+from .services.fair_scheduler import FairScheduler
+from .services.blob_store import BlobStore
+from .services import job_events
+from .services.idempotency import IdempotencyStore
+from .services.job_state import TERMINAL_STATUSES
+from .services.status_cache import CachedStatus, StatusCache
+from .status import job_status_payload, status_validators
+from .tasks import read_job_statuses, write_behind_enabled
+
+# 공정 스케줄링 단위 (테넌트별 대기열)
+TENANT_HEADER = OpenApiParameter(
+    'X-Tenant-ID', str, OpenApiParameter.HEADER, required=False,
+    description='Tenant whose fair share the job uses: JOB_DEFAULT_TENANT (default) or a tenant in JOB_TENANT_WEIGHTS',
+)
+
+# 클라이언트 재시도 시 같은 작업 반환 (테넌트별, JOB_IDEMPOTENCY_TTL 동안)
+IDEMPOTENCY_HEADER = OpenApiParameter(
+    'Idempotency-Key', str, OpenApiParameter.HEADER, required=False,
+    description='Retries with the same key (per tenant, within JOB_IDEMPOTENCY_TTL) return the original '
+                'event_id with `Idempotent-Replayed: true` instead of creating a new job',
+)
 
+logger = logging.getLogger(__name__)
 
 @extend_schema(
     operation_id='create_job',
     summary='Create a new guideline processing job',
-    description='Creates a new job for processing guidelines and returns an event_id in under 200ms',
+    description='Creates a new job for processing guidelines and returns an event_id in under 200ms. '
+                'Optional `mode` selects two sequential GPT calls (`two_step`) or one combined call (`fused`). '
+                'With `previous_event_id`, only sections changed since that job are re-processed. '
+                'Jobs are scheduled by `priority` and shared fairly between tenants (`X-Tenant-ID` header). '
+                'Send an `Idempotency-Key` header to make client retries safe. '
+                'With `callback_url`, the final `GET /api/jobs/{event_id}` payload is POSTed there when the job '
+                'finishes (`callback_batch: true` lets several events share one `{"events": [...]}` request). '
+                'Large documents can be uploaded as a multipart `file` (`.gz` / `.zst` are decompressed) or as a '
+                'raw `text/*` / `application/octet-stream` body with optional `Content-Encoding: gzip | zstd` and the '
+                'other fields as query parameters; they are streamed into a content-addressed blob store.',
+    parameters=[TENANT_HEADER, IDEMPOTENCY_HEADER],
+    request={
+        'application/json': {
+            'type': 'object',
+            'properties': {
+                'text': {'type': 'string', 'description': 'Guideline text (default: built-in sample guideline)'},
+                'previous_event_id': {'type': 'string', 'format': 'uuid', 'description': 'Job of the previous version'},
+                'mode': {'type': 'string', 'enum': [mode for mode, _ in Job.PIPELINE_MODE_CHOICES]},
+                'priority': {'type': 'string', 'enum': [priority for priority, _ in Job.PRIORITY_CHOICES],
+                             'default': 'normal'},
+                'callback_url': {'type': 'string', 'format': 'uri', 'description': 'Webhook for the final status'},
+                'callback_batch': {'type': 'boolean', 'default': False,
+                                   'description': 'Receiver accepts batched `{"events": [...]}` requests'},
+            },
+        },
+        'multipart/form-data': {
+            'type': 'object',
+            'properties': {
+                'file': {'type': 'string', 'format': 'binary', 'description': 'UTF-8 guideline document'},
+                'previous_event_id': {'type': 'string', 'format': 'uuid'},
+                'mode': {'type': 'string', 'enum': [mode for mode, _ in Job.PIPELINE_MODE_CHOICES]},
+                'priority': {'type': 'string', 'enum': [priority for priority, _ in Job.PRIORITY_CHOICES]},
+                'callback_url': {'type': 'string', 'format': 'uri'},
+                'callback_batch': {'type': 'boolean'},
+            },
+        },
+        'text/plain': {'type': 'string', 'description': 'UTF-8 guideline document (options as query parameters)'},
+    },
     responses={
         201: OpenApiResponse(
             response={'type': 'object', 'properties': {'event_id': {'type': 'string', 'format': 'uuid'}}},
             description='Job created successfully'
-        )
+        ),
+        400: OpenApiResponse(description='Invalid mode, text, priority, tenant, Idempotency-Key, previous_event_id, '
+                                         'callback_url or compressed body'),
+        413: OpenApiResponse(description='Decompressed document exceeds JOB_DOCUMENT_MAX_BYTES'),
     },
     tags=['Jobs']
 )
 @api_view(['POST'])
+@parser_classes([JSONParser, FormParser, MultiPartParser, DocumentParser, BinaryDocumentParser])
 def create_job(request):
     """
-    새로운 guideline-ingest job을 생성하고 Celery 큐에 등록
-    < 200ms 응답 보장
+    새로운 guideline-ingest job을 생성하고 발행 outbox에 등록
+    < 200ms 응답 보장 (요청 경로에서 브로커를 기다리지 않음)
+    같은 Idempotency-Key로 재시도하면 작업을 새로 만들지 않고 처음 작업의 event_id를 반환합니다.
     """
-    # Job 생성
-    job = Job.objects.create(status='pending')
+    data = job_request_data(request)
+    try:
+        mode, text, previous_event_id = validate_job_spec(data)
+        tenant, priority = validate_scheduling(request, data, default_priority='normal')
+        callback_url, callback_batch = validate_callback(data)
+        idempotency_key = validate_idempotency_key(request)
+        if idempotency_key:
+            replayed = find_idempotent_job(tenant, idempotency_key)
+            if replayed:
+                return idempotent_replay(replayed)
+        previous_jobs = load_previous_jobs([previous_event_id])
+        # 검증과 재시도 확인을 모두 통과한 요청의 문서만 blob 저장소에 넣음
+        guideline_text, guideline_hash = store_guideline(text, uploaded_document(data))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Celery task 비동기 실행 (FIFO 큐)
-    process_guideline_job.delay(str(job.event_id))
+    # Job + outbox 행을 한 트랜잭션에 기록 (브로커 발행은 outbox relay가 담당)
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                status='pending', pipeline_mode=mode, guideline_text=guideline_text, guideline_hash=guideline_hash,
+                previous_job=previous_jobs.get(previous_event_id), tenant=tenant, priority=priority,
+                idempotency_key=idempotency_key, callback_url=callback_url, callback_batch=callback_batch,
+            )
+            submit_jobs([job])
+    except IntegrityError:
+        # 같은 키로 동시에 들어온 요청이 먼저 커밋됨 → 그 작업 반환 (outbox 행도 하나뿐)
+        replayed = idempotency_key and find_idempotent_job(tenant, idempotency_key)
+        if not replayed:
+            raise
+        return idempotent_replay(replayed)
     
+    if idempotency_key:
+        remember_idempotent_job(tenant, idempotency_key, job.event_id)
     return Response(
         {'event_id': str(job.event_id)},
         status=status.HTTP_201_CREATED
@@ -42,7 +158,19 @@ def create_job(request):
 @extend_schema(
     operation_id='get_job_status',
     summary='Get job status and results',
-    description='Retrieve the current status and results of a job by event_id',
+    description='Retrieve the current status and results of a job by event_id. '
+                'Responses carry `ETag` / `Last-Modified` (from `updated_at`); send them back as `If-None-Match` / '
+                '`If-Modified-Since` to get `304 Not Modified` while nothing changed. '
+                'With `wait`, the request is held (without a server thread) until the job changes or finishes; '
+                'for a stream of changes use the Server-Sent Events endpoint `GET /api/jobs/{event_id}/events`.',
+    parameters=[
+        OpenApiParameter('wait', float, OpenApiParameter.QUERY, required=False,
+                         description='Long-poll: wait up to this many seconds (max JOB_LONG_POLL_MAX_WAIT) for a change'),
+        OpenApiParameter('status', str, OpenApiParameter.QUERY, required=False,
+                         description='Status the client last saw; with `wait`, respond at once if it already differs'),
+        OpenApiParameter('If-None-Match', str, OpenApiParameter.HEADER, required=False,
+                         description='ETag of a previous response'),
+    ],
     responses={
         200: OpenApiResponse(
             response={
@@ -58,6 +186,7 @@ def create_job(request):
             },
             description='Job status retrieved successfully'
         ),
+        304: OpenApiResponse(description='Not modified since the ETag / date sent'),
         404: OpenApiResponse(description='Job not found')
     },
     tags=['Jobs']
@@ -65,54 +194,505 @@ def create_job(request):
 @api_view(['GET'])
 def get_job_status(request, event_id):
     """
-    Job 상태 및 결과 조회
-    """
-    job = get_object_or_404(Job, event_id=event_id)
-    
-    response_data = {
-        'event_id': str(job.event_id),
-        'status': job.status,
-        'created_at': job.created_at.isoformat(),
-        'updated_at': job.updated_at.isoformat(),
-    }
-    
-    # 상태별 응답 처리
-    if job.status == 'pending':
-        response_data['message'] = '작업이 대기 중입니다.'
-        
-    elif job.status == 'processing':
-        response_data['message'] = '작업을 처리하고 있습니다.'
-        # 진행 상황이 있다면 포함
-        if job.result and 'steps_completed' in job.result:
-            response_data['progress'] = {
-                'steps_completed': job.result['steps_completed'],
-                'current_step': get_current_step(job.result['steps_completed'])
-            }
-            
-    elif job.status == 'completed':
-        response_data['message'] = '작업이 완료되었습니다.'
-        if job.result:
-            response_data['result'] = job.result
-            
-    elif job.status == 'failed':
-        response_data['message'] = '작업 처리 중 오류가 발생했습니다.'
-        if job.result and 'error' in job.result:
-            response_data['error'] = job.result['error']
-            response_data['failed_at'] = job.result.get('failed_at')
-    
-    return Response(response_data)
-
-
-def get_current_step(steps_completed):
-    """
-    완료된 단계를 바탕으로 현재 진행 중인 단계 반환
-    """
-    if not steps_completed:
-        return 'summary_generation'
-    
-    if 'summary_generated' not in steps_completed:
-        return 'summary_generation'
-    elif 'checklist_generated' not in steps_completed:
-        return 'checklist_generation'
+    Job 상태 및 결과 조회 (ETag / Last-Modified, 바뀌지 않았으면 304)
+    진행 중인 작업은 Redis의 상태를 읽고, 없을 때만 Postgres를 조회합니다.
+    종료된 작업은 직렬화한 응답을 Redis에서 그대로 돌려주므로 DB 조회와 JSON 인코딩을 건너뜁니다.
+    """
+    cached = read_status_cache(event_id)
+    if cached is None:
+        response_data = job_status_payload(event_id)
+        if response_data is None:
+            raise Http404
+        etag, last_modified = status_validators(response_data)
+        if response_data['status'] not in TERMINAL_STATUSES:
+            # 진행 중 상태는 1초 안에도 바뀌므로 초 단위인 If-Modified-Since로는 304를 주지 않음
+            response = get_conditional_response(request, etag=etag)
+            return with_validators(response or Response(response_data), etag, last_modified)
+        cached = CachedStatus(JSONRenderer().render(response_data), etag, last_modified)
+        write_status_cache(event_id, cached)
+    
+    response = get_conditional_response(request, etag=cached.etag, last_modified=cached.last_modified)
+    if response is None:
+        response = HttpResponse(cached.body, content_type='application/json')
+    return with_validators(response, cached.etag, cached.last_modified)
+
+
+@documented_by(get_job_status)
+async def job_status(request, event_id):
+    """
+    GET /api/jobs/<event_id> (ASGI 경로)
+    ?wait=N이면 상태(또는 완료된 단계)가 바뀌거나 작업이 끝날 때까지 최대 N초 기다렸다가 응답합니다.
+    기다리는 동안은 Redis 알림만 구독하므로 스레드와 DB 연결을 잡지 않습니다.
+    """
+    if 'wait' not in request.GET:
+        return await sync_to_async(get_job_status)(request, event_id)
+    try:
+        wait = float(request.GET['wait'])
+        if not 0 <= wait <= getattr(settings, 'JOB_LONG_POLL_MAX_WAIT', 60):
+            raise ValueError
+    except ValueError:
+        return JsonResponse(
+            {'error': f"wait는 0~{getattr(settings, 'JOB_LONG_POLL_MAX_WAIT', 60)}초여야 합니다."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    
+    async with job_events.subscribe(event_id) as events:
+        payload = await sync_to_async(job_status_payload)(event_id)
+        if payload is None:
+            return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        # 클라이언트가 마지막으로 본 상태(?status=)와 다르면 바로 응답
+        if payload['status'] in TERMINAL_STATUSES or payload['status'] != request.GET.get('status', payload['status']):
+            return JsonResponse(payload)
+        try:
+            await asyncio.wait_for(events.get(), timeout=wait)
+        except asyncio.TimeoutError:
+            return JsonResponse(payload)
+        payload = await sync_to_async(job_status_payload)(event_id)
+    return JsonResponse(payload)
+
+
+async def job_events_stream(request, event_id):
+    """
+    GET /api/jobs/<event_id>/events - 상태가 바뀔 때마다 보내는 Server-Sent Events 스트림
+    작업이 끝나거나 JOB_EVENTS_MAX_STREAM초가 지나면 닫힙니다 (EventSource는 자동으로 다시 연결).
+    """
+    if await sync_to_async(job_status_payload)(event_id) is None:
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    heartbeat = getattr(settings, 'JOB_EVENTS_HEARTBEAT', 15)
+    max_stream = getattr(settings, 'JOB_EVENTS_MAX_STREAM', 600)
+    
+    async def stream():
+        deadline = time.monotonic() + max_stream
+        yield f'retry: {int(heartbeat * 1000)}\n\n'
+        async with job_events.subscribe(event_id) as events:
+            last = None
+            while time.monotonic() < deadline:
+                payload = await sync_to_async(job_status_payload)(event_id)
+                if payload != last:
+                    yield f'event: status\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+                    last = payload
+                if payload is None or payload['status'] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(events.get(), timeout=min(heartbeat, max(deadline - time.monotonic(), 0)))
+                except asyncio.TimeoutError:
+                    # 연결 유지 (알림을 놓쳤을 수 있으므로 다음 반복에서 상태를 다시 읽음)
+                    yield ': keep-alive\n\n'
+    
+    return StreamingHttpResponse(
+        stream(), content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@extend_schema(
+    operation_id='create_job_batch',
+    summary='Create many guideline processing jobs at once',
+    description='Bulk-inserts one job per guideline and publishes their tasks in batches over one broker connection. '
+                'Items are guideline strings or objects with the same fields as `POST /api/jobs`; '
+                'a top-level `mode` applies to items without one. '
+                'Batches default to `low` priority so backfills do not delay interactive jobs.',
+    parameters=[TENANT_HEADER],
+    request={
+        'application/json': {
+            'type': 'object',
+            'properties': {
+                'jobs': {
+                    'type': 'array',
+                    'items': {'oneOf': [
+                        {'type': 'string'},
+                        {'type': 'object', 'properties': {
+                            'text': {'type': 'string'},
+                            'previous_event_id': {'type': 'string', 'format': 'uuid'},
+                            'mode': {'type': 'string', 'enum': [mode for mode, _ in Job.PIPELINE_MODE_CHOICES]},
+                        }},
+                    ]},
+                },
+                'mode': {'type': 'string', 'enum': [mode for mode, _ in Job.PIPELINE_MODE_CHOICES]},
+                'priority': {'type': 'string', 'enum': [priority for priority, _ in Job.PRIORITY_CHOICES],
+                             'default': 'low'},
+                'callback_url': {'type': 'string', 'format': 'uri', 'description': 'Webhook for the final status of every job in the batch'},
+                'callback_batch': {'type': 'boolean', 'default': False,
+                                   'description': 'Receiver accepts batched `{"events": [...]}` requests'},
+            },
+            'required': ['jobs'],
+        }
+    },
+    responses={
+        201: OpenApiResponse(
+            response={'type': 'object', 'properties': {
+                'batch_id': {'type': 'string', 'format': 'uuid'},
+                'count': {'type': 'integer'},
+                'event_ids': {'type': 'array', 'items': {'type': 'string', 'format': 'uuid'}},
+            }},
+            description='Jobs created successfully'
+        ),
+        400: OpenApiResponse(description='Empty, oversized or invalid batch (error names the first bad item)')
+    },
+    tags=['Jobs']
+)
+@api_view(['POST'])
+def create_job_batch(request):
+    """
+    여러 가이드라인을 한 번에 등록
+    INSERT는 bulk_create로, outbox 행도 같은 트랜잭션에 묶어 기록합니다 (발행은 relay가 파이프라인 배치로).
+    """
+    items = request.data.get('jobs') if isinstance(request.data, dict) else None
+    max_size = getattr(settings, 'JOB_BATCH_MAX_SIZE', 10000)
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'jobs는 비어 있지 않은 배열이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > max_size:
+        return Response(
+            {'error': f'한 번에 최대 {max_size}개까지 등록할 수 있습니다.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    default_mode = request.data.get('mode') or None
+    specs = []
+    try:
+        tenant, priority = validate_scheduling(request, request.data, default_priority='low')
+        callback_url, callback_batch = validate_callback(request.data)
+        for index, item in enumerate(items):
+            try:
+                if isinstance(item, str):
+                    item = {'text': item}
+                if not isinstance(item, dict):
+                    raise ValueError('문자열 또는 객체여야 합니다.')
+                specs.append(validate_job_spec({**item, 'mode': item.get('mode') or default_mode}))
+            except ValueError as e:
+                raise ValueError(f'jobs[{index}]: {e}')
+        previous_jobs = load_previous_jobs([previous_event_id for *_, previous_event_id in specs])
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # 검증이 모두 끝난 뒤에 blob 저장 (거절된 요청이 blob을 남기지 않도록)
+    stored = [store_guideline(text) for _, text, _ in specs]
+    batch_id = uuid.uuid4()
+    jobs = [
+        Job(
+            status='pending', pipeline_mode=mode, guideline_text=text, guideline_hash=guideline_hash,
+            batch_id=batch_id, previous_job=previous_jobs.get(previous_event_id), tenant=tenant, priority=priority,
+            callback_url=callback_url, callback_batch=callback_batch,
+        )
+        for (mode, _, previous_event_id), (text, guideline_hash) in zip(specs, stored)
+    ]
+    with transaction.atomic():
+        Job.objects.bulk_create(jobs, batch_size=getattr(settings, 'JOB_BATCH_INSERT_SIZE', 1000))
+        submit_jobs(jobs)
+    
+    event_ids = [str(job.event_id) for job in jobs]    
+    return Response(
+        {'batch_id': str(batch_id), 'count': len(event_ids), 'event_ids': event_ids},
+        status=status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    operation_id='get_job_batch_status',
+    summary='Get job counts of a batch by status',
+    description='Counts come from Postgres; with job state write-behind, jobs that have not finished in '
+                'Postgres are counted by their current state in Redis.',
+    responses={
+        200: OpenApiResponse(
+            response={'type': 'object', 'properties': {
+                'batch_id': {'type': 'string', 'format': 'uuid'},
+                'total': {'type': 'integer'},
+                'counts': {'type': 'object', 'additionalProperties': {'type': 'integer'}},
+                'is_completed': {'type': 'boolean'},
+            }},
+            description='Batch status retrieved successfully'
+        ),
+        404: OpenApiResponse(description='Batch not found')
+    },
+    tags=['Jobs']
+)
+@api_view(['GET'])
+def get_job_batch_status(request, batch_id):
+    """
+    일괄 등록 작업의 상태별 개수 (GROUP BY 쿼리 1회)
+    write-behind를 켜면 진행 중 / 반영 전 종료 상태는 Redis에만 있으므로,
+    Postgres에서 끝나지 않은 작업은 Redis의 상태로 다시 집계합니다 (쿼리 1회 + 파이프라인 1번 왕복).
+    """
+    batch = Job.objects.filter(batch_id=batch_id).order_by()
+    rows = batch.values('status').annotate(count=Count('id'))
+    counts = {status_: 0 for status_, _ in Job.STATUS_CHOICES}
+    counts.update({row['status']: row['count'] for row in rows})
+    
+    total = sum(counts.values())
+    if not total:
+        return Response({'error': f'일괄 등록을 찾을 수 없습니다: {batch_id}'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if write_behind_enabled() and total > counts['completed'] + counts['failed']:
+        unfinished = {
+            str(event_id): status_
+            for event_id, status_ in batch.exclude(status__in=TERMINAL_STATUSES).values_list('event_id', 'status')
+        }
+        for event_id, state in read_job_statuses(list(unfinished)).items():
+            counts[unfinished[event_id]] -= 1
+            counts[state] += 1
+    
+    return Response({
+        'batch_id': str(batch_id),
+        'total': total,
+        'counts': counts,
+        'is_completed': counts['completed'] + counts['failed'] == total,
+    })
+
+
+@extend_schema(
+    operation_id='get_metrics',
+    summary='Get processing metrics',
+    description='Cluster-wide counters such as GPT result cache hits and misses',
+    responses={
+        200: OpenApiResponse(
+            response={'type': 'object', 'additionalProperties': {'type': 'number'}},
+            description='Metrics retrieved successfully'
+        )
+    },
+    tags=['Metrics']
+)
+@api_view(['GET'])
+def get_processing_metrics(request):
+    """
+    클러스터 공용 처리 지표 조회 (?prefix=gpt_cache 로 필터링)
+    """
+    return Response(get_metrics(request.query_params.get('prefix', '')))
+
+
+@extend_schema(
+    operation_id='get_scheduler_stats',
+    summary='Get per-tenant queue depth and wait times',
+    description='Jobs waiting per tenant and priority, and p50/p95 of the recent waits between submission and '
+                'getting an execution slot (e.g. to check interactive jobs stay fast during a backfill)',
+    responses={
+        200: OpenApiResponse(
+            response={'type': 'object', 'properties': {
+                'in_flight': {'type': 'integer'},
+                'max_in_flight': {'type': 'integer'},
+                'tenants': {'type': 'object', 'additionalProperties': {'type': 'object'}},
+            }},
+            description='Scheduler stats retrieved successfully'
+        )
+    },
+    tags=['Metrics']
+)
+@api_view(['GET'])
+def get_scheduler_stats(request):
+    """
+    테넌트/우선순위별 대기 작업 수와 대기 시간 p50/p95
+    """
+    return Response(FairScheduler().stats())
+
+
+def read_status_cache(event_id):
+    """캐시된 종료 상태 응답 (없거나 JOB_STATUS_CACHE_ENABLED=False면 None)"""
+    if not getattr(settings, 'JOB_STATUS_CACHE_ENABLED', True):
+        return None
+    try:
+        return StatusCache().get(event_id)
+    except RedisError as e:
+        logger.warning(f"상태 응답 캐시 조회 실패 ({event_id}): {e}")
+        return None
+
+
+def write_status_cache(event_id, cached):
+    if not getattr(settings, 'JOB_STATUS_CACHE_ENABLED', True):
+        return
+    try:
+        StatusCache().put(event_id, cached)
+    except RedisError as e:
+        logger.warning(f"상태 응답 캐시 기록 실패 ({event_id}): {e}")
+
+
+def with_validators(response, etag, last_modified):
+    """ETag / Last-Modified 헤더 추가 (304 응답 포함)"""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def validate_job_spec(data):
+    """
+    작업 1건의 요청 값 검증 후 (mode, text, previous_event_id) 반환
+    잘못된 값이면 ValueError
+    """
+    # GPT 처리 방식 (미지정 시 설정값 사용)
+    mode = data.get('mode') or None
+    if mode is not None and mode not in dict(Job.PIPELINE_MODE_CHOICES):
+        raise ValueError(f"mode는 {', '.join(dict(Job.PIPELINE_MODE_CHOICES))} 중 하나여야 합니다.")
+    
+    text = data.get('text') or None
+    if text is not None and not isinstance(text, str):
+        raise ValueError('text는 문자열이어야 합니다.')
+    
+    # 이전 버전 작업 (증분 처리 기준)
+    previous_event_id = data.get('previous_event_id') or None
+    if previous_event_id is not None:
+        try:
+            previous_event_id = str(uuid.UUID(str(previous_event_id)))
+        except ValueError:
+            raise ValueError(f'이전 버전 작업을 찾을 수 없습니다: {previous_event_id}')
+    
+    return mode, text, previous_event_id
+
+
+def validate_scheduling(request, data, default_priority):
+    """
+    요청의 (tenant, priority) 반환
+    테넌트는 X-Tenant-ID 헤더 (없으면 JOB_DEFAULT_TENANT), 잘못된 값이면 ValueError
+    헤더는 인증되지 않은 값이므로 JOB_DEFAULT_TENANT와 JOB_TENANT_WEIGHTS에 설정된 테넌트만 허용합니다.
+    """
+    default_tenant = getattr(settings, 'JOB_DEFAULT_TENANT', 'default')
+    tenant = request.headers.get('X-Tenant-ID', '').strip() or default_tenant
+    if tenant != default_tenant and tenant not in getattr(settings, 'JOB_TENANT_WEIGHTS', {}):
+        raise ValueError('X-Tenant-ID는 JOB_DEFAULT_TENANT 또는 JOB_TENANT_WEIGHTS에 설정된 테넌트여야 합니다.')
+    
+    priority = data.get('priority') or default_priority
+    if priority not in dict(Job.PRIORITY_CHOICES):
+        raise ValueError(f"priority는 {', '.join(dict(Job.PRIORITY_CHOICES))} 중 하나여야 합니다.")
+    return tenant, priority
+
+
+def validate_callback(data):
+    """
+    요청의 (callback_url, callback_batch) 반환 (callback_url이 없으면 (None, False))
+    http(s) URL만 허용하고, WEBHOOK_ALLOWED_HOSTS가 있으면 그 호스트만 허용합니다.
+    """
+    url = data.get('callback_url') or None
+    if url is None:
+        return None, False
+    max_length = Job._meta.get_field('callback_url').max_length
+    try:
+        if not isinstance(url, str) or len(url) > max_length:
+            raise ValidationError('too long')
+        URLValidator(schemes=['http', 'https'])(url)
+    except ValidationError:
+        raise ValueError(f'callback_url은 {max_length}자 이하의 http(s) URL이어야 합니다.')
+    allowed_hosts = getattr(settings, 'WEBHOOK_ALLOWED_HOSTS', [])
+    if allowed_hosts and urlsplit(url).hostname not in allowed_hosts:
+        raise ValueError(f'callback_url 호스트는 {", ".join(allowed_hosts)} 중 하나여야 합니다.')
+    
+    callback_batch = data.get('callback_batch', False)
+    if isinstance(callback_batch, str):
+        callback_batch = callback_batch.lower() in ('true', '1')
+    return url, bool(callback_batch)
+
+
+def job_request_data(request):
+    """JSON 본문, 또는 문서 업로드(multipart / 본문 그대로)면 폼 필드 + 쿼리 파라미터"""
+    data = request.data
+    if isinstance(data, QueryDict) or 'document' in data:
+        fields = request.query_params.dict()
+        fields.update(data.dict() if isinstance(data, QueryDict) else data)
+        return fields
+    return data
+
+
+def uploaded_document(data):
+    """
+    업로드된 문서 (DocumentParser가 spool한 본문 또는 multipart file, 없으면 None)
+    multipart 파일은 이름(.gz / .zst)이나 content type으로 압축 여부를 판단합니다.
+    """
+    upload = data.get('file')
+    if upload is None:
+        return data.get('document')
+    if not hasattr(upload, 'read'):
+        raise ValueError('file은 업로드 파일이어야 합니다.')
+    name, content_type = (upload.name or '').lower(), (upload.content_type or '').lower()
+    if name.endswith('.gz') or content_type in ('application/gzip', 'application/x-gzip'):
+        encoding = 'gzip'
+    elif name.endswith('.zst') or content_type == 'application/zstd':
+        encoding = 'zstd'
     else:
-        return 'finalizing'
\ No newline at end of file
+        encoding = None
+    return spool_document(upload, encoding)
+
+
+def store_guideline(text, document=None):
+    """
+    Job에 기록할 (guideline_text, guideline_hash) 반환
+    업로드 문서와 JOB_INLINE_TEXT_MAX_BYTES를 넘는 text는 blob 저장소에 내용 해시로 한 번만 저장하고
+    Job(과 task 메시지)에는 해시만 남깁니다.
+    """
+    if document is not None:
+        if text is not None:
+            raise ValueError('text와 문서 업로드는 함께 보낼 수 없습니다.')
+        if not document.size:
+            raise ValueError('문서가 비어 있습니다.')
+        return None, BlobStore().commit(document).sha256
+    if text is not None and len(text.encode('utf-8')) > getattr(settings, 'JOB_INLINE_TEXT_MAX_BYTES', 64 * 1024):
+        return None, BlobStore().put_text(text).sha256
+    return text, None
+
+
+def validate_idempotency_key(request):
+    """Idempotency-Key 헤더 (없으면 None, 잘못된 값이면 ValueError)"""
+    key = request.headers.get('Idempotency-Key')
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > Job._meta.get_field('idempotency_key').max_length or not key.isprintable():
+        raise ValueError('Idempotency-Key는 255자 이하의 출력 가능한 문자열이어야 합니다.')
+    return key
+
+
+def find_idempotent_job(tenant, idempotency_key):
+    """
+    같은 키로 만든 작업의 event_id (Redis → Postgres 순으로 조회, 없으면 None)
+    보존 기간이 지난 작업의 키는 풀어 주어 같은 키로 새 작업을 만들 수 있게 합니다.
+    """
+    try:
+        event_id = IdempotencyStore().get(tenant, idempotency_key)
+        if event_id:
+            return event_id
+    except RedisError as e:
+        logger.warning(f"멱등성 키 조회 실패, Postgres에서 조회합니다: {e}")
+    
+    job = Job.objects.filter(tenant=tenant, idempotency_key=idempotency_key).only('id', 'event_id', 'created_at').first()
+    if job is None:
+        return None
+    retention = timedelta(seconds=getattr(settings, 'JOB_IDEMPOTENCY_TTL', 60 * 60 * 24))
+    if job.created_at < timezone.now() - retention:
+        Job.objects.filter(id=job.id).update(idempotency_key=None)
+        return None
+    remember_idempotent_job(tenant, idempotency_key, job.event_id, created_at=job.created_at)
+    return str(job.event_id)
+
+
+def remember_idempotent_job(tenant, idempotency_key, event_id, created_at=None):
+    """키 → event_id를 남은 보존 기간 동안 Redis에 기록 (실패해도 Postgres 유니크 열로 보장)"""
+    store = IdempotencyStore()
+    ttl = store.ttl
+    if created_at is not None:
+        ttl -= (timezone.now() - created_at).total_seconds()
+    try:
+        store.remember(tenant, idempotency_key, event_id, ttl=ttl)
+    except RedisError as e:
+        logger.warning(f"멱등성 키 기록 실패: {e}")
+
+
+def idempotent_replay(event_id):
+    """재시도 요청 응답 (처음 응답과 같은 본문 + Idempotent-Replayed 헤더)"""
+    metrics.incr('idempotency.replayed')
+    return Response(
+        {'event_id': str(event_id)},
+        status=status.HTTP_201_CREATED,
+        headers={'Idempotent-Replayed': 'true'},
+    )
+
+
+def load_previous_jobs(previous_event_ids):
+    """
+    이전 버전 작업을 한 번에 조회하여 {event_id: Job} 반환
+    없는 작업이 있으면 ValueError
+    """
+    wanted = {event_id for event_id in previous_event_ids if event_id}
+    if not wanted:
+        return {}
+    
+    found = {str(job.event_id): job for job in Job.objects.filter(event_id__in=wanted)}
+    missing = sorted(wanted - set(found))
+    if missing:
+        raise ValueError(f'이전 버전 작업을 찾을 수 없습니다: {missing[0]}')
+    return found
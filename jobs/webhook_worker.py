@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import signal
+import threading
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .status import job_status_payload
+from .webhooks import claim_deliveries, group_deliveries, record_delivery
+
+logger = logging.getLogger(__name__)
+
+
+def build_payloads(deliveries):
+    """전송 시점의 상태 조회 응답 본문 (delivery.id → GET /api/jobs/<event_id>와 같은 본문, 작업이 없으면 제외)"""
+    payloads = {}
+    for delivery in deliveries:
+        payload = job_status_payload(delivery.job.event_id)
+        if payload is not None:
+            payloads[delivery.id] = payload
+    return payloads
+
+
+def sign_body(body: bytes, secret: str) -> str:
+    """X-Webhook-Signature 값 (본문의 HMAC-SHA256)"""
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class WebhookWorker:
+    """
+    완료 웹훅 전송 프로세스 (python manage.py run_webhook_worker)
+
+    이벤트 루프 하나가 보낼 웹훅을 묶음으로 claim하여 동시에 보냅니다.
+    목적지 호스트마다 keep-alive 연결을 최대 per_host개 재사용하고 전체 연결은 concurrency개로 제한하므로,
+    느린 수신자는 자기 호스트 몫의 연결만 잡고 GPT 워커나 다른 수신자를 막지 않습니다.
+    묶음 전송을 허용한 수신자(callback_batch)에는 같은 URL의 이벤트를 요청 하나({"events": [...]})로 보냅니다.
+    """
+
+    def __init__(self, concurrency: int = None, per_host: int = None, batch_size: int = None,
+                 poll_interval: float = None, timeout: float = None):
+        self.concurrency = concurrency or getattr(settings, 'WEBHOOK_CONCURRENCY', 50)
+        self.per_host = per_host or getattr(settings, 'WEBHOOK_MAX_CONNECTIONS_PER_HOST', 8)
+        self.batch_size = batch_size or getattr(settings, 'WEBHOOK_CLAIM_BATCH', 200)
+        self.poll_interval = poll_interval or getattr(settings, 'WEBHOOK_POLL_INTERVAL', 1.0)
+        self.timeout = timeout or getattr(settings, 'WEBHOOK_TIMEOUT', 10)
+        self.lease = getattr(settings, 'WEBHOOK_LEASE', 120)
+        self.secret = getattr(settings, 'WEBHOOK_SECRET', '')
+        self._stopping = False
+        self.delivered = 0
+
+    def run(self, stop_when_idle: bool = False):
+        """워커 실행 (SIGINT/SIGTERM 수신 시 진행 중인 요청을 마치고 종료)"""
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[signum] = signal.signal(signum, self._request_stop)
+        try:
+            return asyncio.run(self.arun(stop_when_idle))
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    async def arun(self, stop_when_idle: bool = False):
+        """
+        이벤트 루프에서 실행
+        stop_when_idle이면 보낼 웹훅과 진행 중인 요청이 모두 없을 때 종료 (테스트 / 일회성 실행용)
+        """
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        logger.info(f"🚀 Webhook worker started (concurrency={self.concurrency}, per_host={self.per_host})")
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': 'avo-api-webhook'},
+        ) as session:
+            in_flight = set()
+            while not self._stopping:
+                claimed = await self._claim(session, in_flight) if len(in_flight) < self.concurrency else 0
+                if claimed >= self.batch_size:
+                    continue
+                if not in_flight:
+                    if stop_when_idle:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                # 빈 슬롯이 생기거나 poll_interval이 지나면 다시 claim
+                await asyncio.wait(in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+
+            if in_flight:
+                logger.info(f"🛑 Waiting for {len(in_flight)} in-flight webhooks...")
+                await asyncio.wait(in_flight)
+        logger.info(f"👋 Webhook worker stopped ({self.delivered} events delivered)")
+        return self.delivered
+
+    async def _claim(self, session, in_flight) -> int:
+        try:
+            deliveries = await sync_to_async(claim_deliveries)(self.batch_size, self.lease)
+        except DatabaseError as e:
+            logger.error(f"❌ Webhook claim failed, reconnecting: {e}")
+            await sync_to_async(connection.close)()
+            await asyncio.sleep(min(self.poll_interval, 1.0))
+            return 0
+        for url, grouped, batched in group_deliveries(deliveries):
+            task = asyncio.create_task(self._deliver(session, url, grouped, batched))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        return len(deliveries)
+
+    async def _deliver(self, session, url, deliveries, batched):
+        try:
+            payloads = await sync_to_async(build_payloads)(deliveries)
+            error = await self._post(session, url, [payloads[d.id] for d in deliveries if d.id in payloads], batched)
+            await sync_to_async(record_delivery)(deliveries, payloads, error)
+        except Exception as e:
+            # 결과를 기록하지 못한 행은 lease가 지나면 다시 전송됨
+            logger.error(f"❌ Webhook delivery to {url} failed: {e}")
+            return
+        if error is None:
+            self.delivered += len(payloads)
+        else:
+            logger.warning(f"⚠️ Webhook to {url} failed ({len(deliveries)} events): {error}")
+
+    async def _post(self, session, url, events, batched):
+        """요청 1건 전송 (성공이면 None, 실패면 오류 메시지)"""
+        if not events:
+            return None
+        body = json.dumps({'events': events} if batched else events[0], ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'X-Webhook-Event': 'job.finished'}
+        if self.secret:
+            headers['X-Webhook-Signature'] = sign_body(body, self.secret)
+        try:
+            async with session.post(url, data=body, headers=headers, allow_redirects=False) as response:
+                # 응답을 끝까지 읽어야 연결이 keep-alive 풀로 돌아감
+                await response.read()
+                return None if 200 <= response.status < 300 else f'HTTP {response.status}'
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return f'{type(e).__name__}: {e}'
+
+    def _request_stop(self, signum, frame):
+        logger.info("🛑 Shutdown requested")
+        self._stopping = True
@@ -0,0 +1,118 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from common import metrics
+from .models import WebhookDeadLetter, WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_webhooks(jobs) -> int:
+    """
+    종료된 작업의 완료 웹훅 등록 - 종료 상태를 Postgres에 기록하는 트랜잭션 안에서 호출
+    callback_url이 없는 작업은 건너뜁니다. 전송은 웹훅 워커가 담당하므로 GPT 워커는 기다리지 않습니다.
+    """
+    deliveries = [
+        WebhookDelivery(job_id=job.id, url=job.callback_url, batch=job.callback_batch)
+        for job in jobs if job.callback_url
+    ]
+    if deliveries:
+        WebhookDelivery.objects.bulk_create(deliveries, batch_size=getattr(settings, 'JOB_BATCH_INSERT_SIZE', 1000))
+    return len(deliveries)
+
+
+def retry_delay(attempts: int) -> float:
+    """전송 실패 후 다음 시도까지 대기 시간 (지수 백오프, WEBHOOK_MAX_BACKOFF 상한)"""
+    return min(getattr(settings, 'WEBHOOK_MAX_BACKOFF', 3600), 2 ** max(attempts - 1, 0))
+
+
+def claim_deliveries(limit: int, lease: int = None) -> List[WebhookDelivery]:
+    """
+    보낼 웹훅을 최대 limit개 claim (FOR UPDATE SKIP LOCKED)
+    시도 횟수를 올리고 다음 전송 시각을 lease만큼 미뤄 두므로, 워커가 결과를 기록하지 못하고 죽어도
+    lease가 지나면 다시 전송됩니다 (at-least-once).
+    """
+    lease = lease or getattr(settings, 'WEBHOOK_LEASE', 120)
+    now = timezone.now()
+    with transaction.atomic():
+        deliveries = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(next_attempt_at__lte=now)
+            .select_related('job').only('id', 'url', 'batch', 'attempts', 'created_at', 'job__event_id')
+            .order_by('id')[:limit]
+        )
+        if not deliveries:
+            return []
+        WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).update(
+            attempts=F('attempts') + 1, next_attempt_at=now + timedelta(seconds=lease),
+        )
+    for delivery in deliveries:
+        delivery.attempts += 1
+    return deliveries
+
+
+def group_deliveries(deliveries, max_events: int = None):
+    """
+    요청 단위로 묶기: 묶음 전송을 허용한 웹훅은 URL별로 최대 max_events개씩, 나머지는 1건씩
+    반환값: [(url, [delivery, ...], batched), ...]
+    """
+    max_events = max_events or getattr(settings, 'WEBHOOK_BATCH_MAX_EVENTS', 100)
+    requests, batches = [], defaultdict(list)
+    for delivery in deliveries:
+        if delivery.batch:
+            batches[delivery.url].append(delivery)
+        else:
+            requests.append((delivery.url, [delivery], False))
+    for url, grouped in batches.items():
+        for start in range(0, len(grouped), max_events):
+            requests.append((url, grouped[start:start + max_events], True))
+    return requests
+
+
+def record_delivery(deliveries, payloads=None, error: str = None):
+    """
+    전송 결과 기록
+    성공하면 행을 삭제하고, 실패하면 백오프 후 다시 보내며 WEBHOOK_MAX_ATTEMPTS번 실패한 행은 dead-letter로 옮깁니다.
+    """
+    now = timezone.now()
+    if error is None:
+        WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).delete()
+        metrics.incr('webhook.delivered', len(deliveries))
+        for delivery in deliveries:
+            metrics.observe('webhook.lag_seconds', (now - delivery.created_at).total_seconds())
+        return
+
+    max_attempts = getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 8)
+    error = error[:1000]
+    dead = [delivery for delivery in deliveries if delivery.attempts >= max_attempts]
+    retrying = defaultdict(list)
+    for delivery in deliveries:
+        if delivery.attempts < max_attempts:
+            retrying[delivery.attempts].append(delivery.id)
+
+    with transaction.atomic():
+        if dead:
+            WebhookDeadLetter.objects.bulk_create([
+                WebhookDeadLetter(
+                    job_id=delivery.job_id, url=delivery.url, payload=(payloads or {}).get(delivery.id),
+                    attempts=delivery.attempts, last_error=error,
+                )
+                for delivery in dead
+            ])
+            WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in dead]).delete()
+        for attempts, ids in retrying.items():
+            WebhookDelivery.objects.filter(id__in=ids).update(
+                next_attempt_at=now + timedelta(seconds=retry_delay(attempts)), last_error=error,
+            )
+
+    metrics.incr('webhook.failed', len(deliveries))
+    if dead:
+        metrics.incr('webhook.dead_lettered', len(dead))
+        logger.error(f"☠️ Webhook dead-lettered ({len(dead)} events → {dead[0].url}): {error}")